@@ -0,0 +1,130 @@
+"""Per-chat debouncing of rapid-fire messages.
+
+Users often split one request over several short messages ("красное",
+"до 2000", "к мясу"). MessageCoalescer waits a short window after each
+message and answers everything that arrived in it with a single agent run.
+A message that arrives while a run is still generating cancels that run:
+its messages are merged with the new one and answered together. Once a run
+has started sending its answer it is left to finish, and newer messages
+are answered by the next run.
+
+A run is split into two callbacks:
+    generate(items) -> result   cancellable, must not send or save anything
+    send(items, result)         never cancelled by newer messages
+"""
+
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Generic, Optional, TypeVar
+
+from app.core.metrics import BOT_MESSAGES_COALESCED, BOT_RUNS_SUPERSEDED
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+@dataclass
+class _ChatState(Generic[T]):
+    """Messages and tasks of one chat."""
+
+    pending: list[T] = field(default_factory=list)
+    timer: Optional[asyncio.Task] = None
+    run: Optional[asyncio.Task] = None
+    running_items: list[T] = field(default_factory=list)
+    sending: bool = False
+
+
+class MessageCoalescer(Generic[T]):
+    """Merge messages of a chat arriving within a window into one run.
+
+    Args:
+        window_seconds: Quiet period after the last message before a run starts
+        generate: Builds the answer for a batch of messages (cancellable)
+        send: Delivers the answer for a batch of messages
+        max_concurrent_runs: Runs (all chats) allowed at the same time
+    """
+
+    def __init__(
+        self,
+        window_seconds: float,
+        generate: Callable[[list[T]], Awaitable[Any]],
+        send: Callable[[list[T], Any], Awaitable[None]],
+        max_concurrent_runs: int = 8,
+    ):
+        self.window_seconds = window_seconds
+        self._generate = generate
+        self._send = send
+        self._runs = asyncio.Semaphore(max_concurrent_runs)
+        self._chats: dict[int, _ChatState[T]] = {}
+
+    def submit(self, chat_id: int, item: T) -> None:
+        """Queue a message; the chat's run starts after the quiet window."""
+        state = self._chats.setdefault(chat_id, _ChatState())
+
+        if state.run is not None and not state.sending and not state.run.done():
+            # Superseded before anything was sent: answer its messages
+            # together with the new one instead
+            state.run.cancel()
+            state.run = None
+            state.pending[:0] = state.running_items
+            state.running_items = []
+            BOT_RUNS_SUPERSEDED.inc()
+
+        state.pending.append(item)
+        if len(state.pending) > 1:
+            BOT_MESSAGES_COALESCED.inc()
+
+        if state.timer is not None:
+            state.timer.cancel()
+        state.timer = asyncio.create_task(self._wait_and_run(chat_id, state))
+
+    async def close(self) -> None:
+        """Cancel all timers and runs (on shutdown)."""
+        tasks = [
+            task
+            for state in self._chats.values()
+            for task in (state.timer, state.run)
+            if task is not None and not task.done()
+        ]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._chats.clear()
+
+    async def _wait_and_run(self, chat_id: int, state: _ChatState[T]) -> None:
+        await asyncio.sleep(self.window_seconds)
+        state.timer = None
+        # A run that is already sending starts the next one when it is done
+        if state.run is None:
+            self._start_run(chat_id, state)
+
+    def _start_run(self, chat_id: int, state: _ChatState[T]) -> None:
+        state.running_items, state.pending = state.pending, []
+        state.sending = False
+        state.run = asyncio.create_task(self._run(chat_id, state))
+
+    async def _run(self, chat_id: int, state: _ChatState[T]) -> None:
+        items = state.running_items
+        try:
+            async with self._runs:
+                result = await self._generate(items)
+                state.sending = True
+                await self._send(items, result)
+        except asyncio.CancelledError:
+            if state.run is not asyncio.current_task():
+                return  # superseded; submit() took over the messages
+            raise
+        except Exception:
+            logger.exception("Coalesced run failed for chat %s", chat_id)
+
+        state.run = None
+        state.running_items = []
+        state.sending = False
+        if state.pending:
+            if state.timer is None:
+                # More messages arrived, and their window passed, while sending
+                self._start_run(chat_id, state)
+        elif state.timer is None:
+            self._chats.pop(chat_id, None)
@@ -0,0 +1,245 @@
+"""Rate-aware outbound queue for Telegram sends.
+
+Telegram allows roughly 30 messages per second per bot and about one
+message per second per chat (short bursts are tolerated); exceeding either
+returns 429 RetryAfter. Every outbound call goes through
+OutboundDispatcher.send(), which:
+
+- keeps each chat's messages in order (one send in flight per chat),
+- takes a token from the chat's bucket and from the global bucket,
+- serves the first message of a reply before follow-ups of other replies
+  when the global bucket is short, so a busy minute delays photos rather
+  than leaving new users without any answer,
+- on RetryAfter pauses both the chat's and the global bucket (a 429 is
+  usually the bot-wide limit, so other chats must wait too) and retries
+  instead of failing the reply.
+
+Usage:
+    dispatcher = get_outbound_dispatcher()
+    await dispatcher.send(chat_id, lambda: message.reply_text("..."), first=True)
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+import warnings
+from datetime import timedelta
+from typing import Any, Awaitable, Callable, Optional, TypeVar
+
+from telegram.error import RetryAfter
+from telegram.warnings import PTBDeprecationWarning
+
+from app.config import get_settings
+from app.core.metrics import BOT_SEND_RETRIES, BOT_SEND_SECONDS, BOT_SEND_WAIT_SECONDS
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Priorities for the global bucket (lower is served first)
+PRIORITY_FIRST = 0
+PRIORITY_FOLLOW_UP = 1
+
+# Chat states kept before idle ones are swept
+MAX_TRACKED_CHATS = 1000
+
+
+class TokenBucket:
+    """Token bucket with prioritized FIFO waiters.
+
+    Args:
+        rate: Tokens added per second
+        capacity: Maximum tokens (burst size)
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._waiters: list[tuple[int, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    @property
+    def idle(self) -> bool:
+        """True when full and nobody is waiting (safe to drop)."""
+        self._refill()
+        return not self._waiters and self._tokens >= self.capacity
+
+    async def acquire(self, priority: int = PRIORITY_FOLLOW_UP) -> None:
+        """Wait for a token; lower priority values are served first."""
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._seq), future))
+        self._dispatch()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self._tokens += 1  # granted just before cancellation: give back
+            raise
+
+    def pause(self, seconds: float) -> None:
+        """Hand out no tokens for the next `seconds` (after a RetryAfter)."""
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+        self._tokens = min(self._tokens, 0)
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        if now > self._paused_until:
+            start = max(self._updated, self._paused_until)
+            self._tokens = min(self.capacity, self._tokens + (now - start) * self.rate)
+        self._updated = now
+
+    def _dispatch(self) -> None:
+        if self._timer is not None:
+            return
+        self._refill()
+        while self._waiters and self._tokens >= 1:
+            _, _, future = heapq.heappop(self._waiters)
+            if future.done():
+                continue  # cancelled while waiting
+            self._tokens -= 1
+            future.set_result(None)
+        if self._waiters:
+            delay = max(0.0, self._paused_until - time.monotonic())
+            delay += max(0.0, 1 - self._tokens) / self.rate
+            self._timer = asyncio.get_running_loop().call_later(delay, self._on_timer)
+
+    def _on_timer(self) -> None:
+        self._timer = None
+        self._dispatch()
+
+
+class OutboundDispatcher:
+    """Send Telegram API calls within global and per-chat rate limits.
+
+    Args:
+        global_rate: Messages per second for the whole bot
+        chat_rate: Messages per second per chat
+        chat_burst: Messages a chat may receive back to back
+        max_retries: RetryAfter retries per message before giving up
+    """
+
+    def __init__(
+        self,
+        global_rate: float = 25.0,
+        chat_rate: float = 1.0,
+        chat_burst: int = 5,
+        max_retries: int = 3,
+    ):
+        self.global_bucket = TokenBucket(global_rate, capacity=global_rate)
+        self.chat_rate = chat_rate
+        self.chat_burst = chat_burst
+        self.max_retries = max_retries
+        # chat_id -> (order lock, rate bucket, number of sends using them)
+        self._chats: dict[Any, tuple[asyncio.Lock, TokenBucket, int]] = {}
+
+    async def send(
+        self,
+        chat_id: Any,
+        call: Callable[[], Awaitable[T]],
+        first: bool = False,
+    ) -> T:
+        """Run `call` (one Bot API request) when the rate limits allow.
+
+        Args:
+            chat_id: Chat the message goes to (sends to it keep their order)
+            call: Zero-argument callable making the request, e.g.
+                lambda: message.reply_text(text)
+            first: First message of a reply; jumps ahead of follow-ups
+
+        Returns:
+            Whatever the call returns
+        """
+        enqueued_at = time.perf_counter()
+        priority = PRIORITY_FIRST if first else PRIORITY_FOLLOW_UP
+        lock, bucket = self._acquire_chat(chat_id)
+        try:
+            async with lock:
+                retries = 0
+                while True:
+                    await bucket.acquire()
+                    await self.global_bucket.acquire(priority)
+                    if retries == 0:
+                        BOT_SEND_WAIT_SECONDS.observe(time.perf_counter() - enqueued_at)
+
+                    started = time.perf_counter()
+                    try:
+                        result = await call()
+                    except RetryAfter as e:
+                        if retries >= self.max_retries:
+                            raise
+                        retries += 1
+                        delay = _retry_seconds(e)
+                        BOT_SEND_RETRIES.inc()
+                        logger.warning(
+                            "Telegram flood limit for chat %s, retry %d in %.1fs",
+                            chat_id, retries, delay,
+                        )
+                        bucket.pause(delay)
+                        self.global_bucket.pause(delay)
+                        continue
+                    BOT_SEND_SECONDS.observe(time.perf_counter() - started)
+                    return result
+        finally:
+            self._release_chat(chat_id)
+
+    def _acquire_chat(self, chat_id: Any) -> tuple[asyncio.Lock, TokenBucket]:
+        entry = self._chats.get(chat_id)
+        if entry is None:
+            entry = (asyncio.Lock(), TokenBucket(self.chat_rate, self.chat_burst), 0)
+        lock, bucket, users = entry
+        self._chats[chat_id] = (lock, bucket, users + 1)
+        return lock, bucket
+
+    def _release_chat(self, chat_id: Any) -> None:
+        lock, bucket, users = self._chats[chat_id]
+        if users <= 1 and bucket.idle:
+            del self._chats[chat_id]
+        else:
+            self._chats[chat_id] = (lock, bucket, users - 1)
+        if len(self._chats) > MAX_TRACKED_CHATS:
+            self._prune()
+
+    def _prune(self) -> None:
+        """Forget chats with no sends in flight whose bucket has refilled."""
+        for chat_id, (_, bucket, users) in list(self._chats.items()):
+            if users == 0 and bucket.idle:
+                del self._chats[chat_id]
+
+
+def _retry_seconds(error: RetryAfter) -> float:
+    with warnings.catch_warnings():
+        # int today, timedelta with PTB_TIMEDELTA=1 / next major; both handled
+        warnings.simplefilter("ignore", PTBDeprecationWarning)
+        retry_after = error.retry_after
+    if isinstance(retry_after, timedelta):
+        return retry_after.total_seconds()
+    return float(retry_after)
+
+
+# Global dispatcher instance
+_dispatcher: Optional[OutboundDispatcher] = None
+
+
+def get_outbound_dispatcher() -> OutboundDispatcher:
+    """Get the global outbound dispatcher instance."""
+    global _dispatcher
+    if _dispatcher is None:
+        settings = get_settings()
+        _dispatcher = OutboundDispatcher(
+            global_rate=settings.telegram_global_rate,
+            chat_rate=settings.telegram_chat_rate,
+            chat_burst=settings.telegram_chat_burst,
+        )
+    return _dispatcher
+
+
+def reset_outbound_dispatcher() -> None:
+    """Reset the dispatcher instance (useful for testing)."""
+    global _dispatcher
+    _dispatcher = None
@@ -1,15 +1,24 @@
 """Handler for free-text messages (recommendations)."""
 
 import logging
+from typing import Optional
 
 from telegram import Update
 from telegram.ext import ContextTypes, MessageHandler, filters
 
+from app.bot.coalescer import MessageCoalescer
+from app.bot.history_writer import get_history_writer
 from app.bot.messages import ERROR_LLM_UNAVAILABLE
-from app.bot.sender import send_fallback_response, send_wine_recommendations
+from app.bot.sender import (
+    send_fallback_response,
+    send_rate_limited,
+    send_wine_recommendations,
+)
 from app.bot.utils import detect_language
+from app.config import get_settings
 from app.core.database import async_session_maker
-from app.services.telegram_bot import TelegramBotService
+from app.models.wine import Wine
+from app.services.telegram_bot import Exchange, TelegramBotService
 
 logger = logging.getLogger(__name__)
 
@@ -21,62 +30,152 @@ async def message_handler_callback(
     """Handle free-text messages for wine recommendations.
 
     All messages that are not commands are treated as recommendation requests.
-    Sends the response as 5 separate messages: intro, 3 wines with photos,
-    closing question.
+    Messages a user sends in quick succession are answered together (see
+    MessageCoalescer). Sends the response as 5 separate messages: intro,
+    3 wines with photos, closing question.
     """
     if not update.effective_user or not update.message or not update.message.text:
         return
 
-    user = update.effective_user
-    telegram_id = user.id
-    username = user.username
-    first_name = user.first_name
-    language_code = user.language_code or "ru"
     message_text = update.message.text
-
     logger.info(
         "Received message from user %s: %s",
-        telegram_id,
+        update.effective_user.id,
         message_text[:50] + "..." if len(message_text) > 50 else message_text,
     )
 
-    # Detect language for response
-    language = detect_language(message_text, language_code)
+    coalescer = get_message_coalescer()
+    if coalescer is None:
+        await send_reply([update], await generate_reply([update]))
+        return
+
+    coalescer.submit(update.effective_chat.id, update)
+
+
+# (response_text, recommended_wines, exchange to save once sent)
+Reply = tuple[str, list[Wine], Optional[Exchange]]
+
+
+async def generate_reply(updates: list[Update]) -> Optional[Reply]:
+    """Run the agent on one or more consecutive messages of a chat.
+
+    Nothing is saved here: the coalescer may cancel this run when newer
+    messages arrive, so the exchange is saved by send_reply() instead.
+
+    Returns:
+        Reply tuple, or None if it failed
+    """
+    user = updates[-1].effective_user
+    message_text = "\n".join(update.message.text for update in updates)
 
     try:
         async with async_session_maker() as db:
-            service = TelegramBotService(db)
+            # Short units of work: no connection is held during the LLM call
+            service = TelegramBotService(
+                db,
+                session_factory=async_session_maker,
+                history_writer=get_history_writer(),
+            )
 
-            # Process message and get recommendation
-            response_text, wines = await service.process_message(
-                telegram_id=telegram_id,
+            # Get recommendation (saved after it is sent)
+            return await service.prepare_reply(
+                telegram_id=user.id,
                 message_text=message_text,
-                telegram_locale=language_code,
-                username=username,
-                first_name=first_name,
+                telegram_locale=user.language_code or "ru",
+                username=user.username,
+                first_name=user.first_name,
             )
+    except Exception as e:
+        logger.exception("Error handling message for user %s: %s", user.id, e)
+        return None
 
-            # Try structured 5-message format
-            sent = await send_wine_recommendations(
-                update, response_text, wines, language
-            )
 
-            if not sent:
-                # Fallback: single text + separate photos
-                await send_fallback_response(update, response_text, wines, language)
+async def send_reply(updates: list[Update], reply: Optional[Reply]) -> None:
+    """Send the answer to the latest of the messages it covers, then save it."""
+    update = updates[-1]
+    user = update.effective_user
 
-            logger.info(
-                "Sent recommendation to user %s (%d wines, structured=%s)",
-                telegram_id,
-                len(wines),
-                sent,
-            )
+    if reply is None:
+        # Send error message (always Russian — service targets RU)
+        await send_rate_limited(
+            update, lambda: update.message.reply_text(ERROR_LLM_UNAVAILABLE), first=True,
+        )
+        return
+
+    response_text, wines, exchange = reply
+    message_text = "\n".join(u.message.text for u in updates)
+    # Detect language for response
+    language = detect_language(message_text, user.language_code or "ru")
+
+    try:
+        # Try structured 5-message format
+        sent = await send_wine_recommendations(
+            update, response_text, wines, language
+        )
+
+        if not sent:
+            # Fallback: single text + separate photos
+            await send_fallback_response(update, response_text, wines, language)
+
+        logger.info(
+            "Sent recommendation to user %s (%d wines, structured=%s, messages=%d)",
+            user.id,
+            len(wines),
+            sent,
+            len(updates),
+        )
 
     except Exception as e:
-        logger.exception("Error handling message for user %s: %s", telegram_id, e)
+        logger.exception("Error sending recommendation to user %s: %s", user.id, e)
+        await send_rate_limited(
+            update, lambda: update.message.reply_text(ERROR_LLM_UNAVAILABLE), first=True,
+        )
+        return
 
-        # Send error message (always Russian — service targets RU)
-        await update.message.reply_text(ERROR_LLM_UNAVAILABLE)
+    if exchange is not None:
+        await save_exchange(exchange)
+
+
+async def save_exchange(exchange: Exchange) -> None:
+    """Save a delivered exchange to the conversation history."""
+    try:
+        async with async_session_maker() as db:
+            service = TelegramBotService(
+                db,
+                session_factory=async_session_maker,
+                history_writer=get_history_writer(),
+            )
+            await service.save_exchange(exchange)
+    except Exception as e:
+        logger.exception(
+            "Error saving exchange of conversation %s: %s", exchange.conversation_id, e,
+        )
+
+
+# Global coalescer instance
+_coalescer: Optional[MessageCoalescer[Update]] = None
+
+
+def get_message_coalescer() -> Optional[MessageCoalescer[Update]]:
+    """Get the per-chat message coalescer (None when debouncing is disabled)."""
+    global _coalescer
+    settings = get_settings()
+    if settings.telegram_debounce_ms <= 0:
+        return None
+    if _coalescer is None:
+        _coalescer = MessageCoalescer(
+            settings.telegram_debounce_ms / 1000,
+            generate=generate_reply,
+            send=send_reply,
+            max_concurrent_runs=settings.telegram_concurrent_updates,
+        )
+    return _coalescer
+
+
+def reset_message_coalescer() -> None:
+    """Reset the coalescer instance (useful for testing)."""
+    global _coalescer
+    _coalescer = None
 
 
 # Handler instance for registration
@@ -6,7 +6,11 @@ from telegram import Update
 from telegram.ext import CommandHandler, ContextTypes
 
 from app.bot.messages import ERROR_LLM_UNAVAILABLE
-from app.bot.sender import send_fallback_response, send_wine_recommendations
+from app.bot.sender import (
+    send_fallback_response,
+    send_rate_limited,
+    send_wine_recommendations,
+)
 from app.core.database import async_session_maker
 from app.services.sommelier import SommelierService
 from app.services.telegram_bot import TelegramBotService
@@ -89,7 +93,9 @@ async def start_command(
         logger.exception("Error handling /start for user %s: %s", telegram_id, e)
 
         # Send error message (always Russian — service targets RU)
-        await update.message.reply_text(ERROR_LLM_UNAVAILABLE)
+        await send_rate_limited(
+            update, lambda: update.message.reply_text(ERROR_LLM_UNAVAILABLE), first=True,
+        )
 
 
 # Handler instance for registration
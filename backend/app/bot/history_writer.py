@@ -0,0 +1,352 @@
+"""Write-behind persistence of Telegram conversation turns.
+
+Saving a turn (user message, reply, conversation timestamp) used to happen
+before the reply was sent, so database latency sat in front of the user.
+With TELEGRAM_WRITE_BEHIND_ENABLED the bot hands the turn to HistoryWriter
+and replies right away; a background task saves queued turns in batches,
+one transaction per batch.
+
+- Durability: every queued turn is appended to a JSONL journal before
+  enqueue() returns and the journal is compacted after each flush, so turns
+  not yet saved when the process dies are replayed on the next start().
+- Idempotency: message ids are assigned at enqueue time and rows that
+  already exist are skipped, so a replayed or retried batch is not saved
+  twice.
+- Retries: while the database is unavailable (connection or operational
+  errors) turns stay queued and journaled, and the flush is retried with
+  capped exponential backoff for as long as it takes. Only a turn the
+  database rejects (an IntegrityError, e.g. its conversation was deleted)
+  is dropped and logged; the rest of its batch is still saved.
+- Consistency: pending_for() exposes unsaved turns, which
+  TelegramBotService merges into the history of the chat's next message.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import tempfile
+import time
+import uuid
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Optional
+
+from sqlalchemy.exc import DataError, IntegrityError
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.config import get_settings
+from app.core.metrics import (
+    BOT_HISTORY_DROPPED,
+    BOT_HISTORY_FLUSH_ERRORS,
+    BOT_HISTORY_FLUSH_SECONDS,
+    BOT_HISTORY_PENDING,
+)
+from app.models.message import MessageRole
+from app.repositories.conversation import ConversationRepository
+from app.repositories.message import MessageRepository
+
+logger = logging.getLogger(__name__)
+
+# Longest pause between retries of a failing flush (seconds)
+MAX_RETRY_BACKOFF = 30.0
+
+# Errors for which retrying the same turn cannot succeed
+PERMANENT_ERRORS = (IntegrityError, DataError)
+
+
+@dataclass(frozen=True)
+class PendingTurn:
+    """A user message and its reply waiting to be saved."""
+
+    conversation_id: uuid.UUID
+    user_message_id: uuid.UUID
+    user_content: str
+    user_sent_at: datetime
+    assistant_message_id: uuid.UUID
+    assistant_content: str
+    replied_at: datetime
+
+    def to_json(self) -> str:
+        return json.dumps({
+            key: str(value) if isinstance(value, uuid.UUID)
+            else value.isoformat() if isinstance(value, datetime)
+            else value
+            for key, value in asdict(self).items()
+        }, ensure_ascii=False)
+
+    @classmethod
+    def from_json(cls, line: str) -> "PendingTurn":
+        data = json.loads(line)
+        return cls(
+            conversation_id=uuid.UUID(data["conversation_id"]),
+            user_message_id=uuid.UUID(data["user_message_id"]),
+            user_content=data["user_content"],
+            user_sent_at=datetime.fromisoformat(data["user_sent_at"]),
+            assistant_message_id=uuid.UUID(data["assistant_message_id"]),
+            assistant_content=data["assistant_content"],
+            replied_at=datetime.fromisoformat(data["replied_at"]),
+        )
+
+    def message_rows(self) -> list[dict]:
+        """Column values of the two messages."""
+        return [
+            {
+                "id": self.user_message_id,
+                "conversation_id": self.conversation_id,
+                "role": MessageRole.USER,
+                "content": self.user_content,
+                "created_at": self.user_sent_at,
+                "is_welcome": False,
+            },
+            {
+                "id": self.assistant_message_id,
+                "conversation_id": self.conversation_id,
+                "role": MessageRole.ASSISTANT,
+                "content": self.assistant_content,
+                "created_at": self.replied_at,
+                "is_welcome": False,
+            },
+        ]
+
+
+class HistoryWriter:
+    """Journaled queue of turns, saved by a background task in batches.
+
+    Args:
+        session_factory: Sessions for the flush transactions
+        journal_path: JSONL file of turns not yet saved (None = memory only)
+        flush_interval: Seconds to collect turns before a flush
+        batch_size: Max turns per flush transaction
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker,
+        journal_path: Optional[str] = None,
+        flush_interval: float = 0.2,
+        batch_size: int = 100,
+    ):
+        self.session_factory = session_factory
+        self.journal_path = Path(journal_path) if journal_path else None
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self._pending: list[PendingTurn] = []
+        self._journal = None
+        self._wake = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def start(self) -> None:
+        """Replay the journal and start the flush task."""
+        if self.journal_path is not None:
+            self.journal_path.parent.mkdir(parents=True, exist_ok=True)
+            replayed = self._read_journal()
+            if replayed:
+                logger.info("Replaying %d unsaved turns from journal", len(replayed))
+                self._pending.extend(replayed)
+                BOT_HISTORY_PENDING.inc(len(replayed))
+                self._wake.set()
+            self._journal = open(self.journal_path, "a", encoding="utf-8")
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    def enqueue(
+        self,
+        conversation_id: uuid.UUID,
+        user_content: str,
+        assistant_content: str,
+        user_sent_at: Optional[datetime] = None,
+    ) -> PendingTurn:
+        """Queue a turn for saving; returns once it is journaled."""
+        replied_at = datetime.now(timezone.utc)
+        sent_at = user_sent_at or replied_at
+        turn = PendingTurn(
+            conversation_id=conversation_id,
+            user_message_id=uuid.uuid4(),
+            user_content=user_content,
+            user_sent_at=sent_at,
+            assistant_message_id=uuid.uuid4(),
+            assistant_content=assistant_content,
+            # The reply must sort after the question under (created_at, id)
+            replied_at=max(replied_at, sent_at + timedelta(microseconds=1)),
+        )
+        if self._journal is not None:
+            self._journal.write(turn.to_json() + "\n")
+            self._journal.flush()
+        self._pending.append(turn)
+        BOT_HISTORY_PENDING.inc()
+        self._wake.set()
+        return turn
+
+    def pending_for(self, conversation_id: uuid.UUID) -> list[PendingTurn]:
+        """Unsaved turns of a conversation, oldest first."""
+        return [t for t in self._pending if t.conversation_id == conversation_id]
+
+    async def flush(self) -> bool:
+        """Save everything queued so far.
+
+        Returns False if the database could not be reached; the unsaved
+        turns stay queued and journaled for the next attempt.
+        """
+        async with self._flush_lock:
+            while self._pending:
+                batch = self._pending[: self.batch_size]
+                try:
+                    await self._save_batch(batch)
+                except Exception as e:
+                    BOT_HISTORY_FLUSH_ERRORS.inc()
+                    logger.warning(
+                        "History flush failed, keeping %d turns queued: %s",
+                        len(self._pending), e,
+                    )
+                    return False
+                # enqueue() only appends, so the batch is still the prefix
+                del self._pending[: len(batch)]
+                BOT_HISTORY_PENDING.dec(len(batch))
+                self._compact_journal()
+        return True
+
+    async def close(self) -> None:
+        """Stop the flush task after one last attempt to save queued turns.
+
+        Turns that cannot be saved now stay in the journal for the next start.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if not await self.flush():
+            logger.warning("Keeping %d unsaved turns in the journal", len(self._pending))
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+
+    async def _run(self) -> None:
+        failures = 0
+        while True:
+            await self._wake.wait()
+            # Let a batch build up
+            await asyncio.sleep(self.flush_interval)
+            self._wake.clear()
+            if await self.flush():
+                failures = 0
+                continue
+            # Database unavailable: back off, then try again
+            delay = min(MAX_RETRY_BACKOFF, 0.5 * 2 ** failures)
+            failures += 1
+            await asyncio.sleep(delay)
+            self._wake.set()
+
+    async def _save_batch(self, batch: list[PendingTurn]) -> None:
+        """Save a batch; raises (keeping it queued) unless the error is permanent."""
+        try:
+            await self._save(batch)
+            return
+        except PERMANENT_ERRORS as e:
+            BOT_HISTORY_FLUSH_ERRORS.inc()
+            logger.warning("History batch rejected, saving turn by turn: %s", e)
+
+        # Isolate the turns the database rejects; already saved ones are skipped
+        for turn in batch:
+            try:
+                await self._save([turn])
+            except PERMANENT_ERRORS as e:
+                BOT_HISTORY_DROPPED.inc()
+                logger.error(
+                    "Dropping turn of conversation %s: %s", turn.conversation_id, e,
+                )
+
+    async def _save(self, turns: list[PendingTurn]) -> None:
+        start = time.perf_counter()
+        async with self.session_factory() as db:
+            messages = MessageRepository(db)
+            existing = await messages.get_existing_ids(
+                [turn.user_message_id for turn in turns]
+            )
+            rows = [
+                row
+                for turn in turns
+                if turn.user_message_id not in existing
+                for row in turn.message_rows()
+            ]
+            await messages.bulk_create(rows)
+
+            latest: dict[uuid.UUID, datetime] = {}
+            for turn in turns:
+                latest[turn.conversation_id] = max(
+                    turn.replied_at, latest.get(turn.conversation_id, turn.replied_at),
+                )
+            conversations = ConversationRepository(db)
+            for conversation_id, updated_at in latest.items():
+                await conversations.touch(conversation_id, updated_at)
+
+            await db.commit()
+        BOT_HISTORY_FLUSH_SECONDS.observe(time.perf_counter() - start)
+
+    def _read_journal(self) -> list[PendingTurn]:
+        turns = []
+        try:
+            with open(self.journal_path, encoding="utf-8") as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    try:
+                        turns.append(PendingTurn.from_json(line))
+                    except (ValueError, KeyError) as e:
+                        # A torn last line from a crash mid-write
+                        logger.warning("Skipping unreadable journal entry: %s", e)
+        except FileNotFoundError:
+            pass
+        return turns
+
+    def _compact_journal(self) -> None:
+        """Rewrite the journal with only the turns still pending."""
+        if self.journal_path is None:
+            return
+        if self._journal is not None:
+            self._journal.close()
+        tmp_path = self.journal_path.with_name(self.journal_path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for turn in self._pending:
+                f.write(turn.to_json() + "\n")
+        os.replace(tmp_path, self.journal_path)
+        if self._journal is not None:
+            self._journal = open(self.journal_path, "a", encoding="utf-8")
+
+
+# Singleton instance
+_history_writer: Optional[HistoryWriter] = None
+
+
+def get_history_writer() -> Optional[HistoryWriter]:
+    """Get or create the history writer singleton (None if write-behind is off)."""
+    global _history_writer
+    settings = get_settings()
+    if not settings.telegram_write_behind_enabled:
+        return None
+    if _history_writer is None:
+        from app.core.database import async_session_maker
+
+        _history_writer = HistoryWriter(
+            async_session_maker,
+            journal_path=settings.telegram_write_behind_journal_path
+            or os.path.join(tempfile.gettempdir(), "getmywine-history-journal.jsonl"),
+            flush_interval=settings.telegram_write_behind_flush_ms / 1000,
+            batch_size=settings.telegram_write_behind_batch_size,
+        )
+    return _history_writer
+
+
+def reset_history_writer():
+    """Reset history writer singleton (useful for testing)."""
+    global _history_writer
+    _history_writer = None
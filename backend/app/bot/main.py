@@ -25,10 +25,16 @@ def create_application() -> Application:
             "Please set it in your environment variables."
         )
 
-    # Build application with token
+    from app.bot.update_processor import ChatOrderedUpdateProcessor
+
+    # Build application with token; chats are handled concurrently,
+    # each one in order
     application = (
         Application.builder()
         .token(settings.telegram_bot_token)
+        .concurrent_updates(
+            ChatOrderedUpdateProcessor(settings.telegram_concurrent_updates)
+        )
         .build()
     )
 
@@ -51,11 +57,30 @@ async def run_polling() -> None:
     logger.info("Starting Telegram bot in polling mode...")
     application = create_application()
 
+    # Write-behind history: replay turns left unsaved by the last run
+    from app.bot.history_writer import get_history_writer
+    history_writer = get_history_writer()
+    if history_writer is not None:
+        history_writer.start()
+
     # Initialize and start
     await application.initialize()
     await application.start()
     await application.updater.start_polling(drop_pending_updates=True)
 
+    # Pre-render photo variants of the catalog images in the background
+    from app.bot.photo_renderer import get_photo_renderer
+    from app.bot.utils import WINE_IMAGES_DIR
+    renderer = get_photo_renderer()
+    warm_task = asyncio.create_task(renderer.warm(
+        sorted(WINE_IMAGES_DIR.glob("*.png")), settings.telegram_wine_photo_height,
+    ))
+
+    metrics_server = None
+    if settings.bot_metrics_port:
+        from app.core.metrics import start_metrics_server
+        metrics_server = await start_metrics_server(settings.bot_metrics_port)
+
     logger.info("Bot is running. Press Ctrl+C to stop.")
 
     # Run until stopped
@@ -67,10 +92,31 @@ async def run_polling() -> None:
         pass
     finally:
         logger.info("Shutting down bot...")
+        if metrics_server is not None:
+            metrics_server.close()
         await application.updater.stop()
+
+        from app.bot.handlers.message import get_message_coalescer
+        coalescer = get_message_coalescer()
+        if coalescer is not None:
+            await coalescer.close()
+
         await application.stop()
         await application.shutdown()
 
+        if history_writer is not None:
+            await history_writer.close()
+
+        warm_task.cancel()
+        renderer.close()
+
+        from app.core.http_clients import close_http_clients
+        from app.services.embedding_cache import get_embedding_cache
+        cache = get_embedding_cache()
+        if cache is not None:
+            cache.save()
+        await close_http_clients()
+
 
 async def run_webhook() -> None:
     """Run bot in webhook mode.
@@ -0,0 +1,150 @@
+"""Telegram file_id cache for wine photos.
+
+The catalog has a handful of bottle images, yet every recommendation used to
+re-render and re-upload the same PNG. After the first upload Telegram returns
+a file_id that the bot can send again without any upload; this cache keeps
+it per image, together with what the upload was rendered from: the image's
+content hash and the target height (TELEGRAM_WINE_PHOTO_HEIGHT). When either
+changes the entry no longer matches and the photo is uploaded again.
+
+file_ids are only valid for the bot that uploaded them, so the cache is
+namespaced by bot id. It can optionally be persisted to a JSON file so it
+survives restarts.
+"""
+
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Optional
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+# image path -> (mtime_ns, size, sha256): avoids re-reading unchanged files
+_hashes: dict[str, tuple[int, int, str]] = {}
+
+
+def file_content_hash(image_path: Path) -> Optional[str]:
+    """SHA-256 of the image file (None if unreadable); re-read only when it changes."""
+    key = str(image_path)
+    try:
+        stat = os.stat(image_path)
+        cached = _hashes.get(key)
+        if cached is not None and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+            return cached[2]
+        digest = hashlib.sha256(Path(image_path).read_bytes()).hexdigest()
+    except OSError:
+        return None
+    _hashes[key] = (stat.st_mtime_ns, stat.st_size, digest)
+    return digest
+
+
+class PhotoFileIdCache:
+    """Maps wine image path -> Telegram file_id of its rendered upload."""
+
+    def __init__(self, bot_id: str = "", path: Optional[str] = None):
+        self.bot_id = bot_id
+        self.path = Path(path) if path else None
+        self.hits = 0
+        self.misses = 0
+        # image path -> {"hash": ..., "height": ..., "file_id": ...}
+        self._entries: dict[str, dict] = {}
+
+        if self.path is not None:
+            self.load()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, image_path: Path, height: int) -> Optional[str]:
+        """file_id of this image rendered at `height`, or None (counts hit/miss)."""
+        entry = self._entries.get(str(image_path))
+        if (
+            entry is not None
+            and entry["height"] == height
+            and entry["hash"] == file_content_hash(image_path)
+        ):
+            self.hits += 1
+            return entry["file_id"]
+        self.misses += 1
+        return None
+
+    def set(self, image_path: Path, height: int, file_id: str) -> None:
+        """Remember the file_id of a fresh upload and persist the cache."""
+        content_hash = file_content_hash(image_path)
+        if content_hash is None:
+            return
+        self._entries[str(image_path)] = {
+            "hash": content_hash,
+            "height": height,
+            "file_id": file_id,
+        }
+        self.save()
+
+    def invalidate(self, image_path: Path) -> None:
+        """Forget an image's file_id (e.g. Telegram rejected it)."""
+        if self._entries.pop(str(image_path), None) is not None:
+            self.save()
+
+    # -------------------------------------------------------------------------
+    # Persistence
+    # -------------------------------------------------------------------------
+
+    def save(self) -> None:
+        """Write entries to disk (atomic replace). No-op without a path."""
+        if self.path is None:
+            return
+        data = {"bot_id": self.bot_id, "entries": self._entries}
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+            with open(tmp_path, "w") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.warning("Failed to persist photo file_id cache to %s: %s", self.path, e)
+
+    def load(self) -> None:
+        """Load entries from disk; entries of another bot are dropped."""
+        if self.path is None or not self.path.exists():
+            return
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning("Failed to load photo file_id cache from %s: %s", self.path, e)
+            return
+
+        if data.get("bot_id") != self.bot_id:
+            logger.info("Photo file_id cache at %s belongs to another bot, ignoring", self.path)
+            return
+        self._entries = dict(data.get("entries", {}))
+        logger.info("Loaded %d cached photo file_ids from %s", len(self._entries), self.path)
+
+
+# Singleton instance
+_photo_cache: Optional[PhotoFileIdCache] = None
+
+
+def get_photo_cache() -> Optional[PhotoFileIdCache]:
+    """Get or create the photo file_id cache singleton (None if disabled in config)."""
+    global _photo_cache
+    settings = get_settings()
+    if not settings.telegram_photo_cache_enabled:
+        return None
+    if _photo_cache is None:
+        _photo_cache = PhotoFileIdCache(
+            # Bot tokens are "<bot id>:<secret>"
+            bot_id=settings.telegram_bot_token.split(":", 1)[0],
+            path=settings.telegram_photo_cache_path or None,
+        )
+    return _photo_cache
+
+
+def reset_photo_cache():
+    """Reset photo cache singleton (useful for testing)."""
+    global _photo_cache
+    _photo_cache = None
@@ -0,0 +1,238 @@
+"""Pre-rendered wine photo variants, rendered off the event loop.
+
+Telegram photos are the bottle image scaled to TELEGRAM_WINE_PHOTO_HEIGHT and
+centred on a wide white canvas. Rendering (PIL open, LANCZOS resize,
+composite, PNG encode) takes tens of milliseconds, which used to stall every
+other chat when done inside the event loop on each send.
+
+PhotoRenderCache keeps rendered variants as PNG files on disk, keyed by the
+source image's content hash and the target height, and memory-maps them.
+Misses are rendered in a process pool; the event loop never touches PIL.
+The bot renders the whole catalog in the background at startup (warm()).
+get() returns a zero-copy view of the mapping; PhotoReader streams it into
+an upload without copying the whole file.
+"""
+
+import asyncio
+import io
+import logging
+import mmap
+import multiprocessing
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Iterable, Optional
+
+from PIL import Image
+
+from app.bot.photo_cache import file_content_hash
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+# Target width for Telegram inline photos (px)
+TELEGRAM_PHOTO_WIDTH = 800
+
+
+def render_wine_photo(image_path: str, target_height: int) -> bytes:
+    """Resize wine bottle image and center it on a white background.
+
+    Creates a wide image (800px) with white background and the bottle
+    centered, so it looks clean in Telegram chat. Runs in a worker process.
+    """
+    img = Image.open(image_path).convert("RGBA")
+
+    # Scale to target height, preserving aspect ratio
+    scale = target_height / img.height
+    new_w = int(img.width * scale)
+    new_h = target_height
+    img = img.resize((new_w, new_h), Image.LANCZOS)
+
+    # Create white canvas: full Telegram width × target height
+    canvas = Image.new("RGB", (TELEGRAM_PHOTO_WIDTH, new_h), (255, 255, 255))
+
+    # Center the bottle horizontally
+    x_offset = (TELEGRAM_PHOTO_WIDTH - new_w) // 2
+    canvas.paste(img, (x_offset, 0), mask=img)
+
+    buf = io.BytesIO()
+    canvas.save(buf, format="PNG")
+    return buf.getvalue()
+
+
+class PhotoReader(io.RawIOBase):
+    """Seekable read-only file over a buffer, for streaming an upload.
+
+    Reads copy only the requested chunk, never the whole buffer.
+    """
+
+    def __init__(self, buffer: memoryview):
+        self._buffer = buffer
+        self._position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        n = max(0, min(len(b), len(self._buffer) - self._position))
+        b[:n] = self._buffer[self._position:self._position + n]
+        self._position += n
+        return n
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        base = {io.SEEK_SET: 0, io.SEEK_CUR: self._position, io.SEEK_END: len(self._buffer)}
+        self._position = max(0, base[whence] + offset)
+        return self._position
+
+    def tell(self) -> int:
+        return self._position
+
+
+class PhotoRenderCache:
+    """Disk + mmap cache of rendered photo variants.
+
+    Args:
+        directory: Where rendered PNGs are stored
+        max_workers: Size of the rendering process pool
+    """
+
+    def __init__(self, directory: str, max_workers: int = 2):
+        self.directory = Path(directory)
+        self.max_workers = max_workers
+        self.renders = 0
+        self._pool: Optional[ProcessPoolExecutor] = None
+        # image path -> (variant file name, mapped file): one variant per image
+        self._mapped: dict[str, tuple[str, mmap.mmap]] = {}
+        # variant file name -> render in progress (concurrent misses share it)
+        self._rendering: dict[str, asyncio.Future] = {}
+
+    async def get(self, image_path: Path, height: int) -> memoryview:
+        """PNG of the image rendered at `height` (a view of the mapped file)."""
+        content_hash = await asyncio.to_thread(file_content_hash, image_path)
+        if content_hash is None:
+            raise FileNotFoundError(image_path)
+        name = f"{content_hash}_{height}.png"
+
+        mapped = self._mapped.get(str(image_path))
+        if mapped is None or mapped[0] != name:
+            mapped_file = await asyncio.to_thread(self._map, name)
+            if mapped_file is None:
+                await self._render(image_path, height, name)
+                mapped_file = await asyncio.to_thread(self._map, name)
+                if mapped_file is None:
+                    raise OSError(f"Rendered photo {name} is missing or empty")
+            self._remember(str(image_path), name, mapped_file)
+            mapped = self._mapped[str(image_path)]
+        return memoryview(mapped[1])
+
+    async def warm(self, image_paths: Iterable[Path], height: int) -> int:
+        """Render every image that has no variant for `height` yet."""
+        rendered = 0
+        for image_path in image_paths:
+            try:
+                before = self.renders
+                await self.get(image_path, height)
+                rendered += self.renders - before
+            except Exception as e:
+                logger.warning("Failed to pre-render %s: %s", image_path, e)
+        logger.info("Photo render cache warm: %d rendered", rendered)
+        return rendered
+
+    def close(self) -> None:
+        """Stop the process pool and unmap files."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+        for _, mapped_file in self._mapped.values():
+            _unmap(mapped_file)
+        self._mapped.clear()
+
+    async def _render(self, image_path: Path, height: int, name: str) -> None:
+        in_flight = self._rendering.get(name)
+        if in_flight is not None:
+            await asyncio.shield(in_flight)
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        self._rendering[name] = future
+        try:
+            data = await asyncio.get_running_loop().run_in_executor(
+                self._get_pool(), render_wine_photo, str(image_path), height,
+            )
+            await asyncio.to_thread(self._write, name, data)
+            self.renders += 1
+            future.set_result(None)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # mark retrieved: there may be no other waiter
+            raise
+        finally:
+            del self._rendering[name]
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # spawn: forking a process that already runs threads can deadlock
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._pool
+
+    def _write(self, name: str, data: bytes) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.directory / f"{name}.{os.getpid()}.tmp"
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, self.directory / name)
+
+    def _map(self, name: str) -> Optional[mmap.mmap]:
+        try:
+            with open(self.directory / name, "rb") as f:
+                return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (FileNotFoundError, ValueError):  # ValueError: empty file
+            return None
+
+    def _remember(self, key: str, name: str, mapped_file: mmap.mmap) -> None:
+        previous = self._mapped.get(key)
+        self._mapped[key] = (name, mapped_file)
+        if previous is not None and previous[1] is not mapped_file:
+            _unmap(previous[1])
+
+
+def _unmap(mapped_file: mmap.mmap) -> None:
+    try:
+        mapped_file.close()
+    except BufferError:
+        # A send still holds a view; the mapping is released with it
+        pass
+
+
+# Singleton instance
+_photo_renderer: Optional[PhotoRenderCache] = None
+
+
+def get_photo_renderer() -> PhotoRenderCache:
+    """Get or create the photo render cache singleton."""
+    global _photo_renderer
+    if _photo_renderer is None:
+        settings = get_settings()
+        _photo_renderer = PhotoRenderCache(
+            directory=settings.telegram_photo_render_dir
+            or os.path.join(tempfile.gettempdir(), "getmywine-photo-renders"),
+            max_workers=settings.telegram_photo_render_workers,
+        )
+    return _photo_renderer
+
+
+def reset_photo_renderer():
+    """Reset photo render cache singleton (useful for testing)."""
+    global _photo_renderer
+    if _photo_renderer is not None:
+        _photo_renderer.close()
+    _photo_renderer = None
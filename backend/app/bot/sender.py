@@ -4,16 +4,18 @@ Extracted from handlers/start.py and handlers/message.py
 to eliminate duplication (DRY).
 """
 
-import io
 import json
 import logging
 import re
 from pathlib import Path
 
-from PIL import Image
 from telegram import InputFile, Update
+from telegram.error import BadRequest
 
+from app.bot.dispatcher import get_outbound_dispatcher
 from app.bot.formatters import format_wine_photo_caption
+from app.bot.photo_cache import get_photo_cache
+from app.bot.photo_renderer import PhotoReader, get_photo_renderer
 from app.bot.utils import get_wine_image_path, sanitize_telegram_markdown
 from app.config import get_settings
 from app.services.sommelier_prompts import parse_structured_response, strip_markdown
@@ -25,37 +27,68 @@ _SECTION_MARKERS_RE = re.compile(
 
 logger = logging.getLogger(__name__)
 
-# Target width for Telegram inline photos (px)
-_TELEGRAM_PHOTO_WIDTH = 800
 
+async def send_rate_limited(update: Update, call, first: bool = False):
+    """Run one Bot API call for this update through the outbound dispatcher.
 
-def prepare_wine_photo(image_path: Path) -> io.BytesIO:
-    """Resize wine bottle image and center on white background.
+    Keeps the chat's messages in order and within Telegram's flood limits;
+    `first` marks the opening message of a reply (served with priority).
+    """
+    return await get_outbound_dispatcher().send(update.effective_chat.id, call, first=first)
+
+
+async def prepare_wine_photo(image_path: Path) -> memoryview:
+    """Wine bottle image centered on a wide white canvas, as a PNG buffer.
 
-    Creates a wide image (800px) with white background and the bottle
-    centered, so it looks clean in Telegram chat.
+    Variants are pre-rendered/cached by PhotoRenderCache and rendered in a
+    worker process on a miss, so no PIL work happens on the event loop.
     Target height is configured via TELEGRAM_WINE_PHOTO_HEIGHT env var.
     """
-    target_height = get_settings().telegram_wine_photo_height
-    img = Image.open(image_path).convert("RGBA")
+    height = get_settings().telegram_wine_photo_height
+    return await get_photo_renderer().get(image_path, height)
 
-    # Scale to target height, preserving aspect ratio
-    scale = target_height / img.height
-    new_w = int(img.width * scale)
-    new_h = target_height
-    img = img.resize((new_w, new_h), Image.LANCZOS)
 
-    # Create white canvas: full Telegram width × target height
-    canvas = Image.new("RGB", (_TELEGRAM_PHOTO_WIDTH, new_h), (255, 255, 255))
-
-    # Center the bottle horizontally
-    x_offset = (_TELEGRAM_PHOTO_WIDTH - new_w) // 2
-    canvas.paste(img, (x_offset, 0), mask=img)
+async def send_wine_photo(
+    update: Update,
+    image_path: Path,
+    caption: str,
+    parse_mode: str | None = None,
+) -> None:
+    """Send a wine photo, reusing Telegram's file_id of an earlier upload.
 
-    buf = io.BytesIO()
-    canvas.save(buf, format="PNG")
-    buf.seek(0)
-    return buf
+    The first send renders and uploads the PNG; the file_id Telegram returns
+    is cached (see PhotoFileIdCache) and later sends skip render and upload.
+    """
+    cache = get_photo_cache()
+    height = get_settings().telegram_wine_photo_height
+
+    file_id = cache.get(image_path, height) if cache is not None else None
+    if file_id is not None:
+        try:
+            await send_rate_limited(update, lambda: update.message.reply_photo(
+                photo=file_id,
+                caption=caption,
+                parse_mode=parse_mode,
+            ))
+            return
+        except BadRequest as e:
+            logger.warning("Cached file_id for %s rejected (%s), re-uploading", image_path, e)
+            cache.invalidate(image_path)
+
+    data = await prepare_wine_photo(image_path)
+    # Streamed from the mapped file; a new reader per attempt (RetryAfter)
+    sent = await send_rate_limited(update, lambda: update.message.reply_photo(
+        photo=InputFile(PhotoReader(data), filename="wine.png", read_file_handle=False),
+        caption=caption,
+        parse_mode=parse_mode,
+    ))
+
+    # Largest size is last; its file_id resends the original upload
+    photo_sizes = getattr(sent, "photo", None)
+    if cache is not None and photo_sizes:
+        file_id = getattr(photo_sizes[-1], "file_id", None)
+        if isinstance(file_id, str):
+            cache.set(image_path, height, file_id)
 
 
 async def send_wine_recommendations(
@@ -89,17 +122,17 @@ async def send_wine_recommendations(
         if parsed.closing:
             parts.append(parsed.closing)
         combined = "\n\n".join(parts)
-        await update.message.reply_text(
+        await send_rate_limited(update, lambda: update.message.reply_text(
             sanitize_telegram_markdown(combined),
             parse_mode="Markdown",
-        )
+        ), first=True)
         return True
 
     # 1. Intro
-    await update.message.reply_text(
+    await send_rate_limited(update, lambda: update.message.reply_text(
         sanitize_telegram_markdown(parsed.intro),
         parse_mode="Markdown",
-    )
+    ), first=True)
 
     # 2-4. Wine sections with photos
     for i, wine_text in enumerate(parsed.wines):
@@ -108,24 +141,20 @@ async def send_wine_recommendations(
 
         if image_path:
             caption = sanitize_telegram_markdown(wine_text)[:1024]
-            photo_buf = prepare_wine_photo(image_path)
-            await update.message.reply_photo(
-                photo=InputFile(photo_buf, filename="wine.png"),
-                caption=caption,
-                parse_mode="Markdown",
-            )
+            await send_wine_photo(update, image_path, caption, parse_mode="Markdown")
         else:
-            await update.message.reply_text(
-                sanitize_telegram_markdown(wine_text),
+            text = sanitize_telegram_markdown(wine_text)
+            await send_rate_limited(update, lambda text=text: update.message.reply_text(
+                text,
                 parse_mode="Markdown",
-            )
+            ))
 
     # 5. Closing
     if parsed.closing:
-        await update.message.reply_text(
+        await send_rate_limited(update, lambda: update.message.reply_text(
             sanitize_telegram_markdown(parsed.closing),
             parse_mode="Markdown",
-        )
+        ))
 
     return True
 
@@ -200,18 +229,14 @@ async def send_fallback_response(
         logger.warning("Fallback response text is empty after cleanup, using error message")
         from app.bot.messages import ERROR_LLM_UNAVAILABLE
         clean_text = ERROR_LLM_UNAVAILABLE
-    await update.message.reply_text(
+    await send_rate_limited(update, lambda: update.message.reply_text(
         sanitize_telegram_markdown(clean_text),
         parse_mode="Markdown",
-    )
+    ), first=True)
 
     for wine in wines:
         image_path = get_wine_image_path(wine)
         if not image_path:
             continue
         caption = format_wine_photo_caption(wine, language)
-        photo_buf = prepare_wine_photo(image_path)
-        await update.message.reply_photo(
-            photo=InputFile(photo_buf, filename="wine.png"),
-            caption=caption,
-        )
+        await send_wine_photo(update, image_path, caption)
@@ -0,0 +1,117 @@
+"""Concurrent update processing that keeps each chat in order.
+
+python-telegram-bot handles updates one after another by default, so one
+user's agent loop blocks everybody else. ChatOrderedUpdateProcessor runs
+updates of different chats in parallel, bounded by a worker limit, while
+updates of the same chat still run strictly in arrival order.
+
+A waiting update does not hold a worker slot: it first waits for its chat,
+then for a slot, so a user sending many messages cannot starve other chats.
+"""
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Optional
+
+from telegram import Update
+from telegram.ext import BaseUpdateProcessor
+
+from app.core.metrics import (
+    BOT_UPDATE_WAIT_SECONDS,
+    BOT_UPDATES_IN_PROGRESS,
+    BOT_UPDATES_QUEUED,
+)
+
+# Upper bound on updates accepted (queued + running) before PTB itself waits
+MAX_PENDING_UPDATES = 1000
+
+
+class ChatOrderedUpdateProcessor(BaseUpdateProcessor):
+    """Process updates concurrently with per-chat ordering.
+
+    Args:
+        max_workers: Maximum number of updates handled at the same time
+        max_pending_updates: Maximum number of updates accepted (waiting or
+            running); this is the limit PTB's own semaphore enforces
+    """
+
+    def __init__(self, max_workers: int, max_pending_updates: int = MAX_PENDING_UPDATES):
+        if max_workers < 1:
+            raise ValueError("max_workers must be a positive integer")
+        super().__init__(max(max_pending_updates, max_workers))
+        self.max_workers = max_workers
+        self._workers = asyncio.Semaphore(max_workers)
+        # chat_id -> (lock, number of updates holding or waiting for it)
+        self._chats: dict[int, tuple[asyncio.Lock, int]] = {}
+        self._running = 0
+
+    @property
+    def queued_updates(self) -> int:
+        """Number of updates waiting for their chat or a worker slot."""
+        return self.current_concurrent_updates - self.running_updates
+
+    @property
+    def running_updates(self) -> int:
+        """Number of updates currently being handled."""
+        return self._running
+
+    async def do_process_update(
+        self,
+        update: object,
+        coroutine: Awaitable[Any],
+    ) -> None:
+        """Wait for the chat and a worker slot, then run the handler coroutine."""
+        enqueued_at = time.perf_counter()
+        BOT_UPDATES_QUEUED.inc()
+        queued = True
+        try:
+            async with self._chat_turn(_chat_id(update)), self._workers:
+                BOT_UPDATES_QUEUED.dec()
+                queued = False
+                BOT_UPDATE_WAIT_SECONDS.observe(time.perf_counter() - enqueued_at)
+                BOT_UPDATES_IN_PROGRESS.inc()
+                self._running += 1
+                try:
+                    await coroutine
+                finally:
+                    self._running -= 1
+                    BOT_UPDATES_IN_PROGRESS.dec()
+        finally:
+            if queued:
+                # Cancelled before the handler started
+                BOT_UPDATES_QUEUED.dec()
+                if asyncio.iscoroutine(coroutine):
+                    coroutine.close()
+
+    async def initialize(self) -> None:
+        """Nothing to set up."""
+
+    async def shutdown(self) -> None:
+        """Nothing to tear down; PTB waits for running updates itself."""
+
+    @asynccontextmanager
+    async def _chat_turn(self, chat_id: Optional[int]) -> AsyncIterator[None]:
+        """Hold the chat's lock; updates of one chat queue up in FIFO order."""
+        if chat_id is None:
+            yield
+            return
+
+        lock, users = self._chats.get(chat_id, (asyncio.Lock(), 0))
+        self._chats[chat_id] = (lock, users + 1)
+        try:
+            async with lock:
+                yield
+        finally:
+            lock, users = self._chats[chat_id]
+            if users <= 1:
+                del self._chats[chat_id]
+            else:
+                self._chats[chat_id] = (lock, users - 1)
+
+
+def _chat_id(update: object) -> Optional[int]:
+    """Chat the update belongs to (None for chatless updates like inline queries)."""
+    if isinstance(update, Update) and update.effective_chat is not None:
+        return update.effective_chat.id
+    return None
@@ -59,6 +59,7 @@ async def resolve_image_url(url: str) -> str:
 
 
 _STATIC_DIR = Path(__file__).resolve().parent.parent / "static"
+WINE_IMAGES_DIR = _STATIC_DIR / "images" / "wines"
 
 
 def get_wine_image_path(wine: Wine) -> Optional[Path]:
@@ -14,6 +14,12 @@ class Settings(BaseSettings):
     jwt_secret: str = "change-me-in-production"
     jwt_algorithm: str = "HS256"
     jwt_expire_days: int = 7
+    auth_cache_ttl_seconds: int = 30  # Cache resolved users of authenticated requests (0 = off)
+
+    # Password hashing
+    bcrypt_rounds: int = 12  # bcrypt cost factor for new hashes
+    password_hash_workers: int = 2  # Threads running bcrypt off the event loop
+    password_rehash_on_login: bool = True  # Re-hash on login when the stored cost differs
 
     # Email
     smtp_host: str = ""
@@ -55,6 +61,37 @@ class Settings(BaseSettings):
     # "json_schema" (OpenAI strict) or "json_object" (wider compatibility, e.g. cloud.ru)
     llm_response_format: str = "json_schema"
 
+    # Per-task routing of auxiliary LLM calls (the agent loop uses the settings above).
+    # Empty provider/model = llm_provider/llm_model, 0 max_tokens = llm_max_tokens,
+    # 0 timeout = HTTP client timeout. Point naming/insights at a small fast model
+    # (e.g. "openai/gpt-4o-mini") so they don't compete with the sommelier.
+    llm_welcome_provider: str = ""
+    llm_welcome_model: str = ""
+    llm_welcome_max_tokens: int = 2000
+    llm_welcome_timeout_seconds: float = 0.0
+    llm_naming_provider: str = ""
+    llm_naming_model: str = ""
+    llm_naming_max_tokens: int = 50
+    llm_naming_timeout_seconds: float = 30.0
+    llm_insights_provider: str = ""
+    llm_insights_model: str = ""
+    llm_insights_max_tokens: int = 500
+    llm_insights_timeout_seconds: float = 60.0
+    # Structured-output repair retries: tool-use messages, so only "openrouter"
+    # (other providers fall back to llm_provider/llm_model)
+    llm_repair_provider: str = ""
+    llm_repair_model: str = ""
+    llm_repair_max_tokens: int = 0
+    llm_repair_timeout_seconds: float = 0.0
+
+    # Shared HTTP connection pool for LLM / embedding API clients
+    llm_http_max_connections: int = 100
+    llm_http_max_keepalive_connections: int = 20
+    llm_http_keepalive_expiry: float = 60.0  # Seconds an idle connection is kept
+    llm_http_timeout_seconds: float = 120.0
+    llm_http_connect_timeout_seconds: float = 10.0
+    llm_http2_enabled: bool = True  # Needs h2 (httpx[http2] in requirements.txt)
+
     # Conversation history
     llm_max_history_messages: int = 10  # How many previous messages to include
 
@@ -63,6 +100,22 @@ class Settings(BaseSettings):
     embedding_model: str = "BAAI/bge-m3"  # Model for query embeddings
     structured_output_max_retries: int = 2  # Retries after initial attempt (3 total)
 
+    # Query embedding cache (in front of get_query_embedding)
+    embedding_cache_enabled: bool = True
+    embedding_cache_max_size: int = 1000
+    embedding_cache_ttl_seconds: int = 86400  # 24 hours
+    embedding_cache_path: str = ""  # Optional JSON file to persist across restarts
+
+    # Semantic response cache (informational answers only)
+    response_cache_enabled: bool = True
+    response_cache_max_size: int = 500
+    response_cache_ttl_seconds: int = 86400  # 24 hours
+    response_cache_similarity_threshold: float = 0.95  # Cosine similarity
+
+    # Wine catalog snapshot (in-memory catalog for search_wines tool calls)
+    wine_catalog_snapshot_enabled: bool = True
+    wine_catalog_refresh_seconds: int = 30  # How often to re-check wines.updated_at
+
     # Events API (optional, for real-time events)
     calendarific_api_key: str = ""  # For holiday data
     events_country: str = "RU"
@@ -71,20 +124,44 @@ class Settings(BaseSettings):
     session_inactivity_minutes: int = 30  # Auto-close session after inactivity
     session_retention_days: int = 90  # Keep sessions for this many days
 
+    # Background jobs (session titles, LLM session insights)
+    jobs_enabled: bool = True  # Run them in a worker pool off the request path (False = titles inline)
+    job_workers: int = 2  # Concurrent jobs per web process
+    job_poll_seconds: float = 5.0  # Queue check interval when no job was announced
+    job_max_attempts: int = 5  # Attempts before a job is marked failed
+    job_retention_days: int = 7  # Completed jobs are deleted after this many days
+
     # Langfuse (LLM observability)
     langfuse_secret_key: str = ""
     langfuse_public_key: str = ""
     langfuse_host: str = "http://langfuse-web:3000"
     langfuse_tracing_enabled: bool = True
 
+    # Internal latency metrics (Prometheus text format)
+    metrics_port: int = 0  # Serve the web app's /metrics on this internal port (0 = off)
+    bot_metrics_port: int = 0  # Serve /metrics from the bot process (0 = off)
+
     # Telegram Bot
     telegram_bot_token: str = ""  # Bot token from @BotFather
     telegram_mode: str = "polling"  # "polling" or "webhook"
     telegram_webhook_url: str = ""  # Required for webhook mode
     enable_telegram_bot: bool = True  # Enable/disable bot
+    telegram_concurrent_updates: int = 8  # Updates handled in parallel (one at a time per chat)
+    telegram_debounce_ms: int = 800  # Merge a chat's messages sent within this window (0 = off)
+    telegram_global_rate: float = 25.0  # Outbound messages/second for the whole bot
+    telegram_chat_rate: float = 1.0  # Outbound messages/second per chat (after the burst)
+    telegram_chat_burst: int = 5  # Messages a chat may receive back to back (one full reply)
+    telegram_write_behind_enabled: bool = False  # Reply first, save the turn from a background queue
+    telegram_write_behind_journal_path: str = ""  # Unsaved turns (default: <tmp>/getmywine-history-journal.jsonl)
+    telegram_write_behind_flush_ms: int = 200  # Collect turns this long before a batch flush
+    telegram_write_behind_batch_size: int = 100  # Max turns per flush transaction
     enable_web: bool = True  # Enable/disable web server
     telegram_session_inactivity_hours: int = 24  # Session timeout for Telegram (hours)
     telegram_wine_photo_height: int = 460  # Target height for wine bottle photos (px)
+    telegram_photo_cache_enabled: bool = True  # Reuse Telegram file_ids of uploaded wine photos
+    telegram_photo_cache_path: str = ""  # Optional JSON file to persist file_ids across restarts
+    telegram_photo_render_dir: str = ""  # Rendered photo variants (default: <tmp>/getmywine-photo-renders)
+    telegram_photo_render_workers: int = 2  # Processes rendering photo variants
 
     model_config = {
         "env_file": str(_ENV_FILE),
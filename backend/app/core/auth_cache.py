@@ -0,0 +1,148 @@
+"""Short-lived cache for authenticated-request resolution.
+
+Every authenticated API call decodes the JWT cookie and loads the user row
+(get_current_user). Both results barely change, so they are cached in-process:
+
+- decoded token payloads, keyed by the full token string (which includes its
+  signature, so a cached payload is only returned for the exact token that
+  was verified) and dropped once the token expires;
+- a minimal user snapshot (id, email, flags, created_at), kept for a short
+  TTL and invalidated as soon as the ORM changes the user's password hash or
+  active flag in this process.
+
+Other worker processes see such a change when their TTL runs out.
+"""
+
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Optional
+
+from sqlalchemy import event, inspect
+
+from app.config import get_settings
+from app.models.user import User
+
+
+@dataclass(frozen=True)
+class CachedUser:
+    """Fields of a user needed to authorize a request."""
+
+    id: uuid.UUID
+    email: str
+    is_age_verified: bool
+    is_active: bool
+    created_at: datetime
+
+    @classmethod
+    def from_user(cls, user: User) -> "CachedUser":
+        return cls(
+            id=user.id,
+            email=user.email,
+            is_age_verified=user.is_age_verified,
+            is_active=user.is_active,
+            created_at=user.created_at,
+        )
+
+    def to_user(self) -> User:
+        """Transient (session-less) User carrying the cached fields."""
+        return User(
+            id=self.id,
+            email=self.email,
+            is_age_verified=self.is_age_verified,
+            is_active=self.is_active,
+            created_at=self.created_at,
+        )
+
+
+class AuthCache:
+    """Bounded LRU caches of decoded tokens and user snapshots."""
+
+    def __init__(self, user_ttl_seconds: float = 30, max_size: int = 10_000):
+        self.user_ttl_seconds = user_ttl_seconds
+        self.max_size = max_size
+        # token -> payload (expiry is the token's own "exp")
+        self._tokens: OrderedDict[str, dict[str, Any]] = OrderedDict()
+        # user id -> (expires_at monotonic, snapshot)
+        self._users: OrderedDict[uuid.UUID, tuple[float, CachedUser]] = OrderedDict()
+
+    def get_token(self, token: str) -> Optional[dict[str, Any]]:
+        """Payload of a previously verified, still unexpired token."""
+        payload = self._tokens.get(token)
+        if payload is None:
+            return None
+        exp = payload.get("exp")
+        if exp is not None and exp <= time.time():
+            del self._tokens[token]
+            return None
+        self._tokens.move_to_end(token)
+        return payload
+
+    def set_token(self, token: str, payload: dict[str, Any]) -> None:
+        """Remember a verified token's payload."""
+        self._tokens[token] = payload
+        self._tokens.move_to_end(token)
+        while len(self._tokens) > self.max_size:
+            self._tokens.popitem(last=False)
+
+    def get_user(self, user_id: uuid.UUID) -> Optional[CachedUser]:
+        """Snapshot of the user if cached and fresh."""
+        entry = self._users.get(user_id)
+        if entry is None:
+            return None
+        expires_at, cached = entry
+        if expires_at <= time.monotonic():
+            del self._users[user_id]
+            return None
+        self._users.move_to_end(user_id)
+        return cached
+
+    def set_user(self, user: User) -> None:
+        """Cache a snapshot of a freshly loaded user."""
+        self._users[user.id] = (
+            time.monotonic() + self.user_ttl_seconds,
+            CachedUser.from_user(user),
+        )
+        self._users.move_to_end(user.id)
+        while len(self._users) > self.max_size:
+            self._users.popitem(last=False)
+
+    def invalidate_user(self, user_id: Optional[uuid.UUID]) -> None:
+        """Drop a user's snapshot (password changed, account deactivated)."""
+        if user_id is not None:
+            self._users.pop(user_id, None)
+
+    def clear(self) -> None:
+        self._tokens.clear()
+        self._users.clear()
+
+
+@event.listens_for(User.password_hash, "set")
+@event.listens_for(User.is_active, "set")
+def _invalidate_on_change(target: User, value, oldvalue, initiator) -> None:
+    # Only rows loaded from the DB; CachedUser.to_user() builds transient ones
+    if _auth_cache is not None and inspect(target).has_identity:
+        _auth_cache.invalidate_user(target.id)
+
+
+# Singleton instance
+_auth_cache: Optional[AuthCache] = None
+
+
+def get_auth_cache() -> Optional[AuthCache]:
+    """Get or create the auth cache singleton (None if disabled in config)."""
+    global _auth_cache
+    settings = get_settings()
+    if settings.auth_cache_ttl_seconds <= 0:
+        return None
+    if _auth_cache is None:
+        _auth_cache = AuthCache(user_ttl_seconds=settings.auth_cache_ttl_seconds)
+    return _auth_cache
+
+
+def reset_auth_cache():
+    """Reset auth cache singleton (useful for testing)."""
+    global _auth_cache
+    _auth_cache = None
@@ -6,6 +6,7 @@ from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPBearer
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.auth_cache import get_auth_cache
 from app.core.database import get_db
 from app.core.security import verify_token
 from app.models.user import User
@@ -25,7 +26,12 @@ async def get_current_user(
     request: Request,
     db: Annotated[AsyncSession, Depends(get_db)],
 ) -> User:
-    """Get current authenticated user from JWT token in cookie."""
+    """Get current authenticated user from JWT token in cookie.
+
+    Decoded tokens and user snapshots are cached briefly (see AuthCache), so
+    most requests resolve the user without a DB round-trip. The returned
+    User may therefore be a transient instance not bound to `db`.
+    """
     token = await get_token_from_cookie(request)
 
     if not token:
@@ -34,7 +40,12 @@ async def get_current_user(
             detail="Не авторизован",
         )
 
-    payload = verify_token(token)
+    cache = get_auth_cache()
+    payload = cache.get_token(token) if cache is not None else None
+    if payload is None:
+        payload = verify_token(token)
+        if payload is not None and cache is not None:
+            cache.set_token(token, payload)
     if payload is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -56,14 +67,20 @@ async def get_current_user(
             detail="Невалидный токен",
         )
 
-    user_repo = UserRepository(db)
-    user = await user_repo.get_by_id(user_id)
-
-    if user is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Пользователь не найден",
-        )
+    cached = cache.get_user(user_id) if cache is not None else None
+    if cached is not None:
+        user = cached.to_user()
+    else:
+        user_repo = UserRepository(db)
+        user = await user_repo.get_by_id(user_id)
+
+        if user is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Пользователь не найден",
+            )
+        if cache is not None:
+            cache.set_user(user)
 
     if not user.is_active:
         raise HTTPException(
@@ -0,0 +1,115 @@
+"""Process-wide HTTP client registry for LLM and embedding APIs.
+
+All OpenAI-compatible and Anthropic SDK clients share one httpx connection
+pool, so keep-alive connections (and TLS sessions) to the same provider host
+are reused across requests and services instead of being re-established per
+call. HTTP/2 (``h2``, installed via ``httpx[http2]``) is used when
+LLM_HTTP2_ENABLED is set; without ``h2`` the pool falls back to HTTP/1.1.
+
+SDK clients are cached by (kind, api_key, base_url). Call close_http_clients()
+on app/bot shutdown.
+"""
+
+import logging
+from typing import Any, Optional
+
+import httpx
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+_http_client: Optional[httpx.AsyncClient] = None
+_sdk_clients: dict[tuple, Any] = {}
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Get or create the shared httpx client (connection pool)."""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        settings = get_settings()
+        http2 = settings.llm_http2_enabled and _http2_available()
+        _http_client = httpx.AsyncClient(
+            http2=http2,
+            limits=httpx.Limits(
+                max_connections=settings.llm_http_max_connections,
+                max_keepalive_connections=settings.llm_http_max_keepalive_connections,
+                keepalive_expiry=settings.llm_http_keepalive_expiry,
+            ),
+            timeout=httpx.Timeout(
+                settings.llm_http_timeout_seconds,
+                connect=settings.llm_http_connect_timeout_seconds,
+            ),
+        )
+        logger.info(
+            "Created shared HTTP client (http2=%s, max_connections=%d)",
+            http2, settings.llm_http_max_connections,
+        )
+    return _http_client
+
+
+def get_openai_client(
+    api_key: str,
+    base_url: Optional[str] = None,
+    tracing: bool = False,
+):
+    """Get a cached AsyncOpenAI client bound to the shared connection pool.
+
+    Args:
+        api_key: API key for the provider
+        base_url: OpenAI-compatible base URL (None = api.openai.com)
+        tracing: Use the Langfuse AsyncOpenAI wrapper for LLM tracing
+    """
+    key = ("openai", tracing, api_key, base_url)
+    client = _sdk_clients.get(key)
+    if client is None:
+        if tracing:
+            from langfuse.openai import AsyncOpenAI
+        else:
+            from openai import AsyncOpenAI
+        client = AsyncOpenAI(
+            api_key=api_key,
+            base_url=base_url,
+            http_client=get_http_client(),
+        )
+        _sdk_clients[key] = client
+    return client
+
+
+def get_anthropic_client(api_key: str):
+    """Get a cached AsyncAnthropic client bound to the shared connection pool."""
+    key = ("anthropic", api_key)
+    client = _sdk_clients.get(key)
+    if client is None:
+        import anthropic
+        client = anthropic.AsyncAnthropic(
+            api_key=api_key,
+            http_client=get_http_client(),
+        )
+        _sdk_clients[key] = client
+    return client
+
+
+async def close_http_clients() -> None:
+    """Close the shared connection pool and drop cached SDK clients."""
+    global _http_client
+    _sdk_clients.clear()
+    if _http_client is not None and not _http_client.is_closed:
+        await _http_client.aclose()
+        logger.info("Closed shared HTTP client")
+    _http_client = None
+
+
+def reset_http_clients():
+    """Drop the registry without closing connections (useful for testing)."""
+    global _http_client
+    _sdk_clients.clear()
+    _http_client = None
@@ -0,0 +1,388 @@
+"""In-process latency metrics and per-request timing spans.
+
+Histograms and counters are kept in memory and rendered in the Prometheus
+text exposition format by the internal /metrics endpoint. Each timed stage
+is also recorded as a span on the current request (a contextvar list opened
+with collect_spans()), so the agent loop can attach the request's timing
+breakdown to its Langfuse trace.
+
+Usage:
+    with collect_spans() as spans:
+        with timed("history_load"):
+            history = await load_history()
+    spans  # [{"stage": "history_load", "ms": 12.3}, ...]
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+# Latency buckets (seconds): DB queries through multi-call LLM loops
+DEFAULT_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)
+
+
+def _format_labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ""
+    parts = []
+    for name, value in labels.items():
+        escaped = str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        parts.append(f'{name}="{escaped}"')
+    return "{" + ",".join(parts) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Histogram:
+    """Cumulative-bucket histogram with labels (Prometheus semantics)."""
+
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        # label values -> [bucket counts..., sum, count]
+        self._series: dict[tuple[str, ...], list[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0.0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def collect(self) -> list[str]:
+        lines = []
+        with self._lock:
+            items = sorted(self._series.items())
+        for key, series in items:
+            labels = dict(zip(self.labelnames, key))
+            for bound, count in zip(self.buckets, series):
+                bucket_labels = _format_labels({**labels, "le": _format_value(bound)})
+                lines.append(f"{self.name}_bucket{bucket_labels} {_format_value(count)}")
+            lines.append(f"{self.name}_sum{_format_labels(labels)} {series[-2]!r}")
+            lines.append(f"{self.name}_count{_format_labels(labels)} {_format_value(series[-1])}")
+        return lines
+
+
+class Counter:
+    """Monotonic counter with labels."""
+
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values: dict[tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def collect(self) -> list[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [
+            f"{self.name}{_format_labels(dict(zip(self.labelnames, key)))} {_format_value(value)}"
+            for key, value in items
+        ]
+
+
+class Gauge:
+    """Value that can go up and down (queue depth, in-flight work)."""
+
+    type_name = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values: dict[tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels: str) -> None:
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = value
+
+    def value(self, **labels: str) -> float:
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            return self._values.get(key, 0)
+
+    def collect(self) -> list[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [
+            f"{self.name}{_format_labels(dict(zip(self.labelnames, key)))} {_format_value(value)}"
+            for key, value in items
+        ]
+
+
+class MetricsRegistry:
+    """Holds metrics and renders them in Prometheus text format."""
+
+    def __init__(self):
+        self._metrics: dict[str, Histogram | Counter | Gauge] = {}
+
+    def register(self, metric):
+        existing = self._metrics.get(metric.name)
+        if existing is not None:
+            return existing
+        self._metrics[metric.name] = metric
+        return metric
+
+    def histogram(self, name: str, documentation: str, labelnames: tuple[str, ...] = (), **kwargs) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, **kwargs))
+
+    def counter(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type_name}")
+            lines.extend(metric.collect())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+# Prometheus text exposition format
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+STAGE_SECONDS = REGISTRY.histogram(
+    "getmywine_stage_duration_seconds",
+    "Duration of request processing stages",
+    ("stage",),
+)
+LLM_REQUEST_SECONDS = REGISTRY.histogram(
+    "getmywine_llm_request_duration_seconds",
+    "LLM API call latency: ttfb (first byte/token) and total",
+    ("phase", "streaming"),
+)
+LLM_TOKENS = REGISTRY.counter(
+    "getmywine_llm_tokens_total",
+    "LLM tokens used",
+    ("type",),
+)
+PASSWORD_HASH_QUEUED = REGISTRY.gauge(
+    "getmywine_password_hash_queued",
+    "bcrypt operations waiting for a password hashing thread",
+)
+PASSWORD_HASH_SECONDS = REGISTRY.histogram(
+    "getmywine_password_hash_duration_seconds",
+    "bcrypt operation latency: queue wait and hashing",
+    ("phase",),
+)
+JOBS_RUNNING = REGISTRY.gauge(
+    "getmywine_jobs_running",
+    "Background jobs currently being executed by this process",
+)
+JOBS_PROCESSED = REGISTRY.counter(
+    "getmywine_jobs_processed_total",
+    "Background job executions by outcome (done, pending = will retry, failed)",
+    ("kind", "status"),
+)
+JOB_SECONDS = REGISTRY.histogram(
+    "getmywine_job_duration_seconds",
+    "Background job execution time",
+    ("kind",),
+)
+BOT_UPDATES_QUEUED = REGISTRY.gauge(
+    "getmywine_bot_updates_queued",
+    "Telegram updates accepted but waiting for their chat or a worker slot",
+)
+BOT_UPDATES_IN_PROGRESS = REGISTRY.gauge(
+    "getmywine_bot_updates_in_progress",
+    "Telegram updates currently being handled",
+)
+BOT_UPDATE_WAIT_SECONDS = REGISTRY.histogram(
+    "getmywine_bot_update_wait_seconds",
+    "Time a Telegram update waited before its handler started",
+)
+BOT_MESSAGES_COALESCED = REGISTRY.counter(
+    "getmywine_bot_messages_coalesced_total",
+    "Telegram messages answered together with a later message of the same chat",
+)
+BOT_RUNS_SUPERSEDED = REGISTRY.counter(
+    "getmywine_bot_runs_superseded_total",
+    "Agent runs cancelled by a newer message before anything was sent",
+)
+BOT_SEND_WAIT_SECONDS = REGISTRY.histogram(
+    "getmywine_bot_send_wait_seconds",
+    "Time an outbound Telegram message waited for its chat and rate limits",
+)
+BOT_SEND_SECONDS = REGISTRY.histogram(
+    "getmywine_bot_send_duration_seconds",
+    "Telegram Bot API send call latency",
+)
+BOT_SEND_RETRIES = REGISTRY.counter(
+    "getmywine_bot_send_retries_total",
+    "Outbound Telegram messages retried after a RetryAfter (429)",
+)
+BOT_HISTORY_PENDING = REGISTRY.gauge(
+    "getmywine_bot_history_pending",
+    "Telegram turns already answered but not yet saved (write-behind)",
+)
+BOT_HISTORY_FLUSH_SECONDS = REGISTRY.histogram(
+    "getmywine_bot_history_flush_duration_seconds",
+    "Duration of a write-behind batch flush to the database",
+)
+BOT_HISTORY_FLUSH_ERRORS = REGISTRY.counter(
+    "getmywine_bot_history_flush_errors_total",
+    "Write-behind batch flushes that failed and will be retried",
+)
+BOT_HISTORY_DROPPED = REGISTRY.counter(
+    "getmywine_bot_history_dropped_total",
+    "Write-behind turns dropped after exhausting retries",
+)
+
+# Spans of the current request (None outside collect_spans())
+_spans: ContextVar[Optional[list[dict]]] = ContextVar("metrics_spans", default=None)
+
+
+@contextmanager
+def collect_spans() -> Iterator[list[dict]]:
+    """Collect timing spans recorded in this context (and its child tasks)."""
+    spans: list[dict] = []
+    token = _spans.set(spans)
+    try:
+        yield spans
+    finally:
+        _spans.reset(token)
+
+
+def current_spans() -> list[dict]:
+    """Spans recorded so far in the current request ([] outside a request)."""
+    return list(_spans.get() or [])
+
+
+def record_span(stage: str, seconds: float, **attributes) -> None:
+    """Record a span on the current request (no-op outside collect_spans())."""
+    spans = _spans.get()
+    if spans is not None:
+        spans.append({"stage": stage, "ms": round(seconds * 1000, 1), **attributes})
+
+
+@contextmanager
+def timed(stage: str, **attributes) -> Iterator[dict]:
+    """Time a stage: observe the stage histogram and record a request span.
+
+    Yields a dict; keys added to it inside the block become span attributes.
+    """
+    extra: dict = dict(attributes)
+    start = time.perf_counter()
+    try:
+        yield extra
+    finally:
+        elapsed = time.perf_counter() - start
+        STAGE_SECONDS.observe(elapsed, stage=stage)
+        record_span(stage, elapsed, **extra)
+
+
+def observe_llm_call(
+    total_seconds: float,
+    ttfb_seconds: Optional[float] = None,
+    streaming: bool = False,
+    prompt_tokens: Optional[int] = None,
+    completion_tokens: Optional[int] = None,
+) -> None:
+    """Record one LLM API call: latency histograms, token counters and a span."""
+    mode = "true" if streaming else "false"
+    LLM_REQUEST_SECONDS.observe(total_seconds, phase="total", streaming=mode)
+    if ttfb_seconds is not None:
+        LLM_REQUEST_SECONDS.observe(ttfb_seconds, phase="ttfb", streaming=mode)
+    if prompt_tokens:
+        LLM_TOKENS.inc(prompt_tokens, type="prompt")
+    if completion_tokens:
+        LLM_TOKENS.inc(completion_tokens, type="completion")
+
+    attributes: dict = {"streaming": streaming}
+    if ttfb_seconds is not None:
+        attributes["ttfb_ms"] = round(ttfb_seconds * 1000, 1)
+    if prompt_tokens is not None:
+        attributes["prompt_tokens"] = prompt_tokens
+    if completion_tokens is not None:
+        attributes["completion_tokens"] = completion_tokens
+    record_span("llm_call", total_seconds, **attributes)
+
+
+def summarize_spans(spans: list[dict]) -> dict[str, float]:
+    """Total milliseconds per stage (for trace metadata and logs)."""
+    totals: dict[str, float] = {}
+    for span in spans:
+        totals[span["stage"]] = round(totals.get(span["stage"], 0.0) + span["ms"], 1)
+    return totals
+
+
+async def start_metrics_server(port: int, host: str = "0.0.0.0") -> asyncio.AbstractServer:
+    """Serve GET /metrics over plain HTTP (for processes without a web app, e.g. the bot)."""
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            request_line = await reader.readline()
+            # Drain headers
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass
+            parts = request_line.decode("latin-1").split()
+            if len(parts) >= 2 and parts[0] == "GET" and parts[1].split("?")[0] == "/metrics":
+                status, body = "200 OK", REGISTRY.render().encode("utf-8")
+            else:
+                status, body = "404 Not Found", b"not found\n"
+            writer.write(
+                f"HTTP/1.1 {status}\r\n"
+                f"Content-Type: {CONTENT_TYPE}\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                "Connection: close\r\n\r\n".encode("latin-1") + body
+            )
+            await writer.drain()
+        except Exception as e:
+            logger.debug("Metrics request failed: %s", e)
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(handle, host, port)
+    logger.info("Serving metrics on %s:%d/metrics", host, port)
+    return server
@@ -1,19 +1,36 @@
-"""Security utilities: password hashing and JWT tokens."""
+"""Security utilities: password hashing and JWT tokens.
+
+bcrypt at cost 12 takes a few hundred milliseconds of CPU. Async code must
+use the *_async variants, which run it in a small dedicated thread pool
+(the bcrypt C extension releases the GIL) instead of blocking the event loop.
+"""
+import asyncio
+import secrets
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Any
+from typing import Any, Callable, Optional, TypeVar
 
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 
 from app.config import get_settings
+from app.core.metrics import PASSWORD_HASH_QUEUED, PASSWORD_HASH_SECONDS
 
 settings = get_settings()
 
-# Password hashing context
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+T = TypeVar("T")
 
-# Fake hash for timing attack protection
-FAKE_HASH = "$2b$12$LQv3c1yqBWVHxkd0LHAkCOYz6TtxMQJqhN8/X4.H3C0yH0/X4.H3C"
+# Password hashing context; hashes with another cost report needs_update
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=settings.bcrypt_rounds,
+)
+
+# Fake hash for timing attack protection; hashed at the configured cost so
+# unknown-user logins take as long as real ones
+FAKE_HASH = pwd_context.hash(secrets.token_urlsafe(16))
 
 
 def hash_password(password: str) -> str:
@@ -40,6 +57,69 @@ def verify_password_with_timing_protection(
     return pwd_context.verify(plain_password, hashed_password)
 
 
+# Dedicated pool: a login burst queues here instead of starving other
+# to_thread() users (DB-free helpers, file I/O)
+_hash_executor: Optional[ThreadPoolExecutor] = None
+
+
+def _get_hash_executor() -> ThreadPoolExecutor:
+    global _hash_executor
+    if _hash_executor is None:
+        _hash_executor = ThreadPoolExecutor(
+            max_workers=settings.password_hash_workers,
+            thread_name_prefix="bcrypt",
+        )
+    return _hash_executor
+
+
+async def _run_hashing(func: Callable[..., T], *args: Any) -> T:
+    """Run a bcrypt operation in the hashing pool, recording queue metrics."""
+    submitted = time.perf_counter()
+
+    def run() -> T:
+        started = time.perf_counter()
+        PASSWORD_HASH_QUEUED.dec()
+        PASSWORD_HASH_SECONDS.observe(started - submitted, phase="wait")
+        try:
+            return func(*args)
+        finally:
+            PASSWORD_HASH_SECONDS.observe(time.perf_counter() - started, phase="hash")
+
+    PASSWORD_HASH_QUEUED.inc()
+    future = _get_hash_executor().submit(run)
+    # Cancelled while still queued (caller went away): run() never starts
+    future.add_done_callback(lambda f: PASSWORD_HASH_QUEUED.dec() if f.cancelled() else None)
+    return await asyncio.wrap_future(future)
+
+
+async def hash_password_async(password: str) -> str:
+    """hash_password() in the hashing thread pool."""
+    return await _run_hashing(hash_password, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """verify_password() in the hashing thread pool."""
+    return await _run_hashing(verify_password, plain_password, hashed_password)
+
+
+async def verify_password_and_update_async(
+    plain_password: str, hashed_password: str | None
+) -> tuple[bool, str | None]:
+    """Verify with timing protection; also re-hash if the stored cost is outdated.
+
+    Returns:
+        Tuple of (valid, new_hash). new_hash is set only for a valid password
+        whose hash uses another cost than BCRYPT_ROUNDS and only when
+        PASSWORD_REHASH_ON_LOGIN is enabled; the caller should store it.
+    """
+    if hashed_password is None or not settings.password_rehash_on_login:
+        valid = await _run_hashing(
+            verify_password_with_timing_protection, plain_password, hashed_password,
+        )
+        return valid, None
+    return await _run_hashing(pwd_context.verify_and_update, plain_password, hashed_password)
+
+
 def create_access_token(
     subject: str,
     expires_delta: timedelta | None = None,
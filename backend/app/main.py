@@ -1,3 +1,5 @@
+from contextlib import asynccontextmanager
+from datetime import timedelta
 from pathlib import Path
 
 from fastapi import FastAPI
@@ -8,15 +10,41 @@ from starlette.requests import Request
 from starlette.responses import JSONResponse
 
 from app.config import get_settings
+from app.core.http_clients import close_http_clients
+from app.core.metrics import start_metrics_server
 from app.core.rate_limit import limiter
 from app.routers import auth, chat, pages, wine
+from app.services.jobs import get_job_runner
 
 settings = get_settings()
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Run background job workers and the internal metrics server;
+    release shared resources on shutdown."""
+    job_runner = get_job_runner()
+    if job_runner is not None:
+        await job_runner.start(
+            retention=timedelta(days=settings.job_retention_days),
+        )
+    # Metrics are served on a separate internal port, never on the public app
+    metrics_server = None
+    if settings.metrics_port:
+        metrics_server = await start_metrics_server(settings.metrics_port)
+    yield
+    if metrics_server is not None:
+        metrics_server.close()
+    if job_runner is not None:
+        await job_runner.close()
+    await close_http_clients()
+
+
 app = FastAPI(
     title="GetMyWine API",
     description="API для GetMyWine — персональные рекомендации вин",
     version="0.1.0",
+    lifespan=lifespan,
 )
 
 # Add rate limiting middleware
@@ -51,3 +79,4 @@ app.include_router(pages.router)
 async def health_check():
     """Health check endpoint."""
     return {"status": "healthy"}
+
@@ -2,8 +2,10 @@
 
 from app.models.user import User  # noqa: F401
 from app.models.conversation import Conversation  # noqa: F401
+from app.models.conversation_insights import ConversationInsights  # noqa: F401
 from app.models.message import Message  # noqa: F401
 from app.models.wine import Wine  # noqa: F401
 from app.models.telegram_user import TelegramUser  # noqa: F401
 from app.models.login_attempt import LoginAttempt  # noqa: F401
 from app.models.password_reset_token import PasswordResetToken  # noqa: F401
+from app.models.background_job import BackgroundJob  # noqa: F401
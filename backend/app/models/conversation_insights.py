@@ -0,0 +1,87 @@
+"""ConversationInsights model — precomputed cross-session context."""
+
+import uuid
+from datetime import datetime
+
+from sqlalchemy import JSON, DateTime, ForeignKey, Index, Integer, func
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.database import Base
+
+
+class ConversationInsights(Base):
+    """Keyword insights of one web session, maintained as messages are written.
+
+    One compact row per conversation (events, foods, wine mentions), so
+    cross-session context is read with a single indexed query instead of
+    loading and re-scanning the messages of the user's recent sessions.
+    Liked/disliked wines are filled by the LLM session insights job.
+    """
+
+    __tablename__ = "conversation_insights"
+    __table_args__ = (
+        Index(
+            "ix_conversation_insights_user_started",
+            "user_id",
+            "session_started_at",
+        ),
+    )
+
+    conversation_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("conversations.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    user_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("users.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    events: Mapped[list[str]] = mapped_column(
+        JSON,
+        nullable=False,
+        default=list,
+    )
+    foods: Mapped[list[str]] = mapped_column(
+        JSON,
+        nullable=False,
+        default=list,
+    )
+    wine_mentions: Mapped[list[str]] = mapped_column(
+        JSON,
+        nullable=False,
+        default=list,
+        comment="Wine names mentioned by the assistant, oldest first",
+    )
+    liked_wines: Mapped[list[str]] = mapped_column(
+        JSON,
+        nullable=False,
+        default=list,
+    )
+    disliked_wines: Mapped[list[str]] = mapped_column(
+        JSON,
+        nullable=False,
+        default=list,
+    )
+    messages_processed: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+        default=0,
+    )
+    session_started_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        comment="conversations.created_at (sessions are ordered by it)",
+    )
+    last_activity_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+    )
+
+    def __repr__(self) -> str:
+        return (
+            f"<ConversationInsights {self.conversation_id} "
+            f"messages={self.messages_processed}>"
+        )
@@ -1,10 +1,10 @@
 """Message model and MessageRole enum."""
 import enum
 import uuid
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import TYPE_CHECKING
 
-from sqlalchemy import Boolean, DateTime, Enum, ForeignKey, Text, func
+from sqlalchemy import Boolean, DateTime, Enum, ForeignKey, Index, Text, func, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -26,6 +26,15 @@ class Message(Base):
     """Message model for chat messages."""
 
     __tablename__ = "messages"
+    __table_args__ = (
+        # History pages: newest first per conversation, keyset-paginated
+        Index(
+            "ix_messages_conversation_created",
+            "conversation_id",
+            text("created_at DESC"),
+            text("id DESC"),
+        ),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True),
@@ -36,7 +45,6 @@ class Message(Base):
         UUID(as_uuid=True),
         ForeignKey("conversations.id", ondelete="CASCADE"),
         nullable=False,
-        index=True,
     )
     role: Mapped[MessageRole] = mapped_column(
         Enum(
@@ -54,6 +62,9 @@ class Message(Base):
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
         nullable=False,
+        # Set per row, not per transaction (now()), so messages saved in
+        # one transaction keep their order under (created_at, id)
+        default=lambda: datetime.now(timezone.utc),
         server_default=func.now(),
         index=True,
     )
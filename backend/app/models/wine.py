@@ -149,9 +149,21 @@ class Wine(Base):
         String(500),
         nullable=True,
     )
+    # Deferred: ~4 KB per row that only the embedding scripts read.
+    # Load it explicitly with undefer(Wine.embedding) (see WineRepository).
     embedding: Mapped[Optional[list[float]]] = mapped_column(
         Vector(1024),
         nullable=True,
+        deferred=True,
+    )
+    # SHA-256 of the create_embedding_text() output the embedding was built from
+    embedding_content_hash: Mapped[Optional[str]] = mapped_column(
+        String(64),
+        nullable=True,
+    )
+    embedding_model: Mapped[Optional[str]] = mapped_column(
+        String(100),
+        nullable=True,
     )
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
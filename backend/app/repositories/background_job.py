@@ -0,0 +1,129 @@
+"""Background job repository for database operations."""
+
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Optional
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.background_job import BackgroundJob
+
+
+class BackgroundJobRepository:
+    """Repository for the durable background job queue."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def enqueue(
+        self,
+        kind: str,
+        payload: dict[str, Any],
+        max_attempts: int = 5,
+        run_after: Optional[datetime] = None,
+    ) -> BackgroundJob:
+        """Add a pending job (saved with the caller's transaction)."""
+        job = BackgroundJob(
+            kind=kind,
+            payload=payload,
+            max_attempts=max_attempts,
+            run_after=run_after or datetime.now(timezone.utc),
+        )
+        self.db.add(job)
+        await self.db.flush()
+        return job
+
+    async def claim(self, limit: int = 1) -> list[BackgroundJob]:
+        """Mark the oldest due pending jobs as running and return them.
+
+        Rows locked by another worker are skipped (FOR UPDATE SKIP LOCKED),
+        so several processes can share the queue.
+        """
+        result = await self.db.execute(
+            select(BackgroundJob)
+            .where(
+                BackgroundJob.status == "pending",
+                BackgroundJob.run_after <= datetime.now(timezone.utc),
+            )
+            .order_by(BackgroundJob.run_after)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        jobs = list(result.scalars().all())
+        for job in jobs:
+            job.status = "running"
+            job.attempts += 1
+        await self.db.flush()
+        return jobs
+
+    async def complete(self, job_id: uuid.UUID) -> None:
+        """Mark a job as done."""
+        await self.db.execute(
+            update(BackgroundJob)
+            .where(BackgroundJob.id == job_id)
+            .values(status="done", last_error=None)
+        )
+
+    async def fail(
+        self,
+        job: BackgroundJob,
+        error: str,
+        retry_at: datetime,
+    ) -> str:
+        """Schedule a retry, or mark the job failed once attempts run out.
+
+        Returns:
+            The job's new status ("pending" or "failed")
+        """
+        status = "failed" if job.attempts >= job.max_attempts else "pending"
+        await self.db.execute(
+            update(BackgroundJob)
+            .where(BackgroundJob.id == job.id)
+            .values(status=status, last_error=error[:2000], run_after=retry_at)
+        )
+        return status
+
+    async def heartbeat(self, job_id: uuid.UUID) -> None:
+        """Mark a running job as alive, so requeue_stale() leaves it alone."""
+        await self.db.execute(
+            update(BackgroundJob)
+            .where(BackgroundJob.id == job_id, BackgroundJob.status == "running")
+            .values(updated_at=datetime.now(timezone.utc))
+        )
+
+    async def requeue_stale(self, older_than: timedelta) -> tuple[int, int]:
+        """Recover jobs whose worker stopped sending heartbeats.
+
+        Such jobs were abandoned by a stopped process or by a worker that
+        could not record their outcome. They go back to the queue, or are
+        marked failed when no attempts are left (e.g. a job that keeps
+        crashing the process).
+
+        Returns:
+            Tuple of (requeued, failed) job counts
+        """
+        threshold = datetime.now(timezone.utc) - older_than
+        stale = (
+            BackgroundJob.status == "running",
+            BackgroundJob.updated_at < threshold,
+        )
+        failed = await self.db.execute(
+            update(BackgroundJob)
+            .where(*stale, BackgroundJob.attempts >= BackgroundJob.max_attempts)
+            .values(status="failed", last_error="Abandoned while running")
+        )
+        requeued = await self.db.execute(
+            update(BackgroundJob).where(*stale).values(status="pending")
+        )
+        return requeued.rowcount, failed.rowcount
+
+    async def delete_done_before(self, threshold: datetime) -> int:
+        """Delete completed jobs last updated before the threshold."""
+        result = await self.db.execute(
+            delete(BackgroundJob).where(
+                BackgroundJob.status == "done",
+                BackgroundJob.updated_at < threshold,
+            )
+        )
+        return result.rowcount
@@ -1,17 +1,31 @@
 """Conversation repository for database operations."""
 
 import uuid
+from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
 from typing import Literal, Optional
 
-from sqlalchemy import func, select, update
+from sqlalchemy import and_, func, or_, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import lazyload, selectinload
 
 from app.models.conversation import Conversation
+from app.models.message import Message
 
 ChannelType = Literal["web", "telegram"]
 
+# Characters of the last message shown in the session list
+LAST_MESSAGE_PREVIEW_LENGTH = 100
+
+
+@dataclass(frozen=True)
+class ConversationSummary:
+    """Session list row: the conversation without its messages."""
+
+    conversation: Conversation
+    message_count: int
+    last_message_preview: Optional[str]
+
 
 class ConversationRepository:
     """Repository for conversation database operations.
@@ -26,21 +40,21 @@ class ConversationRepository:
         self,
         conversation_id: uuid.UUID,
         user_id: Optional[uuid.UUID] = None,
+        with_messages: bool = True,
     ) -> Optional[Conversation]:
         """Get conversation by ID, optionally filtered by user.
 
         Args:
             conversation_id: The conversation UUID
             user_id: Optional user UUID to verify ownership
+            with_messages: Eager-load all messages (skip when paging history)
 
         Returns:
             Conversation if found (and owned by user if specified), else None
         """
-        query = (
-            select(Conversation)
-            .where(Conversation.id == conversation_id)
-            .options(selectinload(Conversation.messages))
-        )
+        query = select(Conversation).where(Conversation.id == conversation_id)
+        if with_messages:
+            query = query.options(selectinload(Conversation.messages))
         if user_id is not None:
             query = query.where(Conversation.user_id == user_id)
         result = await self.db.execute(query)
@@ -66,42 +80,84 @@ class ConversationRepository:
         )
         return result.scalar_one_or_none()
 
-    async def get_all_by_user_id(
+    async def list_summaries_by_user_id(
         self,
         user_id: uuid.UUID,
         limit: int = 20,
         offset: int = 0,
-    ) -> tuple[list[Conversation], int]:
-        """Get all conversations for a user with pagination.
+        after: Optional[tuple[datetime, uuid.UUID]] = None,
+    ) -> tuple[list[ConversationSummary], bool]:
+        """Get a page of session summaries for a user, newest first.
+
+        Message count and last message preview are computed by correlated
+        subqueries, so no messages are loaded. Pages can be addressed by
+        offset or, in constant time, by the (created_at, id) key of the
+        previous page's last row.
 
         Args:
             user_id: The user's UUID
-            limit: Maximum number of conversations to return
-            offset: Number of conversations to skip
+            limit: Maximum number of sessions to return
+            offset: Number of sessions to skip (ignored with `after`)
+            after: Sort key of the last session of the previous page
 
         Returns:
-            Tuple of (conversations list, total count)
+            Tuple of (summaries list, whether more sessions follow)
         """
-        # Get total count
-        count_result = await self.db.execute(
-            select(func.count(Conversation.id)).where(
-                Conversation.user_id == user_id
-            )
+        message_count = (
+            select(func.count(Message.id))
+            .where(Message.conversation_id == Conversation.id)
+            .correlate(Conversation)
+            .scalar_subquery()
+        )
+        last_message_preview = (
+            select(func.substr(Message.content, 1, LAST_MESSAGE_PREVIEW_LENGTH))
+            .where(Message.conversation_id == Conversation.id)
+            .order_by(Message.created_at.desc(), Message.id.desc())
+            .limit(1)
+            .correlate(Conversation)
+            .scalar_subquery()
         )
-        total = count_result.scalar() or 0
 
-        # Get paginated conversations, newest first
-        result = await self.db.execute(
-            select(Conversation)
+        query = (
+            select(Conversation, message_count, last_message_preview)
             .where(Conversation.user_id == user_id)
-            .order_by(Conversation.created_at.desc())
-            .limit(limit)
-            .offset(offset)
-            .options(selectinload(Conversation.messages))
+            .order_by(Conversation.created_at.desc(), Conversation.id.desc())
+            .limit(limit + 1)
+            .options(lazyload(Conversation.user))
         )
-        conversations = list(result.scalars().all())
+        if after is not None:
+            created_at, conversation_id = after
+            query = query.where(
+                or_(
+                    Conversation.created_at < created_at,
+                    and_(
+                        Conversation.created_at == created_at,
+                        Conversation.id < conversation_id,
+                    ),
+                )
+            )
+        elif offset:
+            query = query.offset(offset)
+
+        rows = (await self.db.execute(query)).all()
+        summaries = [
+            ConversationSummary(
+                conversation=conversation,
+                message_count=count or 0,
+                last_message_preview=preview,
+            )
+            for conversation, count, preview in rows[:limit]
+        ]
+        return summaries, len(rows) > limit
 
-        return conversations, total
+    async def count_by_user_id(self, user_id: uuid.UUID) -> int:
+        """Count all conversations of a user."""
+        result = await self.db.execute(
+            select(func.count(Conversation.id)).where(
+                Conversation.user_id == user_id
+            )
+        )
+        return result.scalar() or 0
 
     async def get_active_by_user_id(
         self, user_id: uuid.UUID
@@ -214,6 +270,18 @@ class ConversationRepository:
         await self.db.refresh(conversation)
         return conversation
 
+    async def touch(self, conversation_id: uuid.UUID, updated_at: datetime) -> None:
+        """Move a conversation's updated_at forward (never back) without loading it."""
+        await self.db.execute(
+            update(Conversation)
+            .where(
+                Conversation.id == conversation_id,
+                Conversation.updated_at < updated_at,
+            )
+            .values(updated_at=updated_at)
+            .execution_options(synchronize_session=False)
+        )
+
     async def delete(self, conversation: Conversation) -> None:
         """Delete a conversation and all its messages.
 
@@ -0,0 +1,138 @@
+"""Conversation insights repository for database operations."""
+
+import uuid
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.conversation import Conversation
+from app.models.conversation_insights import ConversationInsights
+
+# Per-session caps (rows stay small no matter how long a session runs)
+MAX_EVENTS = 10
+MAX_FOODS = 10
+MAX_WINE_MENTIONS = 20
+MAX_WINE_PREFERENCES = 10
+
+
+def _merge(existing: list[str], new: list[str], limit: int, keep_latest: bool = False) -> list[str]:
+    """Append new values, deduplicated in first-seen order, capped at limit."""
+    merged = list(dict.fromkeys([*existing, *new]))
+    return merged[-limit:] if keep_latest else merged[:limit]
+
+
+class ConversationInsightsRepository:
+    """Repository for precomputed per-session insights."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_by_conversation_id(
+        self, conversation_id: uuid.UUID,
+    ) -> Optional[ConversationInsights]:
+        """Get insights row of a conversation."""
+        return await self.db.get(ConversationInsights, conversation_id)
+
+    async def add_messages(
+        self,
+        conversation: Conversation,
+        events: list[str],
+        foods: list[str],
+        wine_mentions: list[str],
+        message_count: int,
+        liked_wines: Optional[list[str]] = None,
+        disliked_wines: Optional[list[str]] = None,
+    ) -> ConversationInsights:
+        """Merge insights of newly written messages into the session's row.
+
+        Creates the row on the first exchange of a session.
+
+        Args:
+            conversation: The (web) conversation the messages belong to
+            events: Events detected in the new messages
+            foods: Foods detected in the new user messages
+            wine_mentions: Wine names mentioned in the new assistant messages
+            message_count: Number of new messages processed
+            liked_wines: Wines the user liked (LLM insights job)
+            disliked_wines: Wines the user rejected (LLM insights job)
+
+        Returns:
+            The updated insights row
+        """
+        insights = await self.db.get(
+            ConversationInsights, conversation.id, with_for_update=True,
+        )
+        if insights is None:
+            insights = ConversationInsights(
+                conversation_id=conversation.id,
+                user_id=conversation.user_id,
+                events=[],
+                foods=[],
+                wine_mentions=[],
+                liked_wines=[],
+                disliked_wines=[],
+                messages_processed=0,
+                session_started_at=conversation.created_at,
+            )
+            self.db.add(insights)
+
+        insights.events = _merge(insights.events, events, MAX_EVENTS)
+        insights.foods = _merge(insights.foods, foods, MAX_FOODS)
+        insights.wine_mentions = _merge(
+            insights.wine_mentions, wine_mentions, MAX_WINE_MENTIONS, keep_latest=True,
+        )
+        if liked_wines:
+            insights.liked_wines = _merge(
+                insights.liked_wines, liked_wines, MAX_WINE_PREFERENCES, keep_latest=True,
+            )
+        if disliked_wines:
+            insights.disliked_wines = _merge(
+                insights.disliked_wines, disliked_wines, MAX_WINE_PREFERENCES, keep_latest=True,
+            )
+        insights.messages_processed += message_count
+        insights.last_activity_at = datetime.now(timezone.utc)
+        await self.db.flush()
+        return insights
+
+    async def get_recent_by_user_id(
+        self,
+        user_id: uuid.UUID,
+        limit: int = 5,
+        exclude_conversation_id: Optional[uuid.UUID] = None,
+    ) -> tuple[list[ConversationInsights], int]:
+        """Latest sessions' insights plus the user's total session count.
+
+        One query: rows come from ix_conversation_insights_user_started, the
+        total is a scalar subquery over conversations.user_id. The total is
+        counted on its own when the user has no insights rows (e.g. sessions
+        not yet backfilled), so it never depends on them.
+
+        Args:
+            user_id: The user's UUID
+            limit: Maximum number of sessions to return
+            exclude_conversation_id: Session to skip (e.g. the current one)
+
+        Returns:
+            Tuple of (insights newest session first, total sessions)
+        """
+        total_sessions = (
+            select(func.count(Conversation.id))
+            .where(Conversation.user_id == user_id)
+            .scalar_subquery()
+        )
+        query = (
+            select(ConversationInsights, total_sessions)
+            .where(ConversationInsights.user_id == user_id)
+            .order_by(ConversationInsights.session_started_at.desc())
+            .limit(limit)
+        )
+        if exclude_conversation_id is not None:
+            query = query.where(
+                ConversationInsights.conversation_id != exclude_conversation_id
+            )
+        rows = (await self.db.execute(query)).all()
+        if not rows:
+            return [], await self.db.scalar(select(total_sessions))
+        return [row[0] for row in rows], rows[0][1]
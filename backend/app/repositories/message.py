@@ -1,10 +1,12 @@
 """Message repository for database operations."""
 import uuid
+from datetime import datetime, timedelta, timezone
 from typing import Optional
 
-from sqlalchemy import select, desc
+from sqlalchemy import desc, insert, select, tuple_, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.models.conversation import Conversation
 from app.models.message import Message, MessageRole
 
 
@@ -40,52 +42,124 @@ class MessageRepository:
         await self.db.refresh(message)
         return message
 
+    async def get_existing_ids(self, message_ids: list[uuid.UUID]) -> set[uuid.UUID]:
+        """Return which of the given message IDs are already stored."""
+        if not message_ids:
+            return set()
+        result = await self.db.execute(
+            select(Message.id).where(Message.id.in_(message_ids))
+        )
+        return set(result.scalars().all())
+
+    async def bulk_create(self, rows: list[dict]) -> None:
+        """Insert many messages (column dicts) in one multi-row INSERT."""
+        if rows:
+            await self.db.execute(insert(Message), rows)
+
+    async def append_turn(
+        self,
+        conversation_id: uuid.UUID,
+        user_content: str,
+        assistant_content: str,
+        user_sent_at: Optional[datetime] = None,
+    ) -> tuple[Message, Message]:
+        """Save a user message with its reply and bump the conversation.
+
+        Both rows go in one multi-row INSERT ... RETURNING and updated_at in
+        one UPDATE, instead of a flush + refresh per message and a separate
+        conversation refresh.
+
+        Args:
+            conversation_id: The conversation UUID
+            user_content: The user's message
+            assistant_content: The reply
+            user_sent_at: When the user message was received (defaults to now)
+
+        Returns:
+            Tuple of (user_message, assistant_message)
+        """
+        replied_at = datetime.now(timezone.utc)
+        sent_at = user_sent_at or replied_at
+        # The reply must sort after the question under (created_at, id)
+        replied_at = max(replied_at, sent_at + timedelta(microseconds=1))
+
+        result = await self.db.scalars(
+            insert(Message).returning(Message, sort_by_parameter_order=True),
+            [
+                {
+                    "conversation_id": conversation_id,
+                    "role": MessageRole.USER,
+                    "content": user_content,
+                    "created_at": sent_at,
+                },
+                {
+                    "conversation_id": conversation_id,
+                    "role": MessageRole.ASSISTANT,
+                    "content": assistant_content,
+                    "created_at": replied_at,
+                },
+            ],
+        )
+        user_message, assistant_message = result.all()
+
+        await self.db.execute(
+            update(Conversation)
+            .where(Conversation.id == conversation_id)
+            .values(updated_at=replied_at)
+        )
+        return user_message, assistant_message
+
     async def get_history(
         self,
         conversation_id: uuid.UUID,
         limit: int = 50,
-        before_id: Optional[uuid.UUID] = None,
+        before: Optional[tuple[datetime, uuid.UUID]] = None,
     ) -> list[Message]:
-        """Get message history for a conversation with pagination."""
-        query = (
-            select(Message)
-            .where(Message.conversation_id == conversation_id)
-            .order_by(desc(Message.created_at), desc(Message.role))
-            .limit(limit + 1)  # Fetch one extra to check if there are more
+        """Get the latest messages of a conversation in chronological order."""
+        messages, _ = await self.get_history_page(
+            conversation_id, limit=limit, before=before,
         )
+        return messages
 
-        if before_id:
-            # Get the timestamp of the before_id message
-            before_message = await self.get_by_id(before_id)
-            if before_message:
-                query = query.where(Message.created_at < before_message.created_at)
-
-        result = await self.db.execute(query)
-        messages = list(result.scalars().all())
-
-        # Reverse to get chronological order
-        return list(reversed(messages[:limit]))
-
-    async def count_after(
+    async def get_history_page(
         self,
         conversation_id: uuid.UUID,
-        before_id: Optional[uuid.UUID] = None,
         limit: int = 50,
-    ) -> bool:
-        """Check if there are more messages before the given ID."""
+        before: Optional[tuple[datetime, uuid.UUID]] = None,
+    ) -> tuple[list[Message], bool]:
+        """Get a page of message history, keyset-paginated by (created_at, id).
+
+        A single index range scan on ix_messages_conversation_created: one
+        extra row is fetched to tell whether older messages exist, so the cost
+        does not grow with the conversation length.
+
+        Args:
+            conversation_id: The conversation UUID
+            limit: Maximum number of messages to return
+            before: Sort key of the oldest message of the previous page
+
+        Returns:
+            Tuple of (messages in chronological order, whether older exist)
+        """
         query = (
             select(Message)
             .where(Message.conversation_id == conversation_id)
-            .order_by(desc(Message.created_at))
-            .limit(limit + 1)
+            .order_by(desc(Message.created_at), desc(Message.id))
+            .limit(limit + 1)  # Fetch one extra to check if there are more
         )
-
-        if before_id:
-            before_message = await self.get_by_id(before_id)
-            if before_message:
-                query = query.where(Message.created_at < before_message.created_at)
+        if before is not None:
+            created_at, message_id = before
+            # Row comparison: the index range starts right after the cursor
+            query = query.where(
+                tuple_(Message.created_at, Message.id)
+                < tuple_(
+                    created_at, message_id,
+                    types=[Message.created_at.type, Message.id.type],
+                )
+            )
 
         result = await self.db.execute(query)
         messages = list(result.scalars().all())
 
-        return len(messages) > limit
+        # Reverse to get chronological order
+        return list(reversed(messages[:limit])), len(messages) > limit
@@ -6,7 +6,7 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.user import User
-from app.core.security import hash_password
+from app.core.security import hash_password_async
 
 
 class UserRepository:
@@ -36,7 +36,7 @@ class UserRepository:
         """Create a new user."""
         user = User(
             email=email.lower(),
-            password_hash=hash_password(password),
+            password_hash=await hash_password_async(password),
             is_age_verified=is_age_verified,
         )
         self.db.add(user)
@@ -46,11 +46,16 @@ class UserRepository:
 
     async def update_password(self, user: User, new_password: str) -> User:
         """Update user's password."""
-        user.password_hash = hash_password(new_password)
+        user.password_hash = await hash_password_async(new_password)
         await self.db.flush()
         await self.db.refresh(user)
         return user
 
+    async def set_password_hash(self, user: User, password_hash: str) -> None:
+        """Store an already computed password hash (e.g. a cost upgrade)."""
+        user.password_hash = password_hash
+        await self.db.flush()
+
     async def email_exists(self, email: str) -> bool:
         """Check if email already exists."""
         result = await self.db.execute(
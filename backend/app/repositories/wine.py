@@ -3,8 +3,9 @@ import uuid
 from decimal import Decimal
 from typing import Optional
 
-from sqlalchemy import func, select
+from sqlalchemy import String, cast, column, func, select, update, values
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import undefer
 
 from app.models.wine import PriceRange, Sweetness, Wine, WineType
 
@@ -15,19 +16,26 @@ class WineRepository:
     def __init__(self, db: AsyncSession):
         self.db = db
 
-    async def get_by_id(self, wine_id: uuid.UUID) -> Optional[Wine]:
-        """Get wine by ID."""
+    async def get_by_id(
+        self, wine_id: uuid.UUID, with_embedding: bool = False
+    ) -> Optional[Wine]:
+        """Get wine by ID.
+
+        The embedding column is deferred; pass with_embedding=True to load it.
+        """
         result = await self.db.execute(
-            select(Wine).where(Wine.id == wine_id)
+            _wine_select(with_embedding).where(Wine.id == wine_id)
         )
         return result.scalar_one_or_none()
 
-    async def get_by_ids(self, wine_ids: list[uuid.UUID]) -> list[Wine]:
+    async def get_by_ids(
+        self, wine_ids: list[uuid.UUID], with_embedding: bool = False
+    ) -> list[Wine]:
         """Get wines by list of IDs, preserving order."""
         if not wine_ids:
             return []
         result = await self.db.execute(
-            select(Wine).where(Wine.id.in_(wine_ids))
+            _wine_select(with_embedding).where(Wine.id.in_(wine_ids))
         )
         wines_dict = {wine.id: wine for wine in result.scalars().all()}
         # Preserve original order
@@ -49,9 +57,10 @@ class WineRepository:
         food_pairing: Optional[str] = None,
         region: Optional[str] = None,
         exclude_ids: Optional[list] = None,
+        with_embedding: bool = False,
     ) -> list[Wine]:
         """Get list of wines with optional filters."""
-        query = select(Wine)
+        query = _wine_select(with_embedding)
 
         if exclude_ids:
             query = query.where(Wine.id.notin_(exclude_ids))
@@ -140,6 +149,7 @@ class WineRepository:
         sweetness: Optional[Sweetness] = None,
         price_min: Optional[Decimal] = None,
         price_max: Optional[Decimal] = None,
+        with_embedding: bool = False,
     ) -> list[tuple[Wine, float]]:
         """
         Search wines by semantic similarity using pgvector.
@@ -151,6 +161,7 @@ class WineRepository:
             sweetness: Optional filter by sweetness
             price_min: Optional minimum price filter
             price_max: Optional maximum price filter
+            with_embedding: Also load the (deferred) embedding column
 
         Returns:
             List of (Wine, similarity_score) tuples, ordered by similarity
@@ -162,6 +173,8 @@ class WineRepository:
         query = select(Wine, (1 - distance).label("similarity")).where(
             Wine.embedding.isnot(None)
         )
+        if with_embedding:
+            query = query.options(undefer(Wine.embedding))
 
         # Apply filters
         if wine_type is not None:
@@ -185,9 +198,95 @@ class WineRepository:
         self, wine_id: uuid.UUID, embedding: list[float]
     ) -> Optional[Wine]:
         """Update wine's embedding vector."""
-        wine = await self.get_by_id(wine_id)
+        wine = await self.get_by_id(wine_id, with_embedding=True)
         if wine:
             wine.embedding = embedding
             await self.db.flush()
             await self.db.refresh(wine)
         return wine
+
+    async def bulk_update_embeddings(
+        self,
+        embeddings: dict[uuid.UUID, list[float]],
+        content_hashes: Optional[dict[uuid.UUID, str]] = None,
+        model: Optional[str] = None,
+        chunk_size: int = 200,
+    ) -> int:
+        """Write many embeddings with UPDATE ... FROM (VALUES ...) statements.
+
+        One statement per chunk_size rows instead of a SELECT + UPDATE +
+        refresh per wine. Values are sent as text and cast server-side.
+        The content hash of the embedded text and the model name are
+        recorded alongside (NULL when not given = unknown provenance).
+
+        Returns:
+            Number of rows updated
+        """
+        content_hashes = content_hashes or {}
+        items = list(embeddings.items())
+        updated = 0
+        for start in range(0, len(items), chunk_size):
+            rows = [
+                (str(wine_id), _vector_literal(embedding), content_hashes.get(wine_id))
+                for wine_id, embedding in items[start:start + chunk_size]
+            ]
+            data = values(
+                column("id", String),
+                column("embedding", String),
+                column("content_hash", String),
+                name="v",
+            ).data(rows)
+            stmt = (
+                update(Wine)
+                .where(Wine.id == cast(data.c.id, Wine.id.type))
+                .values(
+                    embedding=cast(data.c.embedding, Wine.embedding.type),
+                    embedding_content_hash=data.c.content_hash,
+                    embedding_model=model,
+                )
+                .execution_options(synchronize_session=False)
+            )
+            result = await self.db.execute(stmt)
+            updated += result.rowcount or 0
+        return updated
+
+    async def stamp_embedding_metadata(
+        self,
+        content_hashes: dict[uuid.UUID, str],
+        model: str,
+        chunk_size: int = 1000,
+    ) -> int:
+        """Record content hash/model for existing embeddings without touching vectors."""
+        items = list(content_hashes.items())
+        updated = 0
+        for start in range(0, len(items), chunk_size):
+            data = values(
+                column("id", String),
+                column("content_hash", String),
+                name="v",
+            ).data([
+                (str(wine_id), text_hash)
+                for wine_id, text_hash in items[start:start + chunk_size]
+            ])
+            stmt = (
+                update(Wine)
+                .where(Wine.id == cast(data.c.id, Wine.id.type))
+                .values(embedding_content_hash=data.c.content_hash, embedding_model=model)
+                .execution_options(synchronize_session=False)
+            )
+            result = await self.db.execute(stmt)
+            updated += result.rowcount or 0
+        return updated
+
+
+def _wine_select(with_embedding: bool = False):
+    """select(Wine), optionally undeferring the 1024-dim embedding column."""
+    query = select(Wine)
+    if with_embedding:
+        query = query.options(undefer(Wine.embedding))
+    return query
+
+
+def _vector_literal(embedding: list[float]) -> str:
+    """pgvector text input format: '[0.1,0.2,...]'."""
+    return "[" + ",".join(repr(float(x)) for x in embedding) + "]"
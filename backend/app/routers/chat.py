@@ -1,17 +1,25 @@
 """Chat router for conversation and message endpoints."""
 
+import asyncio
+import contextlib
+import json
+import logging
 import uuid
-from typing import Annotated, Optional
+from typing import Annotated, AsyncIterator, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
+from app.core.database import async_session_maker, get_db
 from app.core.deps import get_current_user
+from app.core.pagination import decode_cursor, encode_cursor
 from app.models.user import User
 from app.repositories.conversation import ConversationRepository
+from app.repositories.message import MessageRepository
 from app.schemas.chat import (
     ConversationResponse,
+    MessageListResponse,
     MessagePair,
     MessageResponse,
     SendMessageRequest,
@@ -25,6 +33,8 @@ from app.schemas.conversation import (
 from app.schemas.wine import WineSummary
 from app.services.chat import ChatService
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(prefix="/api/v1/chat", tags=["chat"])
 
 
@@ -39,36 +49,57 @@ async def list_sessions(
     db: Annotated[AsyncSession, Depends(get_db)],
     limit: int = Query(default=20, ge=1, le=100),
     offset: int = Query(default=0, ge=0),
+    cursor: Optional[str] = Query(default=None),
 ):
     """
     List all sessions for the current user.
 
     Returns sessions sorted by creation date (newest first).
-    Includes pagination support.
+    Supports offset pagination and keyset pagination: pass the previous
+    page's `next_cursor` as `cursor` (offset is then ignored).
     """
+    after = None
+    if cursor is not None:
+        try:
+            after = decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor",
+            )
+
     repo = ConversationRepository(db)
-    conversations, total = await repo.get_all_by_user_id(
+    summaries, has_more = await repo.list_summaries_by_user_id(
         current_user.id,
         limit=limit,
         offset=offset,
+        after=after,
     )
+    total = await repo.count_by_user_id(current_user.id)
 
     sessions = [
         SessionSummary(
-            id=conv.id,
-            title=conv.title,
-            created_at=conv.created_at,
-            updated_at=conv.updated_at,
-            is_active=conv.is_active,
-            message_count=conv.message_count,
+            id=summary.conversation.id,
+            title=summary.conversation.title,
+            created_at=summary.conversation.created_at,
+            updated_at=summary.conversation.updated_at,
+            is_active=summary.conversation.is_active,
+            message_count=summary.message_count,
+            last_message_preview=summary.last_message_preview,
         )
-        for conv in conversations
+        for summary in summaries
     ]
 
+    next_cursor = None
+    if has_more and summaries:
+        last = summaries[-1].conversation
+        next_cursor = encode_cursor(last.created_at, last.id)
+
     return SessionList(
         sessions=sessions,
-        has_more=(offset + limit) < total,
+        has_more=has_more,
         total=total,
+        next_cursor=next_cursor,
     )
 
 
@@ -146,6 +177,54 @@ async def get_session(
     )
 
 
+@router.get("/sessions/{session_id}/messages", response_model=MessageListResponse)
+async def list_session_messages(
+    session_id: uuid.UUID,
+    current_user: Annotated[User, Depends(get_current_user)],
+    db: Annotated[AsyncSession, Depends(get_db)],
+    limit: int = Query(default=50, ge=1, le=200),
+    cursor: Optional[str] = Query(default=None),
+):
+    """
+    Get a page of a session's message history.
+
+    Returns the newest messages in chronological order. Pass `next_cursor`
+    as `cursor` to get the page of older messages before them.
+    """
+    before = None
+    if cursor is not None:
+        try:
+            before = decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor",
+            )
+
+    conversation = await ConversationRepository(db).get_by_id(
+        session_id, user_id=current_user.id, with_messages=False,
+    )
+    if not conversation:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Session not found",
+        )
+
+    messages, has_more = await MessageRepository(db).get_history_page(
+        conversation.id, limit=limit, before=before,
+    )
+
+    next_cursor = None
+    if has_more and messages:
+        next_cursor = encode_cursor(messages[0].created_at, messages[0].id)
+
+    return MessageListResponse(
+        messages=[MessageResponse.model_validate(msg) for msg in messages],
+        has_more=has_more,
+        next_cursor=next_cursor,
+    )
+
+
 @router.post("/sessions", response_model=SessionDetail, status_code=status.HTTP_201_CREATED)
 async def create_session(
     current_user: Annotated[User, Depends(get_current_user)],
@@ -293,7 +372,8 @@ async def send_message(
 
     Saves both the user message and AI response to the conversation history.
     """
-    chat_service = ChatService(db)
+    # Short units of work: no connection is held during the LLM call
+    chat_service = ChatService(db, session_factory=async_session_maker)
 
     user_message, ai_message = await chat_service.send_message(
         current_user.id,
@@ -304,3 +384,78 @@ async def send_message(
         user_message=MessageResponse.model_validate(user_message),
         assistant_message=MessageResponse.model_validate(ai_message),
     )
+
+
+def _format_sse(event: str, data: dict) -> str:
+    """Format one Server-Sent Events frame."""
+    payload = json.dumps(data, ensure_ascii=False, default=str)
+    return f"event: {event}\ndata: {payload}\n\n"
+
+
+async def _stream_message_events(
+    user_id: uuid.UUID,
+    content: str,
+) -> AsyncIterator[str]:
+    """Run ChatService.send_message and yield its progress as SSE frames.
+
+    The generator owns its database session: the request-scoped one from
+    get_db may already be closed while the response body is streaming.
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+
+    async def on_event(event: str, data: dict) -> None:
+        await queue.put((event, data))
+
+    async with async_session_maker() as session:
+        chat_service = ChatService(session, session_factory=async_session_maker)
+        task = asyncio.create_task(
+            chat_service.send_message(user_id, content, on_event=on_event)
+        )
+        task.add_done_callback(lambda _: queue.put_nowait(None))
+
+        try:
+            while (item := await queue.get()) is not None:
+                yield _format_sse(*item)
+
+            user_message, ai_message = task.result()
+            await session.commit()
+
+            pair = MessagePair(
+                user_message=MessageResponse.model_validate(user_message),
+                assistant_message=MessageResponse.model_validate(ai_message),
+            )
+            yield _format_sse("done", pair.model_dump(mode="json"))
+
+        except ValueError as e:
+            await session.rollback()
+            yield _format_sse("error", {"detail": str(e)})
+        except Exception:
+            logger.exception("Streaming message failed for user %s", user_id)
+            await session.rollback()
+            yield _format_sse("error", {"detail": "Failed to generate response"})
+        finally:
+            # Client disconnected mid-stream: stop the agent loop
+            if not task.done():
+                task.cancel()
+                with contextlib.suppress(asyncio.CancelledError, Exception):
+                    await task
+
+
+@router.post("/messages/stream")
+async def send_message_stream(
+    data: SendMessageRequest,
+    current_user: Annotated[User, Depends(get_current_user)],
+):
+    """
+    Send a message and stream the AI response as Server-Sent Events.
+
+    Events: tool_call / tool_result while the agent searches the catalog,
+    intro / wine / closing while the structured answer is generated, reset
+    when streamed sections must be discarded, then a final done event with
+    the persisted message pair (same shape as POST /messages) or error.
+    """
+    return StreamingResponse(
+        _stream_message_events(current_user.id, data.content),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,6 +1,7 @@
 """Pydantic schemas for chat functionality."""
 import uuid
 from datetime import datetime
+from typing import Optional
 
 from pydantic import BaseModel, Field
 
@@ -48,3 +49,4 @@ class MessageListResponse(BaseModel):
 
     messages: list[MessageResponse]
     has_more: bool
+    next_cursor: Optional[str] = None  # Pass as ?cursor= to get older messages
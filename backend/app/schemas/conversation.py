@@ -31,6 +31,7 @@ class SessionSummary(SessionBase):
     updated_at: datetime
     is_active: bool
     message_count: int
+    last_message_preview: Optional[str] = None
 
     model_config = {"from_attributes": True}
 
@@ -50,6 +51,7 @@ class SessionList(BaseModel):
     sessions: list[SessionSummary]
     has_more: bool
     total: int
+    next_cursor: Optional[str] = None  # Pass as ?cursor= to get the next page
 
 
 class SessionTitleUpdate(BaseModel):
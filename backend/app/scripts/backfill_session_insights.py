@@ -0,0 +1,68 @@
+"""Backfill conversation_insights for sessions created before migration 017.
+
+Usage:
+    python -m app.scripts.backfill_session_insights
+    make db-backfill-insights  # from the repo root, against the compose stack
+
+Deploy step: run once after `alembic upgrade` reaches 017. New messages keep
+the table up to date on their own (ChatService records each exchange); this
+one-off pass covers older web sessions that have no insights row yet. Until it
+runs, those sessions count toward a user's history but contribute no insights.
+Safe to rerun: sessions that already have a row are skipped.
+"""
+import asyncio
+
+from sqlalchemy import select, tuple_
+from sqlalchemy.orm import selectinload
+
+from app.models.conversation import Conversation
+from app.models.conversation_insights import ConversationInsights
+from app.services.session_context import SessionContextService
+
+BATCH_SIZE = 200
+
+
+async def main():
+    """Record insights for every web session without a row."""
+    from app.core.database import async_session_maker
+    import app.models  # noqa: F401 — register all SQLAlchemy mappers
+
+    processed = 0
+    last_key = None  # (created_at, id) of the last session seen
+    async with async_session_maker() as session:
+        service = SessionContextService(session)
+        while True:
+            query = (
+                select(Conversation)
+                .outerjoin(
+                    ConversationInsights,
+                    ConversationInsights.conversation_id == Conversation.id,
+                )
+                .where(
+                    Conversation.user_id.is_not(None),
+                    ConversationInsights.conversation_id.is_(None),
+                )
+                .order_by(Conversation.created_at, Conversation.id)
+                .limit(BATCH_SIZE)
+                .options(selectinload(Conversation.messages))
+            )
+            if last_key is not None:
+                query = query.where(
+                    tuple_(Conversation.created_at, Conversation.id) > last_key
+                )
+            conversations = list((await session.execute(query)).scalars().all())
+            if not conversations:
+                break
+
+            last_key = (conversations[-1].created_at, conversations[-1].id)
+            for conversation in conversations:
+                await service.record_messages(conversation, conversation.messages)
+            await session.commit()
+
+            processed += len(conversations)
+            print(f"Processed {processed} sessions")
+            session.expunge_all()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
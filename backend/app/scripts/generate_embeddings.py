@@ -1,47 +1,87 @@
-"""Generate embeddings for wine seed data.
+"""Generate embeddings for wine seed data or the wine catalog in the database.
 
 Usage:
-    python -m app.scripts.generate_embeddings
+    python -m app.scripts.generate_embeddings            # seed JSON file
+    python -m app.scripts.generate_embeddings --db       # wines table
+    python -m app.scripts.generate_embeddings --db --only-missing
+    python -m app.scripts.generate_embeddings --db --incremental
+    python -m app.scripts.generate_embeddings --db --status
+
+Texts are embedded in batches, several batches concurrently (see
+app/services/embedding_pipeline.py). Use --checkpoint to resume an
+interrupted run and --rpm to stay under the provider rate limit.
+
+--incremental re-embeds only wines whose embedding text (content hash) or
+embedding model changed; --status reports how many are stale without
+calling the API. After upgrading to migration 016, run once with
+--adopt-existing to record hashes for the current embeddings.
 
 Requires OPENROUTER_API_KEY environment variable.
 Alternatively, set OPENAI_API_KEY to use OpenAI directly.
 """
+import argparse
 import asyncio
 import json
 import os
 from pathlib import Path
 
-import openai
+from app.core.http_clients import close_http_clients, get_openai_client
+from app.services.embedding_pipeline import (
+    EmbeddingPipeline,
+    create_embedding_text,
+    embed_catalog,
+    embedding_status,
+)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--db", action="store_true", help="Embed wines in the database instead of the seed file")
+    parser.add_argument("--only-missing", action="store_true", help="With --db: only wines without an embedding")
+    parser.add_argument("--incremental", action="store_true", help="With --db: only wines whose text or model changed")
+    parser.add_argument("--adopt-existing", action="store_true", help="With --db: record hashes for embeddings of unknown provenance")
+    parser.add_argument("--status", action="store_true", help="With --db: report embedding staleness and exit")
+    parser.add_argument("--batch-size", type=int, default=64, help="Texts per embeddings request")
+    parser.add_argument("--concurrency", type=int, default=4, help="Requests in flight")
+    parser.add_argument("--rpm", type=int, default=0, help="Max requests per minute (0 = unlimited)")
+    parser.add_argument("--checkpoint", default=None, help="JSONL checkpoint file for resuming")
+    return parser.parse_args()
+
+
+async def embed_seed_file(pipeline: EmbeddingPipeline) -> None:
+    """Embed wines from wines_seed.json into wines_seed_with_embeddings.json."""
+    seed_file = Path(__file__).parent.parent / "data" / "wines_seed.json"
+    with open(seed_file) as f:
+        data = json.load(f)
 
+    print(f"Loaded {len(data['wines'])} wines from {seed_file}")
 
-async def generate_embedding(client: openai.AsyncOpenAI, text: str, model: str) -> list[float]:
-    """Generate embedding for text using OpenAI-compatible API."""
-    response = await client.embeddings.create(
-        model=model,
-        input=text,
-    )
-    return response.data[0].embedding
-
-
-def create_embedding_text(wine: dict) -> str:
-    """Create text representation of wine for embedding."""
-    parts = [
-        f"{wine['name']} by {wine['producer']}",
-        f"Type: {wine['wine_type']}",
-        f"Country: {wine['country']}, Region: {wine['region']}",
-        f"Grapes: {', '.join(wine['grape_varieties'])}",
-        f"Sweetness: {wine['sweetness']}, Body: {wine['body']}/5",
-        wine['description'],
+    items = [
+        (str(i), create_embedding_text(wine))
+        for i, wine in enumerate(data["wines"])
     ]
-    if wine.get('tasting_notes'):
-        parts.append(f"Tasting notes: {wine['tasting_notes']}")
-    if wine.get('food_pairings'):
-        parts.append(f"Pairs with: {', '.join(wine['food_pairings'])}")
-    return " ".join(parts)
+    results = await pipeline.run(items)
+
+    wines_with_embeddings = []
+    for i, wine in enumerate(data["wines"]):
+        embedding = results.get(str(i))
+        if embedding is not None:
+            wine = {**wine, "embedding": embedding}
+        wines_with_embeddings.append(wine)
+
+    # Save output
+    output_file = Path(__file__).parent.parent / "data" / "wines_seed_with_embeddings.json"
+    with open(output_file, "w") as f:
+        json.dump({"wines": wines_with_embeddings}, f, ensure_ascii=False)
+
+    print(f"\nSaved {len(wines_with_embeddings)} wines to {output_file}")
+    print(f"Wines with embeddings: {len(results)}/{len(wines_with_embeddings)}")
 
 
 async def main():
-    """Generate embeddings for all wines in seed data."""
+    """Generate embeddings for all wines."""
+    args = parse_args()
+
     # Check for OpenRouter first, then OpenAI
     openrouter_key = os.getenv("OPENROUTER_API_KEY")
     openai_key = os.getenv("OPENAI_API_KEY")
@@ -49,52 +89,51 @@ async def main():
     if openrouter_key:
         base_url = os.getenv("OPENROUTER_BASE_URL", "https://openrouter.ai/api/v1")
         print(f"Using OpenRouter-compatible API ({base_url})")
-        client = openai.AsyncOpenAI(
-            api_key=openrouter_key,
-            base_url=base_url,
-        )
+        client = get_openai_client(api_key=openrouter_key, base_url=base_url)
         embedding_model = os.getenv("EMBEDDING_MODEL", "BAAI/bge-m3")
     elif openai_key:
         print("Using OpenAI API directly")
-        client = openai.AsyncOpenAI(api_key=openai_key)
+        client = get_openai_client(api_key=openai_key)
         embedding_model = os.getenv("EMBEDDING_MODEL", "text-embedding-3-small")
     else:
         print("Error: Set OPENROUTER_API_KEY or OPENAI_API_KEY environment variable")
         return
 
-    # Load seed data
-    seed_file = Path(__file__).parent.parent / "data" / "wines_seed.json"
-    with open(seed_file) as f:
-        data = json.load(f)
-
-    print(f"Loaded {len(data['wines'])} wines from {seed_file}")
     print(f"Using embedding model: {embedding_model}")
+    pipeline = EmbeddingPipeline(
+        client=client,
+        model=embedding_model,
+        batch_size=args.batch_size,
+        concurrency=args.concurrency,
+        requests_per_minute=args.rpm,
+        checkpoint_path=args.checkpoint,
+    )
 
-    # Generate embeddings
-    wines_with_embeddings = []
-    for i, wine in enumerate(data["wines"]):
-        text = create_embedding_text(wine)
-        print(f"[{i+1}/{len(data['wines'])}] Generating embedding for: {wine['name'][:50]}...")
-
-        try:
-            embedding = await generate_embedding(client, text, embedding_model)
-            wine_copy = wine.copy()
-            wine_copy["embedding"] = embedding
-            wines_with_embeddings.append(wine_copy)
-        except Exception as e:
-            print(f"  Error: {e}")
-            wines_with_embeddings.append(wine)
-
-    # Save output
-    output_file = Path(__file__).parent.parent / "data" / "wines_seed_with_embeddings.json"
-    with open(output_file, "w") as f:
-        json.dump({"wines": wines_with_embeddings}, f, ensure_ascii=False)
-
-    print(f"\nSaved {len(wines_with_embeddings)} wines to {output_file}")
-
-    # Count wines with embeddings
-    with_embeddings = sum(1 for w in wines_with_embeddings if "embedding" in w)
-    print(f"Wines with embeddings: {with_embeddings}/{len(wines_with_embeddings)}")
+    try:
+        if args.db:
+            from app.core.database import async_session_maker
+            import app.models  # noqa: F401 — register all SQLAlchemy mappers
+
+            async with async_session_maker() as session:
+                if args.status:
+                    for status, count in (await embedding_status(session, embedding_model)).items():
+                        print(f"{status:>16}: {count}")
+                    return
+                updated = await embed_catalog(
+                    session,
+                    pipeline,
+                    only_missing=args.only_missing,
+                    incremental=args.incremental,
+                    adopt_existing=args.adopt_existing,
+                )
+            print(f"Updated embeddings for {updated} wines")
+        else:
+            await embed_seed_file(pipeline)
+
+        if pipeline.failed_keys:
+            print(f"Failed: {len(pipeline.failed_keys)} texts (rerun with --checkpoint to resume)")
+    finally:
+        await close_http_clients()
 
 
 if __name__ == "__main__":
@@ -8,7 +8,7 @@ from app.models.user import User
 from app.repositories.user import UserRepository
 from app.core.security import (
     create_access_token,
-    verify_password_with_timing_protection,
+    verify_password_and_update_async,
 )
 from app.schemas.auth import RegisterRequest, LoginRequest
 
@@ -62,9 +62,10 @@ class AuthService:
         # Get user by email
         user = await self.user_repo.get_by_email(data.email)
 
-        # Verify password with timing protection
+        # Verify password with timing protection (off the event loop)
         password_hash = user.password_hash if user else None
-        if not verify_password_with_timing_protection(data.password, password_hash):
+        valid, new_hash = await verify_password_and_update_async(data.password, password_hash)
+        if not valid:
             logger.warning("Authentication failed: invalid credentials for email: %s", data.email)
             return None
 
@@ -73,6 +74,11 @@ class AuthService:
             logger.warning("Authentication failed: user inactive: %s", user.id)
             return None
 
+        if new_hash is not None:
+            # Stored hash uses an outdated bcrypt cost: upgrade transparently
+            await self.user_repo.set_password_hash(user, new_hash)
+            logger.info("Password hash upgraded to current cost for user: %s", user.id)
+
         # Create access token
         access_token = create_access_token(subject=str(user.id))
         logger.info("User authenticated successfully: %s", user.id)
@@ -2,10 +2,12 @@
 import logging
 import re
 import uuid
+from datetime import datetime, timezone
 from typing import Optional
 
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
+from app.core.metrics import collect_spans, summarize_spans, timed
 from app.models.conversation import Conversation
 from app.models.message import Message, MessageRole
 from app.models.wine import Wine
@@ -13,7 +15,15 @@ from app.repositories.conversation import ConversationRepository
 from app.repositories.message import MessageRepository
 from app.repositories.wine import WineRepository
 from app.services.ai_mock import MockAIService
-from app.services.session_context import SessionContextService
+from app.services.jobs import (
+    JOB_SESSION_INSIGHTS,
+    JOB_SESSION_TITLE,
+    enqueue_job,
+    get_job_runner,
+)
+from app.services.response_stream import EventCallback
+from app.services.session_context import CrossSessionContext, SessionContextService
+from app.services.session_naming import run_session_title_job
 from app.services.sommelier import (
     SommelierService,
     detect_event,
@@ -38,12 +48,34 @@ WELCOME_MESSAGE_FALLBACK = """Привет! Я GetMyWine, и я помогу в
 class ChatService:
     """Service for chat operations."""
 
-    def __init__(self, db: AsyncSession):
+    def __init__(
+        self,
+        db: AsyncSession,
+        session_factory: Optional[async_sessionmaker] = None,
+    ):
+        """
+        Args:
+            db: Request session
+            session_factory: If set, send_message() works in short units of
+                work: it commits before waiting on the LLM (returning the
+                pooled connection) and agent tools use their own short-lived
+                sessions from this factory
+        """
         self.db = db
+        self.session_factory = session_factory
         self.conversation_repo = ConversationRepository(db)
         self.message_repo = MessageRepository(db)
         self.wine_repo = WineRepository(db)
-        self.sommelier = SommelierService(db)
+        self.sommelier = SommelierService(db, session_factory=session_factory)
+
+    async def _end_unit_of_work(self) -> None:
+        """Commit so the connection goes back to the pool before a slow LLM call.
+
+        No-op unless a session_factory was given (the caller then owns the
+        transaction as before).
+        """
+        if self.session_factory is not None:
+            await self.db.commit()
 
     async def get_or_create_conversation(
         self,
@@ -125,6 +157,12 @@ class ChatService:
         if active_session:
             await self.conversation_repo.close_session(active_session)
             logger.info("Closed active session %s for user %s", active_session.id, user_id)
+            if get_job_runner() is not None:
+                # LLM insights of the finished session, for later welcomes
+                await enqueue_job(
+                    self.db, JOB_SESSION_INSIGHTS,
+                    {"conversation_id": str(active_session.id)},
+                )
 
         # Create new conversation
         conversation = await self.conversation_repo.create(user_id)
@@ -225,17 +263,22 @@ class ChatService:
         user_id: uuid.UUID,
         content: str,
         user_profile: Optional[dict] = None,
+        on_event: Optional[EventCallback] = None,
     ) -> tuple[Message, Message]:
         """
         Send a user message and get AI response with conversation history.
 
         Detects events/food in user message and generates contextual response.
         Includes conversation history for better context understanding.
+        Per-stage timings are recorded as metrics spans (app.core.metrics)
+        and logged at the end of the request.
 
         Args:
             user_id: The user's ID
             content: The message content
             user_profile: Optional user taste profile for personalization
+            on_event: Optional callback receiving streaming progress events
+                (used by the SSE endpoint)
 
         Returns:
             Tuple of (user_message, ai_message)
@@ -243,22 +286,40 @@ class ChatService:
         Raises:
             ValueError: If conversation doesn't exist
         """
+        with collect_spans() as spans:
+            with timed("request"):
+                user_message, ai_message = await self._send_message(
+                    user_id, content, user_profile, on_event,
+                )
+        logger.info("Request timings (ms): %s", summarize_spans(spans))
+        return user_message, ai_message
+
+    async def _send_message(
+        self,
+        user_id: uuid.UUID,
+        content: str,
+        user_profile: Optional[dict],
+        on_event: Optional[EventCallback],
+    ) -> tuple[Message, Message]:
+        """send_message() body, run inside the request's timing spans."""
+        received_at = datetime.now(timezone.utc)
+
         # Get conversation
         conversation = await self.conversation_repo.get_by_user_id(user_id)
         if not conversation:
             raise ValueError("Conversation not found")
 
-        # Get conversation history BEFORE saving new message
+        # Get conversation history (the new message is saved with the reply)
         # Limit to last 10 messages for LLM context
-        history = await self._get_conversation_history(conversation.id, limit=10)
+        with timed("history_load"):
+            history = await self._get_conversation_history(conversation.id, limit=10)
 
-        # Save user message
-        user_message = await self.message_repo.create(
-            conversation_id=conversation.id,
-            role=MessageRole.USER,
-            content=content,
+        cross_session_context = await self._build_cross_session_context(
+            user_id, conversation.id,
         )
-        logger.debug("Saved user message: %s", user_message.id)
+
+        # Context is loaded: release the connection while the LLM works
+        await self._end_unit_of_work()
 
         # Detect context from user message
         detected_event = detect_event(content)
@@ -273,6 +334,8 @@ class ChatService:
             detected_food=detected_food,
             user_profile=user_profile,
             conversation_history=history,
+            cross_session_context=cross_session_context,
+            on_event=on_event,
         )
 
         # Check for guard markers and log if present
@@ -288,23 +351,30 @@ class ChatService:
                 r"\[GUARD:\w+\]\s*", "", ai_response_content
             )
 
-        # Save AI response
-        ai_message = await self.message_repo.create(
-            conversation_id=conversation.id,
-            role=MessageRole.ASSISTANT,
-            content=ai_response_content,
-        )
-        logger.debug("Saved AI response: %s", ai_message.id)
+        # Save the exchange and bump the conversation timestamp
+        with timed("persist"):
+            user_message, ai_message = await self.message_repo.append_turn(
+                conversation_id=conversation.id,
+                user_content=content,
+                assistant_content=ai_response_content,
+                user_sent_at=received_at,
+            )
+            logger.debug("Saved exchange: %s, %s", user_message.id, ai_message.id)
 
-        # Update conversation timestamp
-        await self.conversation_repo.update_timestamp(conversation)
+        # Fold the exchange into precomputed cross-session insights
+        with timed("session_insights"):
+            await SessionContextService(self.db).record_messages(
+                conversation, [user_message, ai_message],
+            )
 
         # Auto-generate session title on first exchange (if not already set)
-        await self._maybe_generate_session_title(
-            conversation=conversation,
-            user_message=content,
-            ai_response=ai_response_content,
-        )
+        with timed("session_title"):
+            await self._maybe_generate_session_title(
+                conversation=conversation,
+                user_message=content,
+                ai_response=ai_response_content,
+                first_exchange=not history,
+            )
 
         return user_message, ai_message
 
@@ -313,51 +383,36 @@ class ChatService:
         conversation,
         user_message: str,
         ai_response: str,
+        first_exchange: bool = True,
     ) -> None:
         """
         Generate session title if this is the first non-welcome exchange.
 
         Conditions for title generation:
         - Conversation has no title yet
-        - This is the first user message (only welcome + user + ai = 3 messages)
+        - This is the first exchange (no earlier non-welcome messages)
 
-        Title generation is fire-and-forget to not block the response.
+        The title is generated by a background job (app.services.jobs), so the
+        extra LLM call stays off the request path; with jobs disabled it runs
+        inline.
         """
         try:
             # Skip if already has title
-            if conversation.title:
+            if conversation.title or not first_exchange:
                 return
 
-            # Check if LLM is configured before doing any work
-            from app.services.session_naming import get_session_naming_service
-            naming_service = get_session_naming_service()
-
-            if not naming_service.is_llm_configured():
-                # No LLM configured, use date fallback immediately
-                title = naming_service._generate_date_fallback()
-            else:
-                # Check if this is the first exchange (welcome + user + ai = 3 messages)
-                # Need to refresh to get updated message count
-                await self.db.refresh(conversation)
-                message_count = len(conversation.messages)
-
-                if message_count != 3:
-                    # Not the first exchange, skip
-                    return
-
-                logger.info(
-                    "Triggering session title generation for conversation %s",
-                    conversation.id,
-                )
-
-                title = await naming_service.generate_session_title(
-                    user_message=user_message,
-                    ai_response=ai_response,
-                )
+            payload = {
+                "conversation_id": str(conversation.id),
+                "user_message": user_message,
+                "ai_response": ai_response,
+            }
+            if get_job_runner() is not None:
+                await enqueue_job(self.db, JOB_SESSION_TITLE, payload)
+                return
 
-            # Update conversation title
-            await self.conversation_repo.update_title(conversation, title)
-            logger.info("Set session title: %s", title)
+            # Don't hold a connection while the title is generated
+            await self._end_unit_of_work()
+            await run_session_title_job(self.db, payload)
 
         except Exception as e:
             # Don't fail the response if naming fails
@@ -397,6 +452,25 @@ class ChatService:
 
         return history
 
+    async def _build_cross_session_context(
+        self,
+        user_id: uuid.UUID,
+        conversation_id: uuid.UUID,
+    ) -> Optional[CrossSessionContext]:
+        """Context from the user's previous sessions (None if it can't be built)."""
+        try:
+            with timed("cross_session_context"):
+                # Savepoint: a failed read must not abort the request's
+                # transaction, which still has to save the exchange
+                async with self.db.begin_nested():
+                    return await SessionContextService(self.db).build_cross_session_context(
+                        user_id=user_id,
+                        exclude_session_id=conversation_id,
+                    )
+        except Exception as e:
+            logger.warning("Cross-session context unavailable: %s", e)
+            return None
+
     async def _generate_contextual_response(
         self,
         user_id: uuid.UUID,
@@ -406,6 +480,8 @@ class ChatService:
         detected_food: Optional[str],
         user_profile: Optional[dict],
         conversation_history: Optional[list[dict]] = None,
+        cross_session_context: Optional[CrossSessionContext] = None,
+        on_event: Optional[EventCallback] = None,
     ) -> str:
         """
         Generate contextual AI response using LLM or mock.
@@ -427,21 +503,16 @@ class ChatService:
             logger.debug("Using %d messages from history", len(conversation_history))
 
         try:
-            # Build cross-session context
-            context_service = SessionContextService(self.db)
-            cross_session_context = await context_service.build_cross_session_context(
-                user_id=user_id,
-                exclude_session_id=conversation_id,
-            )
-
             # Use SommelierService which handles LLM + fallback
-            response = await self.sommelier.generate_response(
-                user_message=user_message,
-                user_profile=user_profile,
-                conversation_history=conversation_history,
-                cross_session_context=cross_session_context,
-            )
-            return response
+            with timed("generate_response"):
+                response_text, _wine_ids = await self.sommelier.generate_response(
+                    user_message=user_message,
+                    user_profile=user_profile,
+                    conversation_history=conversation_history,
+                    cross_session_context=cross_session_context,
+                    on_event=on_event,
+                )
+            return response_text
 
         except Exception as e:
             logger.warning("Sommelier response failed, using basic mock: %s", e)
@@ -3,6 +3,8 @@ import logging
 import os
 from typing import Optional
 
+from app.core.http_clients import get_openai_client
+
 logger = logging.getLogger(__name__)
 
 
@@ -29,9 +31,7 @@ class EmbeddingService:
             return None
 
         try:
-            import openai
-
-            client = openai.AsyncOpenAI(api_key=self.api_key)
+            client = get_openai_client(self.api_key)
             response = await client.embeddings.create(
                 model=self.model,
                 input=text,
@@ -58,9 +58,7 @@ class EmbeddingService:
             return [None] * len(texts)
 
         try:
-            import openai
-
-            client = openai.AsyncOpenAI(api_key=self.api_key)
+            client = get_openai_client(self.api_key)
             response = await client.embeddings.create(
                 model=self.model,
                 input=texts,
@@ -0,0 +1,209 @@
+"""Query embedding cache for semantic search.
+
+Users repeat the same short queries a lot ("лёгкое и освежающее", "к стейку"),
+and every semantic_search tool call would otherwise pay an embeddings API
+round-trip. Entries are keyed by (embedding_model, normalized query), evicted
+LRU-first when the cache is full and expire after a TTL. The cache can
+optionally be persisted to a JSON file so it survives restarts; periodic
+writes run in a worker thread so serializing the embeddings never blocks
+the event loop.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import re
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_query(query: str) -> str:
+    """Normalize query text so trivially different spellings share an entry."""
+    text = query.casefold().replace("ё", "е")
+    return _WHITESPACE_RE.sub(" ", text).strip()
+
+
+class EmbeddingCache:
+    """Bounded LRU + TTL cache of query embeddings with hit/miss counters."""
+
+    def __init__(
+        self,
+        max_size: int = 1000,
+        ttl_seconds: float = 86400,
+        path: Optional[str] = None,
+        persist_interval_seconds: float = 60,
+    ):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.path = Path(path) if path else None
+        self.persist_interval_seconds = persist_interval_seconds
+        self.hits = 0
+        self.misses = 0
+        # key -> (stored_at wall-clock timestamp, embedding)
+        self._entries: OrderedDict[str, tuple[float, list[float]]] = OrderedDict()
+        self._dirty = False
+        self._last_persist = time.monotonic()
+        self._persist_task: Optional[asyncio.Task] = None
+
+        if self.path is not None:
+            self.load()
+
+    @staticmethod
+    def _key(model: str, query: str) -> str:
+        return f"{model}\x1f{normalize_query(query)}"
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, model: str, query: str) -> Optional[list[float]]:
+        """Return cached embedding or None (counts a hit or a miss)."""
+        key = self._key(model, query)
+        entry = self._entries.get(key)
+        if entry is not None:
+            stored_at, embedding = entry
+            if time.time() - stored_at < self.ttl_seconds:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return embedding
+            # Expired
+            del self._entries[key]
+            self._dirty = True
+        self.misses += 1
+        return None
+
+    def set(self, model: str, query: str, embedding: list[float]) -> None:
+        """Store an embedding, evicting the least recently used entries if full."""
+        key = self._key(model, query)
+        self._entries[key] = (time.time(), list(embedding))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+        self._dirty = True
+        self._maybe_persist()
+
+    def clear(self) -> None:
+        """Drop all entries and reset counters."""
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+        self._dirty = True
+
+    def stats(self) -> dict:
+        """Cache statistics for logging/metrics."""
+        total = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+    # -------------------------------------------------------------------------
+    # Persistence
+    # -------------------------------------------------------------------------
+
+    def _maybe_persist(self) -> None:
+        """Start a background save if one is due (needs a running event loop)."""
+        if self.path is None or self._persist_task is not None:
+            return
+        if time.monotonic() - self._last_persist < self.persist_interval_seconds:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # No loop (sync caller): the shutdown save() persists the entries
+            return
+        self._last_persist = time.monotonic()
+        self._persist_task = loop.create_task(self._persist_in_background())
+
+    async def _persist_in_background(self) -> None:
+        try:
+            data = self._snapshot()
+            self._dirty = False
+            if not await asyncio.to_thread(self._write, data):
+                self._dirty = True
+        finally:
+            self._persist_task = None
+
+    def save(self) -> None:
+        """Write non-expired entries to disk (atomic replace). No-op without a path."""
+        if self.path is None or not self._dirty:
+            return
+        if self._write(self._snapshot()):
+            self._dirty = False
+            self._last_persist = time.monotonic()
+
+    def _snapshot(self) -> dict:
+        """Non-expired entries in file format (shares the embedding lists)."""
+        now = time.time()
+        return {
+            "entries": [
+                [key, stored_at, embedding]
+                for key, (stored_at, embedding) in self._entries.items()
+                if now - stored_at < self.ttl_seconds
+            ],
+        }
+
+    def _write(self, data: dict) -> bool:
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+            with open(tmp_path, "w") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.path)
+            return True
+        except OSError as e:
+            logger.warning("Failed to persist embedding cache to %s: %s", self.path, e)
+            return False
+
+    def load(self) -> None:
+        """Load entries from disk, skipping expired ones. No-op without a file."""
+        if self.path is None or not self.path.exists():
+            return
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning("Failed to load embedding cache from %s: %s", self.path, e)
+            return
+
+        now = time.time()
+        for key, stored_at, embedding in data.get("entries", [])[-self.max_size:]:
+            if now - stored_at < self.ttl_seconds:
+                self._entries[key] = (stored_at, embedding)
+        logger.info("Loaded %d cached query embeddings from %s", len(self._entries), self.path)
+
+
+# Singleton instance
+_embedding_cache: Optional[EmbeddingCache] = None
+
+
+def get_embedding_cache() -> Optional[EmbeddingCache]:
+    """Get or create the embedding cache singleton (None if disabled in config)."""
+    global _embedding_cache
+    settings = get_settings()
+    if not settings.embedding_cache_enabled:
+        return None
+    if _embedding_cache is None:
+        _embedding_cache = EmbeddingCache(
+            max_size=settings.embedding_cache_max_size,
+            ttl_seconds=settings.embedding_cache_ttl_seconds,
+            path=settings.embedding_cache_path or None,
+        )
+    return _embedding_cache
+
+
+def reset_embedding_cache():
+    """Reset embedding cache singleton (useful for testing)."""
+    global _embedding_cache
+    _embedding_cache = None
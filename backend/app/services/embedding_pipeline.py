@@ -0,0 +1,324 @@
+"""Bulk embedding pipeline for the wine catalog.
+
+Texts are embedded in batches (one embeddings API request per batch), several
+batches run concurrently under a request-rate limit, failed batches are
+retried with exponential backoff, and finished batches are appended to an
+optional JSONL checkpoint so an interrupted run resumes where it stopped.
+
+embed_catalog() embeds wines from the database and writes all vectors back
+with WineRepository.bulk_update_embeddings (UPDATE ... FROM (VALUES ...)),
+recording the content hash of the embedded text and the model name so later
+runs can re-embed incrementally (embedding_status() reports staleness).
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import random
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Mapping, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.wine import Wine
+from app.repositories.wine import WineRepository
+
+logger = logging.getLogger(__name__)
+
+
+def create_embedding_text(wine: Mapping[str, Any]) -> str:
+    """Create text representation of wine for embedding."""
+    parts = [
+        f"{wine['name']} by {wine['producer']}",
+        f"Type: {wine['wine_type']}",
+        f"Country: {wine['country']}, Region: {wine['region']}",
+        f"Grapes: {', '.join(wine['grape_varieties'])}",
+        f"Sweetness: {wine['sweetness']}, Body: {wine['body']}/5",
+        wine['description'],
+    ]
+    if wine.get('tasting_notes'):
+        parts.append(f"Tasting notes: {wine['tasting_notes']}")
+    if wine.get('food_pairings'):
+        parts.append(f"Pairs with: {', '.join(wine['food_pairings'])}")
+    return " ".join(parts)
+
+
+def wine_to_embedding_dict(wine) -> dict:
+    """Wine model (or row) -> dict in the seed-data shape used by create_embedding_text."""
+    return {
+        "name": wine.name,
+        "producer": wine.producer,
+        "wine_type": wine.wine_type.value,
+        "country": wine.country,
+        "region": wine.region,
+        "grape_varieties": wine.grape_varieties,
+        "sweetness": wine.sweetness.value,
+        "body": wine.body,
+        "description": wine.description,
+        "tasting_notes": wine.tasting_notes,
+        "food_pairings": wine.food_pairings,
+    }
+
+
+class RateLimiter:
+    """Spaces request starts evenly to stay under requests_per_minute."""
+
+    def __init__(self, requests_per_minute: int = 0):
+        self.interval = 60.0 / requests_per_minute if requests_per_minute > 0 else 0.0
+        self._next_slot = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        if not self.interval:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            wait = self._next_slot - now
+            self._next_slot = max(now, self._next_slot) + self.interval
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+class EmbeddingPipeline:
+    """Batched, concurrent, resumable embedding of (key, text) items."""
+
+    def __init__(
+        self,
+        client,
+        model: str,
+        batch_size: int = 64,
+        concurrency: int = 4,
+        requests_per_minute: int = 0,
+        max_retries: int = 5,
+        backoff_base_seconds: float = 1.0,
+        checkpoint_path: Optional[str] = None,
+    ):
+        self.client = client
+        self.model = model
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.backoff_base_seconds = backoff_base_seconds
+        self.checkpoint_path = Path(checkpoint_path) if checkpoint_path else None
+        self.rate_limiter = RateLimiter(requests_per_minute)
+        self.failed_keys: list[str] = []
+
+    def load_checkpoint(self) -> dict[str, list[float]]:
+        """Embeddings already computed by a previous run (same model only)."""
+        done: dict[str, list[float]] = {}
+        if self.checkpoint_path is None or not self.checkpoint_path.exists():
+            return done
+        with open(self.checkpoint_path) as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # Truncated last line of an interrupted run
+                if record.get("model") == self.model:
+                    done[record["key"]] = record["embedding"]
+        return done
+
+    def _append_checkpoint(self, results: dict[str, list[float]]) -> None:
+        if self.checkpoint_path is None:
+            return
+        self.checkpoint_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.checkpoint_path, "a+b") as f:
+            # Terminate a line left truncated by an interrupted run
+            if f.tell() > 0:
+                f.seek(-1, 2)
+                needs_newline = f.read(1) != b"\n"
+            else:
+                needs_newline = False
+        with open(self.checkpoint_path, "a") as f:
+            if needs_newline:
+                f.write("\n")
+            for key, embedding in results.items():
+                f.write(json.dumps({"key": key, "model": self.model, "embedding": embedding}))
+                f.write("\n")
+
+    async def _embed_batch(self, texts: list[str]) -> list[list[float]]:
+        """One embeddings request, retried with exponential backoff and jitter."""
+        for attempt in range(self.max_retries + 1):
+            await self.rate_limiter.acquire()
+            try:
+                response = await self.client.embeddings.create(
+                    model=self.model,
+                    input=texts,
+                )
+                # Providers may return items out of order; index is authoritative
+                data = sorted(response.data, key=lambda item: item.index)
+                return [item.embedding for item in data]
+            except Exception as e:
+                if attempt == self.max_retries:
+                    raise
+                delay = self.backoff_base_seconds * 2 ** attempt
+                delay += random.uniform(0, delay / 2)
+                logger.warning(
+                    "Embedding batch failed (attempt %d/%d), retrying in %.1fs: %s",
+                    attempt + 1, self.max_retries + 1, delay, e,
+                )
+                await asyncio.sleep(delay)
+        return []  # unreachable
+
+    async def run(self, items: list[tuple[str, str]]) -> dict[str, list[float]]:
+        """Embed (key, text) items, skipping keys found in the checkpoint.
+
+        Returns key -> embedding for every item that succeeded (including
+        checkpointed ones). Keys of batches that exhausted their retries are
+        collected in self.failed_keys.
+        """
+        results = self.load_checkpoint()
+        pending = [(key, text) for key, text in items if key not in results]
+        if results:
+            logger.info("Resuming: %d embeddings from checkpoint, %d pending", len(results), len(pending))
+
+        batches = [
+            pending[i:i + self.batch_size]
+            for i in range(0, len(pending), self.batch_size)
+        ]
+        semaphore = asyncio.Semaphore(self.concurrency)
+        self.failed_keys = []
+
+        async def process(batch: list[tuple[str, str]]) -> None:
+            async with semaphore:
+                try:
+                    embeddings = await self._embed_batch([text for _, text in batch])
+                except Exception as e:
+                    logger.error("Embedding batch of %d failed permanently: %s", len(batch), e)
+                    self.failed_keys.extend(key for key, _ in batch)
+                    return
+            batch_results = {key: emb for (key, _), emb in zip(batch, embeddings)}
+            self._append_checkpoint(batch_results)
+            results.update(batch_results)
+
+        await asyncio.gather(*(process(batch) for batch in batches))
+        return {key: results[key] for key, _ in items if key in results}
+
+
+# Embedding status of a catalog row (see classify_embedding)
+STATUS_UP_TO_DATE = "up_to_date"
+STATUS_MISSING = "missing"
+STATUS_UNKNOWN = "unknown"  # Embedded before content hashes were recorded
+STATUS_MODEL_CHANGED = "model_changed"
+STATUS_CONTENT_CHANGED = "content_changed"
+
+
+def content_hash(text: str) -> str:
+    """SHA-256 hex digest of an embedding text."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def classify_embedding(row, text_hash: str, model: str) -> str:
+    """Compare a row's recorded embedding provenance with its current text."""
+    if row.embedding_missing:
+        return STATUS_MISSING
+    if row.embedding_content_hash is None:
+        return STATUS_UNKNOWN
+    if row.embedding_model != model:
+        return STATUS_MODEL_CHANGED
+    if row.embedding_content_hash != text_hash:
+        return STATUS_CONTENT_CHANGED
+    return STATUS_UP_TO_DATE
+
+
+async def _load_catalog_rows(db: AsyncSession) -> list:
+    """Text columns + embedding provenance for every wine (no vectors)."""
+    query = select(
+        Wine.id, Wine.name, Wine.producer, Wine.wine_type, Wine.country,
+        Wine.region, Wine.grape_varieties, Wine.sweetness, Wine.body,
+        Wine.description, Wine.tasting_notes, Wine.food_pairings,
+        Wine.embedding_content_hash, Wine.embedding_model,
+        Wine.embedding.is_(None).label("embedding_missing"),
+    )
+    return list((await db.execute(query)).all())
+
+
+async def _plan_catalog(db: AsyncSession, model: str) -> list[tuple[Any, str, str, str]]:
+    """(row, text, text_hash, status) for every wine."""
+    plan = []
+    for row in await _load_catalog_rows(db):
+        text = create_embedding_text(wine_to_embedding_dict(row))
+        text_hash = content_hash(text)
+        plan.append((row, text, text_hash, classify_embedding(row, text_hash, model)))
+    return plan
+
+
+async def embedding_status(db: AsyncSession, model: str) -> dict[str, int]:
+    """Count wines per embedding status for the given model.
+
+    Reads only text columns and provenance (never the vectors), so it is
+    cheap enough to run before deciding whether a re-embed is needed.
+    """
+    counts = Counter(status for _, _, _, status in await _plan_catalog(db, model))
+    return {
+        "total": sum(counts.values()),
+        STATUS_UP_TO_DATE: counts[STATUS_UP_TO_DATE],
+        STATUS_MISSING: counts[STATUS_MISSING],
+        STATUS_UNKNOWN: counts[STATUS_UNKNOWN],
+        STATUS_MODEL_CHANGED: counts[STATUS_MODEL_CHANGED],
+        STATUS_CONTENT_CHANGED: counts[STATUS_CONTENT_CHANGED],
+    }
+
+
+async def embed_catalog(
+    db: AsyncSession,
+    pipeline: EmbeddingPipeline,
+    only_missing: bool = False,
+    incremental: bool = False,
+    adopt_existing: bool = False,
+) -> int:
+    """Embed catalog wines and bulk-write the vectors. Returns rows updated.
+
+    Args:
+        db: Database session
+        pipeline: Configured embedding pipeline (its model is recorded)
+        only_missing: Only wines without an embedding
+        incremental: Only wines whose text hash or model changed (or missing)
+        adopt_existing: Stamp embeddings of unknown provenance with the
+            current hash/model instead of re-embedding them
+
+    Items are keyed by content hash, so identical texts are embedded once and
+    a checkpoint stays valid across catalog reseeds that change wine ids.
+    """
+    repo = WineRepository(db)
+    plan = await _plan_catalog(db, pipeline.model)
+
+    if adopt_existing:
+        unknown = [(row, text_hash) for row, _, text_hash, status in plan if status == STATUS_UNKNOWN]
+        if unknown:
+            await repo.stamp_embedding_metadata(
+                {row.id: text_hash for row, text_hash in unknown}, pipeline.model,
+            )
+            logger.info("Adopted %d existing embeddings", len(unknown))
+            plan = [
+                (row, text, text_hash, STATUS_UP_TO_DATE if status == STATUS_UNKNOWN else status)
+                for row, text, text_hash, status in plan
+            ]
+
+    if only_missing:
+        plan = [entry for entry in plan if entry[3] == STATUS_MISSING]
+    elif incremental:
+        plan = [entry for entry in plan if entry[3] != STATUS_UP_TO_DATE]
+
+    texts = {text_hash: text for _, text, text_hash, _ in plan}
+    logger.info(
+        "Embedding %d wines (%d unique texts) with %s",
+        len(plan), len(texts), pipeline.model,
+    )
+    results = await pipeline.run(list(texts.items()))
+
+    embeddings = {
+        row.id: results[text_hash]
+        for row, _, text_hash, _ in plan if text_hash in results
+    }
+    updated = await repo.bulk_update_embeddings(
+        embeddings,
+        content_hashes={row.id: text_hash for row, _, text_hash, _ in plan},
+        model=pipeline.model,
+    )
+    await db.commit()
+    return updated
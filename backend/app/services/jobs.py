@@ -0,0 +1,256 @@
+"""Background job runner.
+
+Work that does not shape the response (session titles, LLM session
+insights) used to run inline, adding a database refresh and a whole extra
+LLM call to the request. It is now enqueued as a BackgroundJob row in the
+request's transaction and executed by JobRunner, a pool of asyncio workers
+in the web process:
+
+- workers claim due jobs with FOR UPDATE SKIP LOCKED, so several processes
+  can share the table;
+- a committed enqueue wakes a worker immediately, otherwise the table is
+  polled every JOB_POLL_SECONDS;
+- a failed job is retried with exponential backoff until max_attempts, then
+  kept as failed with its last error;
+- a running job sends heartbeats; jobs without one for stale_after (their
+  process stopped, or their outcome could not be saved) are requeued on
+  start and by a periodic sweep, or failed once their attempts are used up.
+"""
+
+import asyncio
+import logging
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Optional
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.config import get_settings
+from app.core.metrics import JOB_SECONDS, JOBS_PROCESSED, JOBS_RUNNING
+from app.models.background_job import BackgroundJob
+from app.repositories.background_job import BackgroundJobRepository
+
+logger = logging.getLogger(__name__)
+
+# Job kinds
+JOB_SESSION_TITLE = "session_title"
+JOB_SESSION_INSIGHTS = "session_insights"
+
+# Longest pause before a failed job is retried (seconds)
+MAX_RETRY_BACKOFF = 300.0
+
+# (db, payload, last_attempt): on the last attempt a handler should fall
+# back instead of failing on a transient error
+JobHandler = Callable[[AsyncSession, dict[str, Any], bool], Awaitable[None]]
+
+
+class JobRunner:
+    """Pool of asyncio workers executing BackgroundJob rows.
+
+    Args:
+        session_factory: Sessions for claiming and running jobs
+        workers: Number of jobs run concurrently
+        poll_interval: Seconds between queue checks when idle
+        stale_after: Running jobs without a heartbeat for this long are requeued
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker,
+        workers: int = 2,
+        poll_interval: float = 5.0,
+        stale_after: timedelta = timedelta(minutes=10),
+    ):
+        self.session_factory = session_factory
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.stale_after = stale_after
+        self._handlers: dict[str, JobHandler] = {}
+        self._wake = asyncio.Event()
+        self._tasks: list[asyncio.Task] = []
+        self._next_sweep = 0.0
+
+    def register(self, kind: str, handler: JobHandler) -> None:
+        """Set the coroutine executing jobs of `kind`."""
+        self._handlers[kind] = handler
+
+    def notify(self) -> None:
+        """Wake an idle worker (a job was just committed)."""
+        self._wake.set()
+
+    async def start(self, retention: Optional[timedelta] = None) -> None:
+        """Requeue stale jobs, prune old finished ones and start the workers."""
+        await self.requeue_stale()
+        if retention is not None:
+            async with self.session_factory() as db:
+                await BackgroundJobRepository(db).delete_done_before(
+                    datetime.now(timezone.utc) - retention,
+                )
+                await db.commit()
+
+        self._tasks = [
+            asyncio.create_task(self._worker()) for _ in range(self.workers)
+        ]
+        self.notify()
+
+    async def close(self) -> None:
+        """Stop the workers; interrupted jobs are requeued on next start."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def requeue_stale(self) -> None:
+        """Requeue (or fail) running jobs that stopped sending heartbeats."""
+        self._next_sweep = time.monotonic() + self.stale_after.total_seconds() / 2
+        async with self.session_factory() as db:
+            requeued, failed = await BackgroundJobRepository(db).requeue_stale(
+                self.stale_after,
+            )
+            await db.commit()
+        if requeued:
+            logger.info("Requeued %d abandoned background jobs", requeued)
+        if failed:
+            logger.error("Failed %d abandoned background jobs out of attempts", failed)
+
+    async def run_once(self) -> bool:
+        """Claim and execute one due job. Returns False if none was due."""
+        async with self.session_factory() as db:
+            jobs = await BackgroundJobRepository(db).claim(limit=1)
+            await db.commit()
+        if not jobs:
+            return False
+
+        job = jobs[0]
+        JOBS_RUNNING.inc()
+        start = time.perf_counter()
+        heartbeat = asyncio.create_task(self._heartbeat(job.id))
+        try:
+            try:
+                await self._execute(job)
+            finally:
+                heartbeat.cancel()
+        except Exception as e:
+            status = await self._record_failure(job, e)
+        else:
+            status = "done"
+            async with self.session_factory() as db:
+                await BackgroundJobRepository(db).complete(job.id)
+                await db.commit()
+        finally:
+            JOBS_RUNNING.dec()
+            JOB_SECONDS.observe(time.perf_counter() - start, kind=job.kind)
+        JOBS_PROCESSED.inc(kind=job.kind, status=status)
+        return True
+
+    async def _heartbeat(self, job_id: uuid.UUID) -> None:
+        interval = self.stale_after.total_seconds() / 3
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                async with self.session_factory() as db:
+                    await BackgroundJobRepository(db).heartbeat(job_id)
+                    await db.commit()
+            except Exception as e:
+                logger.warning("Background job %s heartbeat failed: %s", job_id, e)
+
+    async def _execute(self, job: BackgroundJob) -> None:
+        handler = self._handlers.get(job.kind)
+        if handler is None:
+            raise LookupError(f"No handler for job kind {job.kind!r}")
+        async with self.session_factory() as db:
+            await handler(db, job.payload, job.attempts >= job.max_attempts)
+            await db.commit()
+
+    async def _record_failure(self, job: BackgroundJob, error: Exception) -> str:
+        delay = min(MAX_RETRY_BACKOFF, 5 * 2 ** (job.attempts - 1))
+        async with self.session_factory() as db:
+            status = await BackgroundJobRepository(db).fail(
+                job,
+                f"{type(error).__name__}: {error}",
+                retry_at=datetime.now(timezone.utc) + timedelta(seconds=delay),
+            )
+            await db.commit()
+        if status == "failed":
+            logger.error(
+                "Background job %s (%s) failed after %d attempts: %s",
+                job.id, job.kind, job.attempts, error,
+            )
+        else:
+            logger.warning(
+                "Background job %s (%s) failed, retrying in %ds: %s",
+                job.id, job.kind, delay, error,
+            )
+        return status
+
+    async def _worker(self) -> None:
+        while True:
+            self._wake.clear()
+            try:
+                if time.monotonic() >= self._next_sweep:
+                    await self.requeue_stale()
+                ran = await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Claiming failed (e.g. database unavailable): back off
+                logger.warning("Background job worker error: %s", e)
+                ran = False
+            if ran:
+                # Let another idle worker look at the queue too
+                self.notify()
+                continue
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+
+async def enqueue_job(
+    db: AsyncSession,
+    kind: str,
+    payload: dict[str, Any],
+) -> BackgroundJob:
+    """Add a job in the caller's transaction; a worker wakes on commit."""
+    job = await BackgroundJobRepository(db).enqueue(
+        kind, payload, max_attempts=get_settings().job_max_attempts,
+    )
+    runner = get_job_runner()
+    if runner is not None:
+        event.listen(
+            db.sync_session, "after_commit", lambda session: runner.notify(), once=True,
+        )
+    return job
+
+
+# Singleton instance
+_job_runner: Optional[JobRunner] = None
+
+
+def get_job_runner() -> Optional[JobRunner]:
+    """Get or create the job runner singleton (None if jobs are disabled)."""
+    global _job_runner
+    settings = get_settings()
+    if not settings.jobs_enabled:
+        return None
+    if _job_runner is None:
+        from app.core.database import async_session_maker
+        from app.services.session_context import run_session_insights_job
+        from app.services.session_naming import run_session_title_job
+
+        _job_runner = JobRunner(
+            async_session_maker,
+            workers=settings.job_workers,
+            poll_interval=settings.job_poll_seconds,
+        )
+        _job_runner.register(JOB_SESSION_TITLE, run_session_title_job)
+        _job_runner.register(JOB_SESSION_INSIGHTS, run_session_insights_job)
+    return _job_runner
+
+
+def reset_job_runner():
+    """Reset job runner singleton (useful for testing)."""
+    global _job_runner
+    _job_runner = None
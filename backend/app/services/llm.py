@@ -6,14 +6,24 @@ Supports:
 - OpenAI GPT (direct)
 
 Includes conversation history support for contextual responses.
+
+Calls are routed by task: the agent loop runs on llm_provider/llm_model,
+while welcome, naming, insights and structured-output repair calls can each
+use their own provider, model, max_tokens and timeout (llm_<task>_* settings).
 """
 
+import asyncio
 import logging
+import time
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
-from typing import Optional
+from enum import Enum
+from typing import Awaitable, Callable, Optional
 
 from app.config import get_settings
+from app.core.http_clients import get_anthropic_client, get_openai_client
+from app.core.metrics import observe_llm_call
+from app.services.embedding_cache import get_embedding_cache
 
 logger = logging.getLogger(__name__)
 
@@ -25,6 +35,68 @@ class ChatMessage:
     content: str
 
 
+@dataclass
+class StreamedFunction:
+    """Function part of a tool call assembled from stream deltas."""
+    name: str
+    arguments: str
+
+
+@dataclass
+class StreamedToolCall:
+    """Tool call assembled from stream deltas (mirrors the OpenAI message shape)."""
+    id: str
+    function: StreamedFunction
+    type: str = "function"
+
+
+@dataclass
+class StreamedMessage:
+    """Assistant message assembled from a streamed completion."""
+    content: Optional[str]
+    tool_calls: Optional[list[StreamedToolCall]]
+    finish_reason: Optional[str] = None
+
+
+class LLMTask(str, Enum):
+    """Purpose of an LLM call, selecting its provider/model route."""
+    AGENT = "agent"
+    WELCOME = "welcome"
+    NAMING = "naming"
+    INSIGHTS = "insights"
+    REPAIR = "repair"
+
+
+# Tasks whose calls go through generate_with_tools
+TOOL_USE_TASKS = frozenset({LLMTask.AGENT, LLMTask.REPAIR})
+
+# Providers implementing generate_with_tools (see OpenRouterService)
+TOOL_USE_PROVIDERS = frozenset({"openrouter"})
+
+
+@dataclass(frozen=True)
+class TaskRoute:
+    """Provider, model and limits used for one LLMTask."""
+    provider: str
+    model: str
+    max_tokens: Optional[int] = None
+    timeout_seconds: Optional[float] = None
+
+
+# Receives each content delta of a streamed completion
+DeltaCallback = Callable[[str], Awaitable[None]]
+
+
+def _usage_tokens(usage) -> dict:
+    """prompt/completion token counts from an API usage object (if present)."""
+    counts = {}
+    for name in ("prompt_tokens", "completion_tokens"):
+        value = getattr(usage, name, None)
+        if isinstance(value, int):
+            counts[name] = value
+    return counts
+
+
 class BaseLLMService(ABC):
     """Abstract base class for LLM services."""
 
@@ -50,8 +122,13 @@ class BaseLLMService(ABC):
         temperature: Optional[float] = None,
         max_tokens: Optional[int] = None,
         response_format: Optional[dict] = None,
+        on_delta: Optional[DeltaCallback] = None,
     ):
-        """Generate a response with tool use support. Returns full message object."""
+        """Generate a response with tool use support. Returns full message object.
+
+        When on_delta is given, providers that support streaming call it with
+        each content delta as it arrives.
+        """
         raise NotImplementedError(
             f"{self.__class__.__name__} does not support tool use"
         )
@@ -83,16 +160,14 @@ class OpenRouterService(BaseLLMService):
 
         Uses Langfuse OpenAI wrapper for automatic LLM tracing when enabled.
         Falls back to standard OpenAI client when tracing is disabled.
+        The client comes from the shared registry (one connection pool).
         """
         if self._client is None:
             try:
-                if get_settings().langfuse_tracing_enabled:
-                    from langfuse.openai import AsyncOpenAI
-                else:
-                    from openai import AsyncOpenAI
-                self._client = AsyncOpenAI(
+                self._client = get_openai_client(
                     api_key=self.api_key,
                     base_url=self.base_url,
+                    tracing=get_settings().langfuse_tracing_enabled,
                 )
             except ImportError:
                 raise ImportError(
@@ -158,8 +233,13 @@ class OpenRouterService(BaseLLMService):
         temperature: Optional[float] = None,
         max_tokens: Optional[int] = None,
         response_format: Optional[dict] = None,
+        on_delta: Optional[DeltaCallback] = None,
     ):
-        """Generate response with tool use via OpenRouter."""
+        """Generate response with tool use via OpenRouter.
+
+        With on_delta the completion is streamed and the assembled
+        StreamedMessage is returned instead of the SDK message object.
+        """
         settings = get_settings()
         temp = temperature if temperature is not None else settings.llm_temperature
         tokens = max_tokens if max_tokens is not None else settings.llm_max_tokens
@@ -192,13 +272,78 @@ class OpenRouterService(BaseLLMService):
             kwargs["response_format"] = response_format
 
         try:
+            if on_delta is not None:
+                return await self._stream_with_tools(kwargs, on_delta)
+            start = time.perf_counter()
             response = await self.client.chat.completions.create(**kwargs)
+            observe_llm_call(
+                time.perf_counter() - start,
+                **_usage_tokens(getattr(response, "usage", None)),
+            )
             return response.choices[0].message
 
         except Exception as e:
             logger.error("OpenRouter API error (tool use): %s", e)
             raise LLMError(f"Failed to generate response with tools: {e}") from e
 
+    async def _stream_with_tools(
+        self, kwargs: dict, on_delta: DeltaCallback,
+    ) -> StreamedMessage:
+        """Stream a chat completion, forwarding content deltas as they arrive."""
+        start = time.perf_counter()
+        ttfb = None
+        usage = None
+        stream = await self.client.chat.completions.create(
+            **kwargs, stream=True, stream_options={"include_usage": True},
+        )
+
+        content_parts: list[str] = []
+        tool_calls: dict[int, dict] = {}
+        finish_reason = None
+        async for chunk in stream:
+            if ttfb is None:
+                ttfb = time.perf_counter() - start
+            # With include_usage the last chunk carries usage and no choices
+            usage = getattr(chunk, "usage", None) or usage
+            if not chunk.choices:
+                continue
+            choice = chunk.choices[0]
+            delta = choice.delta
+            if delta.content:
+                content_parts.append(delta.content)
+                await on_delta(delta.content)
+            for tc in delta.tool_calls or []:
+                entry = tool_calls.setdefault(
+                    tc.index, {"id": "", "name": "", "arguments": ""},
+                )
+                if tc.id:
+                    entry["id"] = tc.id
+                if tc.function:
+                    entry["name"] += tc.function.name or ""
+                    entry["arguments"] += tc.function.arguments or ""
+            if choice.finish_reason:
+                finish_reason = choice.finish_reason
+
+        observe_llm_call(
+            time.perf_counter() - start,
+            ttfb_seconds=ttfb,
+            streaming=True,
+            **_usage_tokens(usage),
+        )
+        return StreamedMessage(
+            content="".join(content_parts) or None,
+            tool_calls=[
+                StreamedToolCall(
+                    id=entry["id"],
+                    function=StreamedFunction(
+                        name=entry["name"], arguments=entry["arguments"],
+                    ),
+                )
+                for _, entry in sorted(tool_calls.items())
+            ] or None,
+            finish_reason=finish_reason,
+        )
+
     async def get_query_embedding(self, query: str) -> list[float]:
         """Generate embedding for a query using OpenAI embeddings API."""
         settings = get_settings()
@@ -227,8 +372,7 @@ class AnthropicService(BaseLLMService):
         """Lazy initialization of Anthropic client."""
         if self._client is None:
             try:
-                import anthropic
-                self._client = anthropic.AsyncAnthropic(api_key=self.api_key)
+                self._client = get_anthropic_client(self.api_key)
             except ImportError:
                 raise ImportError(
                     "anthropic package not installed. "
@@ -288,8 +432,7 @@ class OpenAIService(BaseLLMService):
         """Lazy initialization of OpenAI client."""
         if self._client is None:
             try:
-                import openai
-                self._client = openai.AsyncOpenAI(api_key=self.api_key)
+                self._client = get_openai_client(self.api_key)
             except ImportError:
                 raise ImportError(
                     "openai package not installed. "
@@ -351,6 +494,7 @@ class LLMService:
     def __init__(self):
         self.settings = get_settings()
         self._provider: Optional[BaseLLMService] = None
+        self._task_providers: dict[tuple[str, str], BaseLLMService] = {}
         self._initialized = False
 
     def _initialize(self):
@@ -359,47 +503,115 @@ class LLMService:
             return
 
         provider = self.settings.llm_provider.lower()
+        self._provider = self._build_provider(provider, self.settings.llm_model)
+
+        if self._provider is None:
+            logger.warning(
+                "No LLM API key configured for provider '%s'. "
+                "Will use mock responses. "
+                "Set OPENROUTER_API_KEY in .env for LLM support.",
+                provider,
+            )
 
+        self._initialized = True
+
+    def _build_provider(self, provider: str, model: str) -> Optional[BaseLLMService]:
+        """Create a provider client for a model (None if it has no API key)."""
         # OpenRouter (recommended)
         if provider == "openrouter" and self.settings.openrouter_api_key:
-            self._provider = OpenRouterService(
+            logger.info("LLM initialized with OpenRouter: %s", model)
+            return OpenRouterService(
                 api_key=self.settings.openrouter_api_key,
-                model=self.settings.llm_model,
+                model=model,
                 base_url=self.settings.openrouter_base_url,
             )
-            logger.info(
-                "LLM initialized with OpenRouter: %s",
-                self.settings.llm_model,
-            )
 
         # Anthropic (direct)
-        elif provider == "anthropic" and self.settings.anthropic_api_key:
-            self._provider = AnthropicService(
+        if provider == "anthropic" and self.settings.anthropic_api_key:
+            logger.info("LLM initialized with Anthropic Claude: %s", model)
+            return AnthropicService(
                 api_key=self.settings.anthropic_api_key,
-                model=self.settings.llm_model,
-            )
-            logger.info(
-                "LLM initialized with Anthropic Claude: %s",
-                self.settings.llm_model,
+                model=model,
             )
 
         # OpenAI (direct)
-        elif provider == "openai" and self.settings.openai_api_key:
-            self._provider = OpenAIService(
+        if provider == "openai" and self.settings.openai_api_key:
+            logger.info("LLM initialized with OpenAI: %s", model)
+            return OpenAIService(
                 api_key=self.settings.openai_api_key,
-                model=self.settings.llm_model,
+                model=model,
             )
-            logger.info("LLM initialized with OpenAI: %s", self.settings.llm_model)
 
-        else:
+        return None
+
+    def route(self, task: LLMTask) -> TaskRoute:
+        """Resolve the provider/model/limits configured for a task.
+
+        Tool-use tasks routed to a provider without tool support use the
+        main provider and model instead (the agent always does).
+        """
+        default = TaskRoute(
+            provider=self.settings.llm_provider.lower(),
+            model=self.settings.llm_model,
+        )
+        if task is LLMTask.AGENT:
+            return default
+
+        prefix = f"llm_{task.value}_"
+        provider = getattr(self.settings, prefix + "provider")
+        model = getattr(self.settings, prefix + "model")
+        max_tokens = getattr(self.settings, prefix + "max_tokens")
+        timeout = getattr(self.settings, prefix + "timeout_seconds")
+        provider = provider.lower() if provider else default.provider
+        model = model or default.model
+        if task in TOOL_USE_TASKS and provider not in TOOL_USE_PROVIDERS:
             logger.warning(
-                "No LLM API key configured for provider '%s'. "
-                "Will use mock responses. "
-                "Set OPENROUTER_API_KEY in .env for LLM support.",
-                provider,
+                "LLM provider '%s' does not support tool use, "
+                "%s calls use the default model instead",
+                provider, task.value,
             )
+            provider, model = default.provider, default.model
+        return TaskRoute(
+            provider=provider,
+            model=model,
+            max_tokens=max_tokens or None,
+            timeout_seconds=timeout or None,
+        )
 
-        self._initialized = True
+    def _provider_for(self, route: TaskRoute) -> BaseLLMService:
+        """Provider serving a route; routes on the default model share it."""
+        self._initialize()
+
+        if not self._provider:
+            raise LLMError("No LLM provider configured")
+
+        key = (route.provider, route.model)
+        if key == (self.settings.llm_provider.lower(), self.settings.llm_model):
+            return self._provider
+
+        if key not in self._task_providers:
+            provider = self._build_provider(*key)
+            if provider is None:
+                logger.warning(
+                    "No API key for LLM provider '%s' (model %s), "
+                    "using the default model instead",
+                    route.provider, route.model,
+                )
+                provider = self._provider
+            self._task_providers[key] = provider
+        return self._task_providers[key]
+
+    @staticmethod
+    async def _call(task: LLMTask, route: TaskRoute, call: Awaitable):
+        """Await a provider call within the task's timeout."""
+        if route.timeout_seconds is None:
+            return await call
+        try:
+            return await asyncio.wait_for(call, route.timeout_seconds)
+        except asyncio.TimeoutError as e:
+            raise LLMError(
+                f"LLM {task.value} call timed out after {route.timeout_seconds}s"
+            ) from e
 
     @property
     def is_available(self) -> bool:
@@ -427,6 +639,7 @@ class LLMService:
         temperature: Optional[float] = None,
         max_tokens: Optional[int] = None,
         response_format: Optional[dict] = None,
+        task: LLMTask = LLMTask.AGENT,
     ) -> str:
         """
         Generate LLM response with optional conversation history.
@@ -436,19 +649,18 @@ class LLMService:
             user_prompt: Current user message/prompt
             history: Previous conversation messages (user + assistant)
             temperature: Override default temperature
-            max_tokens: Override default max tokens
+            max_tokens: Override the task's default max tokens
             response_format: JSON schema for structured output
+            task: Call purpose, selects the provider/model route
 
         Returns:
             Model response text
 
         Raises:
-            LLMError: If no provider configured or API call fails
+            LLMError: If no provider configured, API call fails or times out
         """
-        self._initialize()
-
-        if not self._provider:
-            raise LLMError("No LLM provider configured")
+        route = self.route(task)
+        provider = self._provider_for(route)
 
         # Trim history to max messages
         trimmed_history = None
@@ -456,14 +668,18 @@ class LLMService:
             max_history = self.settings.llm_max_history_messages
             trimmed_history = history[-max_history:]
 
-        return await self._provider.generate(
+        # Direct Anthropic/OpenAI providers take no response_format
+        format_kwargs = (
+            {"response_format": response_format} if response_format is not None else {}
+        )
+        return await self._call(task, route, provider.generate(
             system_prompt=system_prompt,
             user_prompt=user_prompt,
             history=trimmed_history,
             temperature=temperature,
-            max_tokens=max_tokens,
-            response_format=response_format,
-        )
+            max_tokens=max_tokens if max_tokens is not None else route.max_tokens,
+            **format_kwargs,
+        ))
 
     async def generate_with_tools(
         self,
@@ -474,22 +690,27 @@ class LLMService:
         temperature: Optional[float] = None,
         max_tokens: Optional[int] = None,
         response_format: Optional[dict] = None,
+        on_delta: Optional[DeltaCallback] = None,
+        task: LLMTask = LLMTask.AGENT,
     ):
-        """Generate LLM response with tool use support."""
-        self._initialize()
+        """Generate LLM response with tool use support.
 
-        if not self._provider:
-            raise LLMError("No LLM provider configured")
+        Pass on_delta to stream content deltas (OpenRouter provider only).
+        """
+        route = self.route(task)
+        provider = self._provider_for(route)
 
-        return await self._provider.generate_with_tools(
+        stream_kwargs = {"on_delta": on_delta} if on_delta is not None else {}
+        return await self._call(task, route, provider.generate_with_tools(
             system_prompt=system_prompt,
             user_prompt=user_prompt,
             tools=tools,
             messages=messages,
             temperature=temperature,
-            max_tokens=max_tokens,
+            max_tokens=max_tokens if max_tokens is not None else route.max_tokens,
             response_format=response_format,
-        )
+            **stream_kwargs,
+        ))
 
     async def get_query_embedding(self, query: str) -> list[float]:
         """Generate embedding for a query string."""
@@ -498,7 +719,19 @@ class LLMService:
         if not self._provider:
             raise LLMError("No LLM provider configured")
 
-        return await self._provider.get_query_embedding(query)
+        cache = get_embedding_cache()
+        model = str(self.settings.embedding_model)
+        if cache is not None:
+            cached = cache.get(model, query)
+            if cached is not None:
+                logger.debug("Query embedding cache hit: %r", query)
+                return cached
+
+        embedding = await self._provider.get_query_embedding(query)
+
+        if cache is not None:
+            cache.set(model, query, embedding)
+        return embedding
 
     async def generate_wine_recommendation(
         self,
@@ -511,14 +744,15 @@ class LLMService:
         Generate wine recommendation with optimized settings.
 
         Uses slightly lower temperature for more consistent recommendations.
+        Routed as LLMTask.WELCOME (max tokens from llm_welcome_max_tokens).
         """
         return await self.generate(
             system_prompt=system_prompt,
             user_prompt=user_prompt,
             history=history,
             temperature=0.6,  # More focused for recommendations
-            max_tokens=2000,
             response_format=response_format,
+            task=LLMTask.WELCOME,
         )
 
 
@@ -0,0 +1,196 @@
+"""Semantic cache for informational sommelier answers.
+
+Questions like "что такое танины" or "чем брют отличается от сухого" get the
+same answer no matter who asks, yet each one runs the full agent loop. This
+cache stores final answers of response_type "informational" (no wines) keyed
+by the query embedding and serves them to later questions whose embedding is
+at least similarity_threshold cosine-similar.
+
+Only answers that cannot depend on the user are cached: the caller skips the
+cache for requests with a taste profile or cross-session history. Every entry
+belongs to a version derived from the system prompt, the shared prompt context
+(day and holiday events), the chat model and the embedding model; when any of
+them changes (e.g. a deploy with a new prompt, or the next day) all entries are
+dropped. Entries also expire after a TTL.
+
+Lookups score every entry against the query in pure Python, which costs
+O(entries x dimensions): about 10 ms for 500 bge-m3 (1024-d) entries. The
+scoring runs in a worker thread so it does not stall the event loop; keep
+response_cache_max_size in the hundreds.
+"""
+
+import asyncio
+import hashlib
+import logging
+import math
+import operator
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+def _normalize(vector: list[float]) -> Optional[list[float]]:
+    norm = math.sqrt(sum(x * x for x in vector))
+    if not norm:
+        return None
+    return [x / norm for x in vector]
+
+
+def _dot(a: list[float], b: list[float]) -> float:
+    return sum(map(operator.mul, a, b))
+
+
+def _scores(query: list[float], embeddings: list[list[float]]) -> list[float]:
+    return [_dot(query, embedding) for embedding in embeddings]
+
+
+def response_cache_version(
+    system_prompt: str, context: str, llm_model: str, embedding_model: str,
+) -> str:
+    """Version tag for cached answers: changes when prompt, context or models change."""
+    digest = hashlib.sha256(
+        "\x1f".join((system_prompt, context, llm_model, embedding_model)).encode("utf-8")
+    )
+    return digest.hexdigest()[:16]
+
+
+@dataclass
+class CachedResponse:
+    """A cached final answer (structured JSON text)."""
+
+    question: str
+    text: str
+    embedding: list[float]  # unit-normalized
+    stored_at: float
+    hits: int = 0
+
+
+class ResponseCache:
+    """Bounded LRU + TTL semantic cache with a single active version."""
+
+    def __init__(
+        self,
+        max_size: int = 500,
+        ttl_seconds: float = 86400,
+        similarity_threshold: float = 0.95,
+    ):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.similarity_threshold = similarity_threshold
+        self.version: Optional[str] = None
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[int, CachedResponse] = OrderedDict()
+        self._next_id = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _check_version(self, version: str) -> None:
+        if version != self.version:
+            if self._entries:
+                logger.info(
+                    "Response cache version changed (%s -> %s), dropping %d entries",
+                    self.version, version, len(self._entries),
+                )
+            self.invalidate()
+            self.version = version
+
+    def invalidate(self) -> None:
+        """Drop all entries."""
+        self._entries.clear()
+
+    async def get(self, embedding: list[float], version: str) -> Optional[CachedResponse]:
+        """Most similar non-expired entry above the threshold, or None."""
+        self._check_version(version)
+        query = _normalize(embedding)
+        if query is None:
+            return None
+
+        now = time.time()
+        expired = [
+            entry_id for entry_id, entry in self._entries.items()
+            if now - entry.stored_at >= self.ttl_seconds
+        ]
+        for entry_id in expired:
+            del self._entries[entry_id]
+
+        best_id, best_score = None, self.similarity_threshold
+        if self._entries:
+            candidates = list(self._entries.items())
+            scores = await asyncio.to_thread(
+                _scores, query, [entry.embedding for _, entry in candidates],
+            )
+            for (entry_id, _), score in zip(candidates, scores):
+                # Skip entries evicted or invalidated while scoring
+                if score >= best_score and entry_id in self._entries:
+                    best_id, best_score = entry_id, score
+
+        if best_id is None:
+            self.misses += 1
+            return None
+        entry = self._entries[best_id]
+        self._entries.move_to_end(best_id)
+        entry.hits += 1
+        self.hits += 1
+        logger.info(
+            "Response cache hit (similarity=%.3f) for question: %s",
+            best_score, entry.question[:50],
+        )
+        return entry
+
+    def set(self, embedding: list[float], version: str, question: str, text: str) -> None:
+        """Store an answer, evicting the least recently used entries if full."""
+        self._check_version(version)
+        normalized = _normalize(embedding)
+        if normalized is None:
+            return
+        self._entries[self._next_id] = CachedResponse(
+            question=question,
+            text=text,
+            embedding=normalized,
+            stored_at=time.time(),
+        )
+        self._next_id += 1
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        """Cache statistics for logging/metrics."""
+        total = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+
+# Singleton instance
+_response_cache: Optional[ResponseCache] = None
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """Get or create the response cache singleton (None if disabled in config)."""
+    global _response_cache
+    settings = get_settings()
+    if not settings.response_cache_enabled:
+        return None
+    if _response_cache is None:
+        _response_cache = ResponseCache(
+            max_size=settings.response_cache_max_size,
+            ttl_seconds=settings.response_cache_ttl_seconds,
+            similarity_threshold=settings.response_cache_similarity_threshold,
+        )
+    return _response_cache
+
+
+def reset_response_cache():
+    """Reset response cache singleton (useful for testing)."""
+    global _response_cache
+    _response_cache = None
@@ -0,0 +1,160 @@
+"""Incremental parser for streamed structured sommelier responses.
+
+The final LLM answer is a JSON object ``{"response_type", "intro", "wines",
+"closing", ...}`` (see SommelierResponse). While the provider streams it token
+by token, StructuredResponseStream turns the partial JSON into UI events so
+the client can render the intro before the wines are written, each wine as
+soon as its object is complete, and then the closing:
+
+    ("intro", {"delta": "..."})
+    ("wine", {"index": 0, "wine_id": ..., "wine_name": ..., "description": ...})
+    ("closing", {"delta": "..."})
+
+Streamed sections are a preview: the authoritative response is the one
+validated by SommelierService._parse_final_response after the stream ends.
+"""
+
+import json
+import re
+from typing import Awaitable, Callable, Optional
+
+# Receives streaming events as (event_name, payload)
+EventCallback = Callable[[str, dict], Awaitable[None]]
+
+_TEXT_KEYS = ("intro", "closing")
+_KEY_PATTERNS = {
+    key: re.compile(rf'"{key}"\s*:\s*') for key in _TEXT_KEYS
+}
+_WINES_PATTERN = re.compile(r'"wines"\s*:\s*\[')
+
+# Escapes that cannot be decoded yet because the chunk ended mid-sequence,
+# plus a dangling high surrogate waiting for its low half
+_PARTIAL_ESCAPE_RE = re.compile(
+    r"(\\u[0-9a-fA-F]{0,3}|\\u[dD][89abAB][0-9a-fA-F]{2}(\\u?[0-9a-fA-F]{0,3})?)$"
+)
+
+
+class StructuredResponseStream:
+    """Turn streamed chunks of the structured JSON answer into section events."""
+
+    def __init__(self, on_event: Optional[EventCallback] = None):
+        self.on_event = on_event
+        self._buffer = ""
+        self._decoder = json.JSONDecoder()
+        self._text_sent = {key: 0 for key in _TEXT_KEYS}
+        self._text_done: set[str] = set()
+        self._wines_pos: int | None = None
+        self._wines_done = False
+        self._wine_count = 0
+        self.emitted = False
+
+    def feed(self, chunk: str) -> list[tuple[str, dict]]:
+        """Append a chunk and return the events it completes, in section order."""
+        self._buffer += chunk
+        events = self._scan_text("intro")
+        events.extend(self._scan_wines())
+        events.extend(self._scan_text("closing"))
+        if events:
+            self.emitted = True
+        return events
+
+    async def on_delta(self, chunk: str) -> None:
+        """Delta callback for LLMService.generate_with_tools: forward events."""
+        for event, payload in self.feed(chunk):
+            if self.on_event is not None:
+                await self.on_event(event, payload)
+
+    def _scan_text(self, key: str) -> list[tuple[str, dict]]:
+        if key in self._text_done:
+            return []
+        match = _KEY_PATTERNS[key].search(self._buffer)
+        if not match or match.end() >= len(self._buffer):
+            return []
+
+        start = match.end()
+        if self._buffer[start] != '"':
+            # null or a non-string value — nothing to stream
+            self._text_done.add(key)
+            return []
+
+        end = self._find_string_end(start + 1)
+        complete = end is not None
+        raw = self._buffer[start + 1:end] if complete else self._buffer[start + 1:]
+        if not complete:
+            raw = _strip_partial_escape(raw)
+
+        try:
+            text = json.loads(f'"{raw}"')
+        except ValueError:
+            return []
+
+        if complete:
+            self._text_done.add(key)
+        delta = text[self._text_sent[key]:]
+        if not delta:
+            return []
+        self._text_sent[key] = len(text)
+        return [(key, {"delta": delta})]
+
+    def _find_string_end(self, pos: int) -> int | None:
+        """Index of the closing quote of a JSON string starting at pos, if present."""
+        buffer = self._buffer
+        while pos < len(buffer):
+            char = buffer[pos]
+            if char == "\\":
+                pos += 2
+                continue
+            if char == '"':
+                return pos
+            pos += 1
+        return None
+
+    def _scan_wines(self) -> list[tuple[str, dict]]:
+        if self._wines_done:
+            return []
+        if self._wines_pos is None:
+            match = _WINES_PATTERN.search(self._buffer)
+            if not match:
+                return []
+            self._wines_pos = match.end()
+
+        events: list[tuple[str, dict]] = []
+        buffer = self._buffer
+        pos = self._wines_pos
+        while True:
+            while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+                pos += 1
+            if pos >= len(buffer):
+                break
+            if buffer[pos] == "]":
+                self._wines_done = True
+                pos += 1
+                break
+            try:
+                wine, pos_after = self._decoder.raw_decode(buffer, pos)
+            except ValueError:
+                break  # Object not complete yet
+            pos = pos_after
+            if isinstance(wine, dict):
+                events.append(("wine", {"index": self._wine_count, **wine}))
+                self._wine_count += 1
+
+        self._wines_pos = pos
+        return events
+
+
+def _strip_partial_escape(raw: str) -> str:
+    """Drop a trailing escape sequence that the next chunk will complete."""
+    trailing_backslashes = len(raw) - len(raw.rstrip("\\"))
+    if trailing_backslashes % 2:
+        raw = raw[:-1]
+    match = _PARTIAL_ESCAPE_RE.search(raw)
+    if match and _is_escape_start(raw, match.start()):
+        return raw[:match.start()]
+    return raw
+
+
+def _is_escape_start(raw: str, index: int) -> bool:
+    """True if the backslash at index is not itself escaped."""
+    preceding = len(raw[:index]) - len(raw[:index].rstrip("\\"))
+    return preceding % 2 == 0
@@ -1,18 +1,24 @@
 """Session context service for cross-session personalization.
 
 Extracts insights from session history and builds context for AI personalization.
+Keyword insights are extracted once, as messages are written (record_messages),
+and stored per session in conversation_insights; build_cross_session_context
+only reads those rows.
 """
 import json
 import logging
+import uuid
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Optional
+from typing import Any, Iterable, Optional
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.conversation import Conversation
+from app.models.message import Message
 from app.repositories.conversation import ConversationRepository
-from app.services.llm import get_llm_service, LLMError
+from app.repositories.conversation_insights import ConversationInsightsRepository
+from app.services.llm import get_llm_service, LLMError, LLMTask
 
 logger = logging.getLogger(__name__)
 
@@ -96,12 +102,34 @@ INSIGHTS_EXTRACTION_PROMPT = """Проанализируй диалог и из
 Ответ (только JSON):"""
 
 
+# Event keywords -> display name
+EVENT_KEYWORDS = {
+    "день рождения": "день рождения",
+    "юбилей": "юбилей",
+    "свадьба": "свадьба",
+    "праздник": "праздник",
+    "новый год": "Новый год",
+    "рождество": "Рождество",
+    "8 марта": "8 марта",
+    "ужин": "ужин",
+    "вечеринка": "вечеринка",
+}
+
+# Food keywords (matched in user messages)
+FOOD_KEYWORDS = [
+    "стейк", "мясо", "рыба", "морепродукты", "сыр", "паста",
+    "пицца", "курица", "утка", "баранина", "свинина", "говядина",
+    "салат", "десерт", "шоколад", "фрукты",
+]
+
+
 class SessionContextService:
     """Service for extracting and building cross-session context."""
 
     def __init__(self, db: AsyncSession):
         self.db = db
         self.conversation_repo = ConversationRepository(db)
+        self.insights_repo = ConversationInsightsRepository(db)
         self._llm = None
 
     @property
@@ -114,6 +142,7 @@ class SessionContextService:
     async def extract_session_insights(
         self,
         conversation: Conversation,
+        raise_on_error: bool = False,
     ) -> SessionInsights:
         """
         Extract insights from a single session's messages.
@@ -123,6 +152,8 @@ class SessionContextService:
 
         Args:
             conversation: The conversation to analyze
+            raise_on_error: Re-raise LLMError instead of falling back
+                (background jobs retry the call later)
 
         Returns:
             Extracted insights
@@ -154,12 +185,14 @@ class SessionContextService:
                 system_prompt="Ты помощник для анализа диалогов о вине.",
                 user_prompt=prompt,
                 temperature=0.3,  # More deterministic
-                max_tokens=500,
+                task=LLMTask.INSIGHTS,
             )
 
             return self._parse_insights_response(response)
 
         except LLMError as e:
+            if raise_on_error:
+                raise
             logger.warning("LLM error extracting insights: %s", e)
             return SessionInsights()
         except Exception as e:
@@ -194,6 +227,50 @@ class SessionContextService:
             logger.warning("Failed to parse insights JSON: %s", e)
             return SessionInsights()
 
+    async def record_messages(
+        self,
+        conversation: Conversation,
+        messages: Iterable[Message],
+    ) -> None:
+        """
+        Fold newly written messages into the session's precomputed insights.
+
+        Only web sessions (with a user_id) feed cross-session context;
+        welcome messages are skipped.
+
+        Args:
+            conversation: The conversation the messages were written to
+            messages: The new messages
+        """
+        if conversation.user_id is None:
+            return
+
+        events: list[str] = []
+        foods: list[str] = []
+        wine_mentions: list[str] = []
+        count = 0
+        for msg in messages:
+            if msg.is_welcome:
+                continue
+            count += 1
+            msg_events, msg_foods = self._extract_message_keywords(
+                msg.role.value, msg.content,
+            )
+            events.extend(msg_events)
+            foods.extend(msg_foods)
+            if msg.role.value == "assistant":
+                wine_mentions.extend(self._extract_wine_mentions(msg.content))
+
+        if not count:
+            return
+        await self.insights_repo.add_messages(
+            conversation,
+            events=events,
+            foods=foods,
+            wine_mentions=wine_mentions,
+            message_count=count,
+        )
+
     async def build_cross_session_context(
         self,
         user_id,
@@ -203,6 +280,9 @@ class SessionContextService:
         """
         Build aggregated context from user's recent sessions.
 
+        Reads the precomputed conversation_insights rows of the latest
+        sessions (one indexed query); no messages are loaded.
+
         Args:
             user_id: User's UUID
             exclude_session_id: Session to exclude (e.g., current session)
@@ -211,46 +291,34 @@ class SessionContextService:
         Returns:
             Aggregated cross-session context
         """
-        # Get recent sessions
-        conversations, total = await self.conversation_repo.get_all_by_user_id(
-            user_id, limit=max_sessions + 1  # +1 in case we need to exclude current
+        sessions, total = await self.insights_repo.get_recent_by_user_id(
+            user_id,
+            limit=max_sessions,
+            exclude_conversation_id=exclude_session_id,
         )
 
-        # Filter out excluded session
-        if exclude_session_id:
-            conversations = [c for c in conversations if c.id != exclude_session_id]
-
-        conversations = conversations[:max_sessions]
-
-        if not conversations:
+        if not sessions:
+            # Sessions without an insights row (not backfilled) still count
+            previous = total - 1 if exclude_session_id else total
             return CrossSessionContext(
-                total_sessions=0,
+                total_sessions=total if previous > 0 else 0,
                 recent_wines=[],
                 preferences=SessionInsights(),
                 last_session_date=None,
             )
 
-        # Aggregate insights
+        # Aggregate insights (newest session first)
         all_liked = []
         all_disliked = []
         all_events = []
         all_foods = []
         recent_wines = []
-
-        for conv in conversations:
-            # Simple heuristic extraction without LLM for speed
-            insights = self._extract_simple_insights(conv)
-            all_liked.extend(insights.liked_wines)
-            all_disliked.extend(insights.disliked_wines)
-            all_events.extend(insights.events_discussed)
-            all_foods.extend(insights.foods_paired)
-
-            # Extract wine names mentioned (for avoiding repetition)
-            for msg in conv.messages:
-                if msg.role.value == "assistant" and not msg.is_welcome:
-                    # Simple extraction of potential wine names
-                    wines = self._extract_wine_mentions(msg.content)
-                    recent_wines.extend(wines)
+        for session in sessions:
+            all_liked.extend(session.liked_wines)
+            all_disliked.extend(session.disliked_wines)
+            all_events.extend(session.events)
+            all_foods.extend(session.foods)
+            recent_wines.extend(session.wine_mentions)
 
         # Deduplicate and limit
         aggregated = SessionInsights(
@@ -264,63 +332,23 @@ class SessionContextService:
             total_sessions=total,
             recent_wines=list(dict.fromkeys(recent_wines))[:10],
             preferences=aggregated,
-            last_session_date=conversations[0].updated_at if conversations else None,
+            last_session_date=sessions[0].last_activity_at,
         )
 
-    def _extract_simple_insights(self, conversation: Conversation) -> SessionInsights:
-        """
-        Extract insights using simple keyword matching (no LLM).
-
-        Faster but less accurate than LLM extraction.
-        """
-        liked = []
-        disliked = []
-        events = []
-        foods = []
-
-        # Event keywords
-        event_keywords = {
-            "день рождения": "день рождения",
-            "юбилей": "юбилей",
-            "свадьба": "свадьба",
-            "праздник": "праздник",
-            "новый год": "Новый год",
-            "рождество": "Рождество",
-            "8 марта": "8 марта",
-            "ужин": "ужин",
-            "вечеринка": "вечеринка",
-        }
-
-        # Food keywords
-        food_keywords = [
-            "стейк", "мясо", "рыба", "морепродукты", "сыр", "паста",
-            "пицца", "курица", "утка", "баранина", "свинина", "говядина",
-            "салат", "десерт", "шоколад", "фрукты",
+    @staticmethod
+    def _extract_message_keywords(role: str, content: str) -> tuple[list[str], list[str]]:
+        """Events and foods mentioned in one message (foods only for user messages)."""
+        content_lower = content.lower()
+        events = [
+            event_name
+            for keyword, event_name in EVENT_KEYWORDS.items()
+            if keyword in content_lower
         ]
-
-        for msg in conversation.messages:
-            if msg.is_welcome:
-                continue
-
-            content_lower = msg.content.lower()
-
-            # Check for events
-            for keyword, event_name in event_keywords.items():
-                if keyword in content_lower:
-                    events.append(event_name)
-
-            # Check for foods (in user messages)
-            if msg.role.value == "user":
-                for food in food_keywords:
-                    if food in content_lower:
-                        foods.append(food)
-
-        return SessionInsights(
-            liked_wines=liked,
-            disliked_wines=disliked,
-            events_discussed=list(set(events)),
-            foods_paired=list(set(foods)),
+        foods = (
+            [food for food in FOOD_KEYWORDS if food in content_lower]
+            if role == "user" else []
         )
+        return events, foods
 
     def _extract_wine_mentions(self, text: str) -> list[str]:
         """Extract potential wine names from AI response."""
@@ -350,3 +378,40 @@ class SessionContextService:
                                 wines.append(potential_name)
 
         return wines[:5]  # Limit to 5 per message
+
+
+async def run_session_insights_job(
+    db: AsyncSession, payload: dict[str, Any], last_attempt: bool = True,
+) -> None:
+    """Background job: fold LLM-extracted insights of a closed session into its row.
+
+    Complements the keyword insights written by record_messages() with what
+    only the LLM picks up (liked and disliked wines, paraphrased events and
+    dishes).
+    LLM errors fail the job so it is retried; the last attempt gives up
+    quietly. Payload: conversation_id.
+    """
+    conversation = await ConversationRepository(db).get_by_id(
+        uuid.UUID(payload["conversation_id"]),
+    )
+    if conversation is None or conversation.user_id is None:
+        return
+
+    service = SessionContextService(db)
+    # Messages are loaded: don't hold a connection during the LLM call
+    await db.commit()
+    insights = await service.extract_session_insights(
+        conversation, raise_on_error=not last_attempt,
+    )
+    if insights.is_empty():
+        return
+
+    await service.insights_repo.add_messages(
+        conversation,
+        events=insights.events_discussed,
+        foods=insights.foods_paired,
+        wine_mentions=[],
+        message_count=0,
+        liked_wines=insights.liked_wines,
+        disliked_wines=insights.disliked_wines,
+    )
@@ -4,11 +4,15 @@ Uses LLM (Claude haiku) to generate short, meaningful titles based on
 the first user message and AI response. Falls back to date format on failure.
 """
 import logging
+import uuid
 from datetime import datetime
-from typing import Optional
+from typing import Any, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import get_settings
-from app.services.llm import LLMError, get_llm_service
+from app.repositories.conversation import ConversationRepository
+from app.services.llm import LLMError, LLMTask, get_llm_service
 
 logger = logging.getLogger(__name__)
 
@@ -68,6 +72,7 @@ class SessionNamingService:
         self,
         user_message: str,
         ai_response: str,
+        raise_on_error: bool = False,
     ) -> str:
         """
         Generate a short title for the session based on first exchange.
@@ -75,6 +80,8 @@ class SessionNamingService:
         Args:
             user_message: First user message in the conversation
             ai_response: First AI response (non-welcome)
+            raise_on_error: Re-raise LLMError instead of falling back
+                (background jobs retry the call later)
 
         Returns:
             Generated title (max 30 chars) or date fallback
@@ -95,7 +102,7 @@ class SessionNamingService:
                 system_prompt="Ты помощник для генерации коротких названий.",
                 user_prompt=prompt,
                 temperature=0.7,  # Some creativity for variety
-                max_tokens=50,    # Short response expected
+                task=LLMTask.NAMING,
             )
 
             # Clean and validate title
@@ -109,6 +116,8 @@ class SessionNamingService:
             return title
 
         except LLMError as e:
+            if raise_on_error:
+                raise
             logger.warning("LLM error during title generation: %s", e)
             return self._generate_date_fallback()
         except Exception as e:
@@ -191,3 +200,34 @@ def reset_session_naming_service():
     """Reset session naming service singleton (for testing)."""
     global _naming_service
     _naming_service = None
+
+
+async def run_session_title_job(
+    db: AsyncSession, payload: dict[str, Any], last_attempt: bool = True,
+) -> None:
+    """Background job: title a session after its first exchange.
+
+    LLM errors fail the job so it is retried; only the last attempt falls
+    back to a date title. Payload: conversation_id, user_message, ai_response.
+    """
+    repo = ConversationRepository(db)
+    conversation = await repo.get_by_id(
+        uuid.UUID(payload["conversation_id"]), with_messages=False,
+    )
+    if conversation is None or conversation.title:
+        return
+
+    naming_service = get_session_naming_service()
+    if naming_service.is_llm_configured():
+        # Don't hold a connection while the title is generated
+        await db.commit()
+        title = await naming_service.generate_session_title(
+            user_message=payload["user_message"],
+            ai_response=payload["ai_response"],
+            raise_on_error=not last_attempt,
+        )
+    else:
+        title = naming_service._generate_date_fallback()
+
+    await repo.update_title(conversation, title)
+    logger.info("Set session title: %s", title)
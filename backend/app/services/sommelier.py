@@ -4,12 +4,14 @@ Combines proactive suggestions, prompts, wine catalog, LLM, and real events
 for intelligent wine recommendations.
 """
 
+import asyncio
 import json
 import logging
 import re
+from contextlib import asynccontextmanager
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Optional
+from typing import AsyncIterator, Optional
 import uuid
 
 try:
@@ -21,8 +23,9 @@ except ImportError:
         return decorator
     langfuse_context = None
 
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
+from app.core.metrics import current_spans, summarize_spans, timed
 from app.models.wine import Wine
 from app.repositories.wine import WineRepository
 from app.services.proactive_suggestions import (
@@ -37,8 +40,11 @@ from app.services.sommelier_prompts import (
     SYSTEM_PROMPT_PERSONALIZED,
 )
 from app.services.events import EventsService, get_events_service, Event
-from app.services.llm import LLMService, get_llm_service, LLMError
+from app.services.llm import LLMService, LLMTask, get_llm_service, LLMError
+from app.services.response_cache import get_response_cache, response_cache_version
+from app.services.response_stream import EventCallback, StructuredResponseStream
 from app.services.session_context import CrossSessionContext
+from app.services.wine_catalog import get_wine_catalog
 
 logger = logging.getLogger(__name__)
 
@@ -60,15 +66,39 @@ class ParseResult:
         return self.error is None and bool(self.text.strip())
 
 
+@asynccontextmanager
+async def _tool_wine_repo(service: "SommelierService") -> AsyncIterator[WineRepository]:
+    """WineRepository for one tool query.
+
+    With a session factory every tool call gets its own short-lived session,
+    so its pooled connection is returned as soon as the query is done and
+    concurrent tool calls need no lock. Without one the request session is
+    shared and the queries take turns under db_lock.
+    """
+    if service.session_factory is None:
+        async with service.db_lock:
+            yield service.wine_repo
+        return
+    async with service.session_factory() as session:
+        yield WineRepository(session)
+
+
 class SommelierService:
     """Main GetMyWine sommelier service with LLM and real events integration."""
 
-    def __init__(self, db: AsyncSession):
+    def __init__(
+        self,
+        db: AsyncSession,
+        session_factory: Optional[async_sessionmaker] = None,
+    ):
         self.db = db
+        self.session_factory = session_factory
         self.wine_repo = WineRepository(db)
         self.suggestion_engine = ProactiveSuggestionEngine()
         self.events_service = get_events_service()
         self.llm_service = get_llm_service()
+        self.wine_catalog = get_wine_catalog()
+        self._db_lock = asyncio.Lock()
 
     async def generate_welcome_with_suggestions(
         self,
@@ -436,6 +466,7 @@ class SommelierService:
         conversation_history: Optional[list[dict]] = None,
         cross_session_context: Optional[CrossSessionContext] = None,
         is_continuation: bool = False,
+        on_event: Optional[EventCallback] = None,
     ) -> tuple[str, list[str]]:
         """
         Generate AI response to user message using agentic RAG with tool use.
@@ -450,6 +481,8 @@ class SommelierService:
                 Format: [{"role": "user"|"assistant", "content": "..."}]
             cross_session_context: Context from previous sessions
             is_continuation: Whether this continues an existing conversation
+            on_event: Optional callback for streaming progress (tool calls,
+                intro/wine/closing sections), see generate_agentic_response
 
         Returns:
             Tuple of (rendered_text, wine_ids) where wine_ids is a list
@@ -460,6 +493,11 @@ class SommelierService:
         # Build events context
         day_context = self.events_service.get_day_context()
         events_context = self._format_events_for_prompt(day_context)
+        # Answers shaped by the user's profile or history must not be shared
+        personalized = bool(user_profile) or bool(
+            cross_session_context and cross_session_context.total_sessions > 0
+        )
+        shared_context = events_context
 
         # Enrich events context with cross-session data
         if cross_session_context and cross_session_context.total_sessions > 0:
@@ -475,12 +513,23 @@ class SommelierService:
 
         # Try agentic response
         if self.llm_service.is_available:
+            cached_text, cache_key = (None, None)
+            if not personalized:
+                cached_text, cache_key = await self._lookup_response_cache(
+                    system_prompt, shared_context, user_message, conversation_history,
+                )
+            if cached_text is not None:
+                if on_event is not None:
+                    await StructuredResponseStream(on_event).on_delta(cached_text)
+                return (cached_text, [])
+
             result = await self.generate_agentic_response(
                 system_prompt=system_prompt,
                 user_message=user_message,
                 conversation_history=conversation_history,
                 user_profile=user_profile,
                 events_context=events_context,
+                on_event=on_event,
             )
 
             if result is not None:
@@ -496,6 +545,7 @@ class SommelierService:
                         user_message[:50],
                         len(conversation_history) if conversation_history else 0,
                     )
+                    self._store_response_cache(cache_key, user_message, result)
                 return result
 
             logger.warning("LLM fallback also failed")
@@ -503,6 +553,74 @@ class SommelierService:
         # LLM unavailable — return empty so caller shows ERROR_LLM_UNAVAILABLE
         return ("", [])
 
+    async def _lookup_response_cache(
+        self,
+        system_prompt: str,
+        events_context: str,
+        user_message: str,
+        conversation_history: Optional[list[dict]],
+    ) -> tuple[Optional[str], Optional[tuple[list[float], str]]]:
+        """Look up a cached informational answer for this question.
+
+        Only context-free questions (no conversation history) use the cache:
+        a follow-up like "а чем он отличается?" depends on the dialogue.
+        The caller skips it for users with a profile or session history;
+        events_context (the day's events, same for everyone) is part of the
+        cache version.
+
+        Returns:
+            (cached_text or None, cache_key) where cache_key is the
+            (embedding, version) to store a fresh answer under, or None
+            when the cache does not apply.
+        """
+        cache = get_response_cache()
+        if cache is None or conversation_history:
+            return None, None
+
+        from app.config import get_settings
+        settings = get_settings()
+        try:
+            embedding = await self.llm_service.get_query_embedding(user_message)
+        except Exception as e:
+            logger.debug("Response cache skipped, embedding failed: %s", e)
+            return None, None
+        if not isinstance(embedding, list):
+            return None, None
+
+        version = response_cache_version(
+            system_prompt, events_context, settings.llm_model, settings.embedding_model,
+        )
+        entry = await cache.get(embedding, version)
+        return (entry.text if entry else None), (embedding, version)
+
+    def _store_response_cache(
+        self,
+        cache_key: Optional[tuple[list[float], str]],
+        user_message: str,
+        result: tuple[str, list[str]],
+    ) -> None:
+        """Cache an informational answer without wines and guard markers."""
+        text, wine_ids = result
+        cache = get_response_cache()
+        if cache is None or cache_key is None or wine_ids or not text:
+            return
+
+        json_str = self._extract_json_str(text)
+        try:
+            data = json.loads(json_str) if json_str else None
+        except json.JSONDecodeError:
+            return
+        if (
+            not isinstance(data, dict)
+            or data.get("response_type") != "informational"
+            or data.get("wines")
+            or data.get("guard_type")
+        ):
+            return
+
+        embedding, version = cache_key
+        cache.set(embedding, version, user_message, text)
+
     async def _find_wine_for_suggestion(
         self,
         suggestion: WineSuggestion,
@@ -620,6 +738,7 @@ class SommelierService:
                 system_prompt=system_prompt,
                 user_prompt=user_prompt,
                 history=history,
+                task=LLMTask.AGENT,
             )
             logger.info("Generated LLM fallback response (no tools)")
             return result
@@ -647,10 +766,11 @@ class SommelierService:
 
     @observe(name="execute_search_wines")
     async def execute_search_wines(self, arguments: dict) -> str:
-        """Execute search_wines tool: map arguments to WineRepository.get_list().
+        """Execute search_wines tool against the in-memory catalog snapshot.
 
         Validates enum values (invalid silently ignored), handles price logic,
-        and returns formatted JSON response.
+        and returns formatted JSON response. Falls back to
+        WineRepository.get_list() when the snapshot is disabled or unavailable.
         """
         from app.models.wine import Sweetness, WineType
 
@@ -708,9 +828,22 @@ class SommelierService:
             filters["price_min"] = price_min
             filters_applied["price_min"] = price_min
 
-        wines = await self.wine_repo.get_list(**filters, limit=10)
+        snapshot = None
+        async with _tool_wine_repo(self) as wine_repo:
+            if self.wine_catalog is not None:
+                snapshot = await self.wine_catalog.get_snapshot(wine_repo.db)
 
-        logger.info("search_wines tool: filters=%s, found=%d", filters_applied, len(wines))
+            if snapshot is not None:
+                with timed("tool.search_wines.snapshot"):
+                    wines = snapshot.search(**filters, limit=10)
+            else:
+                with timed("tool.search_wines.db"):
+                    wines = await wine_repo.get_list(**filters, limit=10)
+
+        logger.info(
+            "search_wines tool: filters=%s, found=%d, source=%s",
+            filters_applied, len(wines), "snapshot" if snapshot is not None else "db",
+        )
 
         return format_tool_response(wines, filters_applied)
 
@@ -728,7 +861,8 @@ class SommelierService:
         filters_applied = {"query": query}
 
         # Generate embedding for user's query
-        embedding = await self.llm_service.get_query_embedding(query)
+        with timed("tool.semantic_search.embedding"):
+            embedding = await self.llm_service.get_query_embedding(query)
 
         # Build optional filters
         search_kwargs: dict = {}
@@ -746,12 +880,72 @@ class SommelierService:
             search_kwargs["price_max"] = price_max
             filters_applied["price_max"] = price_max
 
-        results = await self.wine_repo.semantic_search(embedding, **search_kwargs)
+        async with _tool_wine_repo(self) as wine_repo:
+            with timed("tool.semantic_search.db"):
+                results = await wine_repo.semantic_search(embedding, **search_kwargs)
 
         logger.info("semantic_search tool: query=%r, found=%d", query[:50], len(results))
 
         return format_semantic_response(results, filters_applied)
 
+    async def _execute_tool_call(self, tool_call) -> str:
+        """Dispatch a single LLM tool call to its executor and return the result JSON."""
+        name = tool_call.function.name
+        arguments = json.loads(tool_call.function.arguments)
+
+        if name == "search_wines":
+            with timed("tool.search_wines"):
+                return await self.execute_search_wines(arguments)
+        if name == "semantic_search":
+            with timed("tool.semantic_search"):
+                return await self.execute_semantic_search(arguments)
+        return json.dumps({"error": f"Unknown tool: {name}"})
+
+    @property
+    def db_lock(self) -> asyncio.Lock:
+        """Lock serializing tool queries on the shared AsyncSession.
+
+        Tool calls of one iteration run concurrently so their network I/O
+        (embedding requests) overlaps, but AsyncSession does not allow
+        concurrent operations, so without a session_factory the DB queries
+        themselves take turns.
+        """
+        return self._db_lock
+
+    async def _execute_tool_call_with_events(
+        self, tool_call, on_event: Optional[EventCallback],
+    ) -> str:
+        """Execute a tool call, reporting start/finish to the streaming callback."""
+        if on_event is None:
+            return await self._execute_tool_call(tool_call)
+
+        await on_event("tool_call", {
+            "id": tool_call.id,
+            "name": tool_call.function.name,
+            "arguments": tool_call.function.arguments,
+        })
+        result = await self._execute_tool_call(tool_call)
+        await on_event("tool_result", {
+            "id": tool_call.id,
+            "name": tool_call.function.name,
+        })
+        return result
+
+    @staticmethod
+    def _stream_kwargs(
+        on_event: Optional[EventCallback],
+        section_stream: Optional[StructuredResponseStream] = None,
+    ) -> dict:
+        """Extra generate_with_tools kwargs that stream sections to on_event.
+
+        Empty when not streaming, so non-streaming calls are unchanged.
+        """
+        if on_event is None:
+            return {}
+        if section_stream is None:
+            section_stream = StructuredResponseStream(on_event)
+        return {"on_delta": section_stream.on_delta}
+
     async def _attempt_parse_with_retry(
         self,
         content: str,
@@ -760,6 +954,7 @@ class SommelierService:
         response_format: dict,
         system_prompt: str,
         user_prompt: str,
+        on_event: Optional[EventCallback] = None,
     ) -> tuple[tuple[str, list[str]], int, list[str]]:
         """Parse LLM response with retry on validation failure.
 
@@ -774,13 +969,16 @@ class SommelierService:
             response_format: JSON schema for structured output
             system_prompt: System prompt for retry calls
             user_prompt: User prompt for retry calls
+            on_event: Streaming callback; gets a "reset" event before each
+                retry, and the retry itself is streamed
 
         Returns:
             Tuple of ((text, wine_ids), retry_count, retry_errors)
         """
         retry_errors: list[str] = []
 
-        parse_result = self._parse_final_response(content)
+        with timed("parse"):
+            parse_result = self._parse_final_response(content)
         if parse_result.ok:
             return (parse_result.text, parse_result.wine_ids), 0, retry_errors
 
@@ -808,16 +1006,22 @@ class SommelierService:
                 ),
             })
 
+            if on_event is not None:
+                await on_event("reset", {"reason": error_desc})
+
             # Re-call LLM with error feedback in context
-            response = await self.llm_service.generate_with_tools(
-                system_prompt=system_prompt,
-                user_prompt=user_prompt,
-                tools=None,
-                messages=messages,
-                response_format=response_format,
-            )
-            current_content = response.content or ""
-            parse_result = self._parse_final_response(current_content)
+            with timed("parse_retry"):
+                response = await self.llm_service.generate_with_tools(
+                    system_prompt=system_prompt,
+                    user_prompt=user_prompt,
+                    tools=None,
+                    messages=messages,
+                    response_format=response_format,
+                    task=LLMTask.REPAIR,
+                    **self._stream_kwargs(on_event),
+                )
+                current_content = response.content or ""
+                parse_result = self._parse_final_response(current_content)
 
             if parse_result.ok:
                 logger.info("Structured output retry %d/%d succeeded", attempt, max_retries)
@@ -838,9 +1042,16 @@ class SommelierService:
         conversation_history: Optional[list[dict]] = None,
         user_profile: Optional[dict] = None,
         events_context: Optional[str] = None,
+        on_event: Optional[EventCallback] = None,
     ) -> Optional[tuple[str, list[str]]]:
         """Agent loop: LLM -> tool_calls -> execute -> repeat (max iterations).
 
+        With on_event the LLM calls are streamed and progress is reported as
+        it happens: "tool_call"/"tool_result" around each tool execution,
+        "intro"/"wine"/"closing" while the final JSON is generated, and
+        "reset" when already streamed sections must be discarded (tool-call
+        turn or structured output retry).
+
         Returns tuple of (rendered_text, wine_ids) or None on error.
         """
         from app.config import get_settings
@@ -873,11 +1084,16 @@ class SommelierService:
         try:
             iteration = 0
             while iteration < max_iterations:
+                section_stream = (
+                    StructuredResponseStream(on_event) if on_event is not None else None
+                )
                 response = await self.llm_service.generate_with_tools(
                     system_prompt=system_prompt,
                     user_prompt=user_prompt,
                     tools=WINE_TOOLS,
                     messages=messages,
+                    task=LLMTask.AGENT,
+                    **self._stream_kwargs(on_event, section_stream),
                 )
 
                 # Handle refusal — do NOT retry (FR-004)
@@ -899,6 +1115,7 @@ class SommelierService:
                         response_format=get_response_schema(),
                         system_prompt=system_prompt,
                         user_prompt=user_prompt,
+                        on_event=on_event,
                     )
                     response_type = self._extract_response_type(content) if text else None
                     self._update_langfuse_metadata(
@@ -924,6 +1141,7 @@ class SommelierService:
                         response_format=get_response_schema(),
                         system_prompt=system_prompt,
                         user_prompt=user_prompt,
+                        on_event=on_event,
                     )
                     response_type = self._extract_response_type(content) if text else None
                     self._update_langfuse_metadata(
@@ -952,19 +1170,20 @@ class SommelierService:
                 ]
                 messages.append(assistant_msg)
 
-                # Execute each tool call and append results
-                for tool_call in response.tool_calls:
-                    name = tool_call.function.name
-                    arguments = json.loads(tool_call.function.arguments)
-                    tools_used.append(name)
+                if section_stream is not None and section_stream.emitted:
+                    await on_event("reset", {"reason": "tool_calls"})
 
-                    if name == "search_wines":
-                        tool_result = await self.execute_search_wines(arguments)
-                    elif name == "semantic_search":
-                        tool_result = await self.execute_semantic_search(arguments)
-                    else:
-                        tool_result = json.dumps({"error": f"Unknown tool: {name}"})
+                # Execute all tool calls concurrently, append results in the
+                # original order so each tool_call_id pairs with its result
+                tools_used.extend(tc.function.name for tc in response.tool_calls)
+                tool_results = await asyncio.gather(
+                    *(
+                        self._execute_tool_call_with_events(tc, on_event)
+                        for tc in response.tool_calls
+                    )
+                )
 
+                for tool_call, tool_result in zip(response.tool_calls, tool_results):
                     messages.append({
                         "role": "tool",
                         "tool_call_id": tool_call.id,
@@ -980,6 +1199,8 @@ class SommelierService:
                 tools=None,
                 messages=messages,
                 response_format=get_response_schema(),
+                task=LLMTask.AGENT,
+                **self._stream_kwargs(on_event),
             )
             content = response.content or ""
             (text, wine_ids), retries, errors = await self._attempt_parse_with_retry(
@@ -989,6 +1210,7 @@ class SommelierService:
                 response_format=get_response_schema(),
                 system_prompt=system_prompt,
                 user_prompt=user_prompt,
+                on_event=on_event,
             )
             response_type = self._extract_response_type(content) if text else None
             self._update_langfuse_metadata(
@@ -1183,15 +1405,22 @@ class SommelierService:
         structured_output_retries: int = 0,
         structured_output_errors: list[str] | None = None,
     ) -> None:
-        """Update current Langfuse observation with agent loop metadata."""
+        """Update current Langfuse observation with agent loop metadata.
+
+        Includes the timing spans recorded so far in this request (see
+        app.core.metrics), i.e. everything up to the final parse.
+        """
         if langfuse_context is None:
             return
         try:
+            spans = current_spans()
             metadata: dict = {
                 "tools_used": tools_used,
                 "iterations": iterations,
                 "structured_output_retries": structured_output_retries,
                 "structured_output_errors": structured_output_errors or [],
+                "timings": spans,
+                "timings_ms": summarize_spans(spans),
             }
             if response_type:
                 metadata["response_type"] = response_type
@@ -2,10 +2,13 @@
 
 import logging
 import uuid
+from dataclasses import dataclass
+from datetime import datetime, timezone
 from typing import Optional
 
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
+from app.bot.history_writer import HistoryWriter
 from app.bot.messages import (
     ERROR_DATABASE,
     ERROR_LLM_UNAVAILABLE,
@@ -14,6 +17,7 @@ from app.bot.messages import (
 )
 from app.bot.utils import detect_language, get_language_instruction
 from app.config import get_settings
+from app.core.metrics import collect_spans, summarize_spans, timed
 from app.models.conversation import Conversation
 from app.models.message import MessageRole
 from app.models.telegram_user import TelegramUser
@@ -28,16 +32,42 @@ logger = logging.getLogger(__name__)
 settings = get_settings()
 
 
+@dataclass(frozen=True)
+class Exchange:
+    """A successful user message and its reply, ready to be saved."""
+
+    conversation_id: uuid.UUID
+    user_content: str
+    assistant_content: str
+    user_sent_at: datetime
+
+
 class TelegramBotService:
     """Service for Telegram bot operations."""
 
-    def __init__(self, db: AsyncSession):
+    def __init__(
+        self,
+        db: AsyncSession,
+        session_factory: Optional[async_sessionmaker] = None,
+        history_writer: Optional[HistoryWriter] = None,
+    ):
+        """
+        Args:
+            db: Session for this update
+            session_factory: If set, process_message() commits the loaded
+                context before the LLM call (returning the pooled connection)
+                and agent tools use short-lived sessions from this factory
+            history_writer: If set, save_exchange() queues the turn here
+                (write-behind) instead of saving it before returning
+        """
         self.db = db
+        self.session_factory = session_factory
+        self.history_writer = history_writer
         self.telegram_user_repo = TelegramUserRepository(db)
         self.conversation_repo = ConversationRepository(db)
         self.message_repo = MessageRepository(db)
         self.wine_repo = WineRepository(db)
-        self.sommelier = SommelierService(db)
+        self.sommelier = SommelierService(db, session_factory=session_factory)
 
     async def get_or_create_telegram_user(
         self,
@@ -197,11 +227,23 @@ class TelegramBotService:
             List of message dicts with role and content
         """
         messages = await self.message_repo.get_history(conversation_id, limit=limit)
-        return [
+        history = [
             {"role": msg.role.value, "content": msg.content}
             for msg in messages
         ]
 
+        # Turns already answered but not saved yet (write-behind)
+        if self.history_writer is not None:
+            saved_ids = {msg.id for msg in messages}
+            for turn in self.history_writer.pending_for(conversation_id):
+                if turn.user_message_id in saved_ids:
+                    continue
+                history.append({"role": "user", "content": turn.user_content})
+                history.append({"role": "assistant", "content": turn.assistant_content})
+            history = history[-limit:]
+
+        return history
+
     async def process_message(
         self,
         telegram_id: int,
@@ -227,6 +269,77 @@ class TelegramBotService:
         Returns:
             Tuple of (response_text, recommended_wines)
         """
+        response_text, wines, exchange = await self.prepare_reply(
+            telegram_id, message_text, telegram_locale, username, first_name,
+        )
+        if exchange is not None:
+            await self.save_exchange(exchange)
+        elif self.session_factory is None:
+            await self.db.commit()
+        return response_text, wines
+
+    async def prepare_reply(
+        self,
+        telegram_id: int,
+        message_text: str,
+        telegram_locale: Optional[str] = None,
+        username: Optional[str] = None,
+        first_name: Optional[str] = None,
+    ) -> tuple[str, list[Wine], Optional[Exchange]]:
+        """Generate the reply to a message without saving the exchange.
+
+        Callers that may abandon the reply (e.g. when newer messages
+        supersede it) save the returned Exchange with save_exchange() once
+        it has been delivered, so history never holds an unsent answer.
+
+        Returns:
+            Tuple of (response_text, recommended_wines, exchange); exchange
+            is None for failed responses, which must not be saved
+        """
+        with collect_spans() as spans:
+            with timed("request"):
+                result = await self._prepare_reply(
+                    telegram_id, message_text, telegram_locale, username, first_name,
+                )
+        logger.info("Request timings (ms): %s", summarize_spans(spans))
+        return result
+
+    async def save_exchange(self, exchange: Exchange) -> None:
+        """Save a delivered exchange (queued when write-behind is on)."""
+        if self.history_writer is not None:
+            # Saved in the background by the history writer
+            self.history_writer.enqueue(
+                conversation_id=exchange.conversation_id,
+                user_content=exchange.user_content,
+                assistant_content=exchange.assistant_content,
+                user_sent_at=exchange.user_sent_at,
+            )
+            # Context rows are still uncommitted without short units of work
+            if self.session_factory is None:
+                await self.db.commit()
+            return
+
+        # Save both messages and bump the conversation timestamp together
+        with timed("persist"):
+            await self.message_repo.append_turn(
+                conversation_id=exchange.conversation_id,
+                user_content=exchange.user_content,
+                assistant_content=exchange.assistant_content,
+                user_sent_at=exchange.user_sent_at,
+            )
+            await self.db.commit()
+
+    async def _prepare_reply(
+        self,
+        telegram_id: int,
+        message_text: str,
+        telegram_locale: Optional[str],
+        username: Optional[str],
+        first_name: Optional[str],
+    ) -> tuple[str, list[Wine], Optional[Exchange]]:
+        """prepare_reply() body, run inside the request's timing spans."""
+        received_at = datetime.now(timezone.utc)
+
         # Get or create user
         telegram_user, _ = await self.telegram_user_repo.get_or_create(
             telegram_id=telegram_id,
@@ -246,10 +359,17 @@ class TelegramBotService:
         language_instruction = get_language_instruction(language)
 
         # Get conversation history for context (BEFORE saving new message)
-        history = await self.get_conversation_history(
-            conversation.id,
-            limit=settings.llm_max_history_messages,
-        )
+        with timed("history_load"):
+            history = await self.get_conversation_history(
+                conversation.id,
+                limit=settings.llm_max_history_messages,
+            )
+
+        # Context is loaded: release the connection while the LLM works.
+        # Only user/conversation rows are committed here; the exchange itself
+        # is saved only on success, by save_exchange().
+        if self.session_factory is not None:
+            await self.db.commit()
 
         try:
             # Get recommendation from SommelierService
@@ -257,12 +377,13 @@ class TelegramBotService:
             enhanced_message = f"{language_instruction}\n\n{message_text}"
             # >0 means there were prior exchanges in this session
             is_continuation = len(history) > 0
-            response_text, wine_ids = await self.sommelier.generate_response(
-                user_message=enhanced_message,
-                user_profile=None,  # TODO: Add user profile support
-                conversation_history=history,
-                is_continuation=is_continuation,
-            )
+            with timed("generate_response"):
+                response_text, wine_ids = await self.sommelier.generate_response(
+                    user_message=enhanced_message,
+                    user_profile=None,  # TODO: Add user profile support
+                    conversation_history=history,
+                    is_continuation=is_continuation,
+                )
 
             # Extract recommended wines by ID from structured output
             wines = await self._extract_wines_from_response(
@@ -291,29 +412,20 @@ class TelegramBotService:
             )
             if is_empty:
                 response_text = ERROR_LLM_UNAVAILABLE
-        else:
-            # Render JSON to plain text for history — LLM context should see
-            # readable text, not raw JSON. response_text may be JSON (structured
-            # output) or already plain text (fallback paths).
-            content_for_db = self._render_for_history(response_text)
-            content_for_db = self._truncate_for_storage(content_for_db)
-            # Save both user message and assistant response together
-            await self.message_repo.create(
-                conversation_id=conversation.id,
-                role=MessageRole.USER,
-                content=message_text,
-            )
-            await self.message_repo.create(
-                conversation_id=conversation.id,
-                role=MessageRole.ASSISTANT,
-                content=content_for_db,
-            )
+            return response_text, wines, None
 
-        # Update conversation timestamp
-        await self.conversation_repo.update_timestamp(conversation)
-        await self.db.commit()
-
-        return response_text, wines
+        # Render JSON to plain text for history — LLM context should see
+        # readable text, not raw JSON. response_text may be JSON (structured
+        # output) or already plain text (fallback paths).
+        content_for_db = self._render_for_history(response_text)
+        content_for_db = self._truncate_for_storage(content_for_db)
+        exchange = Exchange(
+            conversation_id=conversation.id,
+            user_content=message_text,
+            assistant_content=content_for_db,
+            user_sent_at=received_at,
+        )
+        return response_text, wines, exchange
 
     async def save_welcome_to_history(
         self,
@@ -0,0 +1,311 @@
+"""In-process wine catalog snapshot for agent tool execution.
+
+The catalog is small and changes rarely, so search_wines tool calls are served
+from an immutable in-memory snapshot instead of a Postgres round-trip per call.
+
+The snapshot is versioned by (max(updated_at), count(*)) of the wines table.
+The version is re-checked at most once per `wine_catalog_refresh_seconds`,
+and the snapshot is reloaded only when the version changes.
+"""
+
+import asyncio
+import logging
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal
+from typing import Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+from app.models.wine import Sweetness, Wine, WineType
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class CatalogWine:
+    """Read-only wine row held in the snapshot.
+
+    Exposes the same attribute names as the Wine model for every field
+    used by tool response formatting, so it can be passed anywhere a
+    Wine is only read.
+    """
+
+    id: uuid.UUID
+    name: str
+    producer: str
+    vintage_year: Optional[int]
+    country: str
+    region: str
+    grape_varieties: list[str]
+    wine_type: WineType
+    sweetness: Sweetness
+    acidity: int
+    tannins: int
+    body: int
+    description: str
+    tasting_notes: Optional[str]
+    food_pairings: Optional[list[str]]
+    price_rub: Decimal
+    image_url: Optional[str]
+    created_at: datetime
+
+
+# Columns loaded into the snapshot (the embedding vector is never needed here)
+_SNAPSHOT_COLUMNS = (
+    Wine.id,
+    Wine.name,
+    Wine.producer,
+    Wine.vintage_year,
+    Wine.country,
+    Wine.region,
+    Wine.grape_varieties,
+    Wine.wine_type,
+    Wine.sweetness,
+    Wine.acidity,
+    Wine.tannins,
+    Wine.body,
+    Wine.description,
+    Wine.tasting_notes,
+    Wine.food_pairings,
+    Wine.price_rub,
+    Wine.image_url,
+    Wine.created_at,
+)
+
+CatalogVersion = tuple[Optional[datetime], int]
+
+
+def _build_token_index(values: list[list[str]]) -> dict[str, frozenset[int]]:
+    """Map each lowercase token (grape, dish, region) to the rows containing it."""
+    index: dict[str, set[int]] = {}
+    for row, tokens in enumerate(values):
+        for token in tokens:
+            index.setdefault(token.lower(), set()).add(row)
+    return {token: frozenset(rows) for token, rows in index.items()}
+
+
+class WineCatalogSnapshot:
+    """Immutable, columnar view of the wine catalog.
+
+    Rows are ordered by created_at DESC to match WineRepository.get_list().
+    Text filters use precomputed lowercase token indexes and keep the
+    partial, case-insensitive semantics of the ILIKE filters in the repository.
+    """
+
+    def __init__(self, wines: list[CatalogWine], version: CatalogVersion):
+        self.version = version
+        self.loaded_at = time.monotonic()
+        self.wines: tuple[CatalogWine, ...] = tuple(
+            sorted(wines, key=lambda w: w.created_at, reverse=True)
+        )
+
+        # Columns for scalar filters
+        self._ids = [w.id for w in self.wines]
+        self._wine_type = [w.wine_type for w in self.wines]
+        self._sweetness = [w.sweetness for w in self.wines]
+        self._price = [w.price_rub for w in self.wines]
+        self._country = [w.country for w in self.wines]
+        self._body = [w.body for w in self.wines]
+        self._has_image = [w.image_url is not None for w in self.wines]
+
+        # Lowercase token indexes for ILIKE-style filters
+        self._grape_index = _build_token_index(
+            [w.grape_varieties or [] for w in self.wines]
+        )
+        self._food_index = _build_token_index(
+            [w.food_pairings or [] for w in self.wines]
+        )
+        self._region_index = _build_token_index([[w.region] for w in self.wines])
+
+        # Joined haystacks, same as array_to_string(..., ','), for needles
+        # that span several array elements
+        self._grapes_joined = [
+            ",".join(w.grape_varieties or []).lower() for w in self.wines
+        ]
+        self._foods_joined = [
+            ",".join(w.food_pairings or []).lower() for w in self.wines
+        ]
+
+    def __len__(self) -> int:
+        return len(self.wines)
+
+    @staticmethod
+    def _match_token(
+        index: dict[str, frozenset[int]],
+        needle: str,
+        joined: Optional[list[str]] = None,
+    ) -> set[int]:
+        """Rows where any indexed token contains *needle* (case-insensitive)."""
+        needle = needle.lower()
+        if joined is not None and "," in needle:
+            return {row for row, text in enumerate(joined) if needle in text}
+        rows: set[int] = set()
+        for token, token_rows in index.items():
+            if needle in token:
+                rows |= token_rows
+        return rows
+
+    def search(
+        self,
+        limit: int = 20,
+        offset: int = 0,
+        wine_type: Optional[WineType] = None,
+        sweetness: Optional[Sweetness] = None,
+        price_min: Optional[Decimal] = None,
+        price_max: Optional[Decimal] = None,
+        country: Optional[str] = None,
+        body_min: Optional[int] = None,
+        body_max: Optional[int] = None,
+        with_image: Optional[bool] = None,
+        grape_variety: Optional[str] = None,
+        food_pairing: Optional[str] = None,
+        region: Optional[str] = None,
+        exclude_ids: Optional[list] = None,
+    ) -> list[CatalogWine]:
+        """Filter the snapshot. Mirrors WineRepository.get_list() semantics."""
+        candidates: Optional[set[int]] = None
+
+        # Indexed text filters narrow the candidate set first
+        if grape_variety is not None:
+            candidates = self._match_token(
+                self._grape_index, grape_variety, self._grapes_joined,
+            )
+        if food_pairing is not None:
+            rows = self._match_token(
+                self._food_index, food_pairing, self._foods_joined,
+            )
+            candidates = rows if candidates is None else candidates & rows
+        if region is not None:
+            rows = self._match_token(self._region_index, region)
+            candidates = rows if candidates is None else candidates & rows
+
+        excluded = set(exclude_ids) if exclude_ids else None
+        row_iter = range(len(self.wines)) if candidates is None else sorted(candidates)
+
+        matched: list[CatalogWine] = []
+        skipped = 0
+        for row in row_iter:
+            if excluded and self._ids[row] in excluded:
+                continue
+            if wine_type is not None and self._wine_type[row] != wine_type:
+                continue
+            if sweetness is not None and self._sweetness[row] != sweetness:
+                continue
+            if price_min is not None and self._price[row] < price_min:
+                continue
+            if price_max is not None and self._price[row] > price_max:
+                continue
+            if country is not None and self._country[row] != country:
+                continue
+            if body_min is not None and self._body[row] < body_min:
+                continue
+            if body_max is not None and self._body[row] > body_max:
+                continue
+            if with_image is True and not self._has_image[row]:
+                continue
+
+            if skipped < offset:
+                skipped += 1
+                continue
+            matched.append(self.wines[row])
+            if len(matched) >= limit:
+                break
+
+        return matched
+
+
+class WineCatalog:
+    """Holder of the current catalog snapshot with version-based refresh."""
+
+    def __init__(self, refresh_seconds: Optional[float] = None):
+        if refresh_seconds is None:
+            refresh_seconds = get_settings().wine_catalog_refresh_seconds
+        self.refresh_seconds = refresh_seconds
+        self._snapshot: Optional[WineCatalogSnapshot] = None
+        self._checked_at: float = 0.0
+        self._lock = asyncio.Lock()
+
+    @property
+    def snapshot(self) -> Optional[WineCatalogSnapshot]:
+        """Current snapshot without any freshness check."""
+        return self._snapshot
+
+    def invalidate(self) -> None:
+        """Force a version check on the next get_snapshot() call."""
+        self._checked_at = 0.0
+
+    def _is_fresh(self) -> bool:
+        return (
+            self._snapshot is not None
+            and time.monotonic() - self._checked_at < self.refresh_seconds
+        )
+
+    async def get_snapshot(self, db: AsyncSession) -> Optional[WineCatalogSnapshot]:
+        """Return the current snapshot, reloading it if the catalog changed.
+
+        Returns None if the catalog cannot be loaded (e.g. no wines table in
+        the SQLite test environment); callers fall back to the repository.
+        """
+        if self._is_fresh():
+            return self._snapshot
+
+        async with self._lock:
+            # Another task may have refreshed while we waited for the lock
+            if self._is_fresh():
+                return self._snapshot
+
+            try:
+                # Savepoint protects the caller's transaction if the query fails
+                async with db.begin_nested():
+                    version = await self._fetch_version(db)
+                    if self._snapshot is None or self._snapshot.version != version:
+                        self._snapshot = await self._load(db, version)
+                        logger.info(
+                            "Loaded wine catalog snapshot: %d wines, version=%s",
+                            len(self._snapshot), version,
+                        )
+                self._checked_at = time.monotonic()
+            except Exception as e:
+                logger.warning("Wine catalog snapshot refresh failed: %s", e)
+                # Serve the stale snapshot (if any) rather than failing the tool
+
+        return self._snapshot
+
+    @staticmethod
+    async def _fetch_version(db: AsyncSession) -> CatalogVersion:
+        result = await db.execute(
+            select(func.max(Wine.updated_at), func.count(Wine.id))
+        )
+        max_updated_at, count = result.one()
+        return (max_updated_at, count or 0)
+
+    @staticmethod
+    async def _load(db: AsyncSession, version: CatalogVersion) -> WineCatalogSnapshot:
+        result = await db.execute(select(*_SNAPSHOT_COLUMNS))
+        wines = [CatalogWine(*row) for row in result.all()]
+        return WineCatalogSnapshot(wines, version)
+
+
+# Singleton instance
+_wine_catalog: Optional[WineCatalog] = None
+
+
+def get_wine_catalog() -> Optional[WineCatalog]:
+    """Get or create the wine catalog singleton (None if disabled in config)."""
+    global _wine_catalog
+    if not get_settings().wine_catalog_snapshot_enabled:
+        return None
+    if _wine_catalog is None:
+        _wine_catalog = WineCatalog()
+    return _wine_catalog
+
+
+def reset_wine_catalog():
+    """Reset wine catalog singleton (useful for testing)."""
+    global _wine_catalog
+    _wine_catalog = None
@@ -0,0 +1,39 @@
+"""Add wines.embedding_content_hash and wines.embedding_model
+
+Revision ID: 016
+Revises: 015
+Create Date: 2026-02-20
+
+Records what each embedding was computed from: the SHA-256 of the text
+produced by create_embedding_text and the embedding model name. The
+incremental re-embed job (generate_embeddings --db --incremental) then only
+re-embeds rows whose text or model changed. Existing rows start with NULL,
+i.e. unknown; run with --adopt-existing once to stamp them without
+re-embedding.
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "016"
+down_revision: Union[str, None] = "015"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "wines",
+        sa.Column("embedding_content_hash", sa.String(64), nullable=True),
+    )
+    op.add_column(
+        "wines",
+        sa.Column("embedding_model", sa.String(100), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("wines", "embedding_model")
+    op.drop_column("wines", "embedding_content_hash")
@@ -0,0 +1,68 @@
+"""Create conversation_insights table
+
+Revision ID: 017
+Revises: 016
+Create Date: 2026-02-21
+
+Per-session keyword insights (events, foods, wine mentions) maintained
+incrementally as chat messages are written. Cross-session context reads the
+user's latest rows through ix_conversation_insights_user_started instead of
+loading and scanning all messages of recent sessions. Existing sessions are
+filled by app.scripts.backfill_session_insights.
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+revision: str = "017"
+down_revision: Union[str, None] = "016"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "conversation_insights",
+        sa.Column("conversation_id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column(
+            "events", sa.JSON(),
+            nullable=False, server_default="[]",
+        ),
+        sa.Column(
+            "foods", sa.JSON(),
+            nullable=False, server_default="[]",
+        ),
+        sa.Column(
+            "wine_mentions", sa.JSON(),
+            nullable=False, server_default="[]",
+        ),
+        sa.Column("messages_processed", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("session_started_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column(
+            "last_activity_at",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.func.now(),
+        ),
+        sa.ForeignKeyConstraint(
+            ["conversation_id"], ["conversations.id"], ondelete="CASCADE",
+        ),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+    )
+    op.create_index(
+        "ix_conversation_insights_user_started",
+        "conversation_insights",
+        ["user_id", "session_started_at"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "ix_conversation_insights_user_started",
+        table_name="conversation_insights",
+    )
+    op.drop_table("conversation_insights")
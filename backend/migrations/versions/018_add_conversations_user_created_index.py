@@ -0,0 +1,31 @@
+"""Add composite index for the session list
+
+Revision ID: 018
+Revises: 017
+Create Date: 2026-10-16
+
+GET /chat/sessions reads a user's conversations newest first and pages by
+the (created_at, id) key of the previous page. ix_conversations_user_created
+serves both the filter and the order, so each page is an index range scan.
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "018"
+down_revision: Union[str, None] = "017"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_conversations_user_created",
+        "conversations",
+        ["user_id", "created_at", "id"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_conversations_user_created", table_name="conversations")
@@ -0,0 +1,51 @@
+"""Add composite index for keyset-paginated message history
+
+Revision ID: 019
+Revises: 018
+Create Date: 2026-10-16
+
+Message history is read newest first per conversation and paged by the
+(created_at, id) key of the previous page. ix_messages_conversation_created
+serves the filter, the order and the keyset condition in one range scan; it
+replaces ix_messages_conversation_id, which is its prefix.
+
+created_at used to come from now(), which is fixed for a transaction, so a
+user message and the reply saved with it could share a timestamp. Such
+replies are moved one microsecond later to keep their order under
+(created_at, id); new rows get per-row timestamps from the application.
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "019"
+down_revision: Union[str, None] = "018"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+        UPDATE messages AS reply
+        SET created_at = reply.created_at + interval '1 microsecond'
+        WHERE reply.role = 'assistant'
+          AND EXISTS (
+            SELECT 1 FROM messages AS question
+            WHERE question.conversation_id = reply.conversation_id
+              AND question.created_at = reply.created_at
+              AND question.role = 'user'
+          )
+        """
+    )
+    op.execute(
+        "CREATE INDEX ix_messages_conversation_created "
+        "ON messages (conversation_id, created_at DESC, id DESC)"
+    )
+    op.drop_index("ix_messages_conversation_id", table_name="messages")
+
+
+def downgrade() -> None:
+    op.create_index("ix_messages_conversation_id", "messages", ["conversation_id"])
+    op.drop_index("ix_messages_conversation_created", table_name="messages")
@@ -0,0 +1,67 @@
+"""Create background_jobs table
+
+Revision ID: 020
+Revises: 019
+Create Date: 2026-10-16
+
+Durable queue for work moved off the request path (session titles, LLM
+session insights). Rows are inserted in the request's transaction and
+claimed by the in-process JobRunner through
+ix_background_jobs_status_run_after.
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+revision: str = "020"
+down_revision: Union[str, None] = "019"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "background_jobs",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("kind", sa.String(50), nullable=False),
+        sa.Column("payload", sa.JSON(), nullable=False, server_default="{}"),
+        sa.Column(
+            "status", sa.String(20),
+            nullable=False, server_default="pending",
+            comment="pending, running, done or failed",
+        ),
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("max_attempts", sa.Integer(), nullable=False, server_default="5"),
+        sa.Column(
+            "run_after",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.func.now(),
+        ),
+        sa.Column("last_error", sa.Text(), nullable=True),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.func.now(),
+        ),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.func.now(),
+        ),
+    )
+    op.create_index(
+        "ix_background_jobs_status_run_after",
+        "background_jobs",
+        ["status", "run_after"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_background_jobs_status_run_after", table_name="background_jobs")
+    op.drop_table("background_jobs")
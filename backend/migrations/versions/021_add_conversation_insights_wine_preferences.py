@@ -0,0 +1,36 @@
+"""Add liked/disliked wines to conversation_insights
+
+Revision ID: 021
+Revises: 020
+Create Date: 2026-10-17
+
+Wines the user liked or rejected in a session, as extracted by the LLM
+session insights job. They were previously folded into wine_mentions (liked)
+or dropped (disliked); cross-session context now reads them from here.
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "021"
+down_revision: Union[str, None] = "020"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "conversation_insights",
+        sa.Column("liked_wines", sa.JSON(), nullable=False, server_default="[]"),
+    )
+    op.add_column(
+        "conversation_insights",
+        sa.Column("disliked_wines", sa.JSON(), nullable=False, server_default="[]"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("conversation_insights", "disliked_wines")
+    op.drop_column("conversation_insights", "liked_wines")
@@ -6,6 +6,8 @@ Tests:
 - T018: POST /chat/sessions - create new session
 - T019: GET /chat/sessions/current - get current session
 """
+import uuid
+
 import pytest
 from httpx import AsyncClient
 
@@ -95,6 +97,33 @@ class TestListSessions:
         assert len(data["sessions"]) == 1
         assert data["has_more"] is False
 
+    async def test_list_sessions_cursor_pagination(self, client: AsyncClient):
+        """Should page with next_cursor and reject malformed cursors."""
+        await client.post(
+            "/api/v1/auth/register",
+            json={
+                "email": "sessions_cursor@example.com",
+                "password": "testpassword123",
+                "is_age_verified": True,
+            },
+        )
+        for _ in range(3):
+            await client.post("/api/v1/chat/sessions")
+
+        response = await client.get("/api/v1/chat/sessions?limit=2")
+        first = response.json()
+        assert first["has_more"] is True
+        assert first["next_cursor"]
+
+        response = await client.get(
+            f"/api/v1/chat/sessions?limit=2&cursor={first['next_cursor']}"
+        )
+        assert response.status_code == 200
+        assert response.json()["total"] == 3
+
+        response = await client.get("/api/v1/chat/sessions?cursor=not-a-cursor")
+        assert response.status_code == 400
+
     async def test_list_sessions_requires_auth(self, client: AsyncClient):
         """Should require authentication."""
         response = await client.get("/api/v1/chat/sessions")
@@ -185,6 +214,48 @@ class TestGetSession:
         assert response.status_code == 404  # Should appear as not found
 
 
+@pytest.mark.asyncio
+class TestListSessionMessages:
+    """Integration tests for GET /chat/sessions/{id}/messages."""
+
+    async def test_returns_history_page(self, client: AsyncClient):
+        """Should return the newest messages with paging info."""
+        await client.post(
+            "/api/v1/auth/register",
+            json={
+                "email": "session_messages@example.com",
+                "password": "testpassword123",
+                "is_age_verified": True,
+            },
+        )
+        conv_response = await client.get("/api/v1/chat/conversation")
+        session_id = conv_response.json()["id"]
+        total = len(conv_response.json()["messages"])
+
+        response = await client.get(
+            f"/api/v1/chat/sessions/{session_id}/messages?limit=100"
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data["messages"]) == total
+        assert data["has_more"] is False
+        assert data["next_cursor"] is None
+
+    async def test_other_users_session_not_found(self, client: AsyncClient):
+        """Should return 404 for unknown sessions."""
+        await client.post(
+            "/api/v1/auth/register",
+            json={
+                "email": "session_messages_404@example.com",
+                "password": "testpassword123",
+                "is_age_verified": True,
+            },
+        )
+
+        response = await client.get(f"/api/v1/chat/sessions/{uuid.uuid4()}/messages")
+        assert response.status_code == 404
+
+
 @pytest.mark.asyncio
 class TestCreateSession:
     """T018: Integration tests for POST /chat/sessions."""
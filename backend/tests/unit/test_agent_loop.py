@@ -22,6 +22,7 @@ Tests:
 6. test_iteration_counter_increments
 """
 
+import asyncio
 import json
 from unittest.mock import AsyncMock, MagicMock, patch
 
@@ -759,6 +760,159 @@ class TestCombinedToolCalls:
         assert service.llm_service.generate_with_tools.call_count == 2
 
 
+@pytest.mark.asyncio
+class TestParallelToolExecution:
+    """Tool calls of one iteration run concurrently, results keep call order."""
+
+    async def test_tool_calls_run_concurrently(self):
+        """Both executors should be in flight at the same time."""
+        service = _make_sommelier_service_with_both_tools()
+        in_flight = 0
+        max_in_flight = 0
+
+        async def _slow_tool(arguments):
+            nonlocal in_flight, max_in_flight
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return json.dumps({"found": 0, "wines": []})
+
+        service.execute_search_wines = AsyncMock(side_effect=_slow_tool)
+        service.execute_semantic_search = AsyncMock(side_effect=_slow_tool)
+
+        search_tc = _make_mock_tool_call(call_id="c1", name="search_wines", arguments="{}")
+        semantic_tc = _make_mock_tool_call(call_id="c2", name="semantic_search", arguments='{"query": "x"}')
+        service.llm_service.generate_with_tools = AsyncMock(
+            side_effect=[
+                _make_msg_with_tool_calls(tool_calls=[search_tc, semantic_tc]),
+                _make_msg_with_content(VALID_SOMMELIER_JSON),
+            ]
+        )
+
+        await service.generate_agentic_response(
+            system_prompt="You are a sommelier.",
+            user_message="Find wine",
+        )
+
+        assert max_in_flight == 2
+
+    async def test_results_appended_in_call_order(self):
+        """A slower first tool must still be paired with the first tool_call_id."""
+        service = _make_sommelier_service_with_both_tools()
+
+        async def _slow_search(arguments):
+            await asyncio.sleep(0.02)
+            return json.dumps({"source": "search"})
+
+        async def _fast_semantic(arguments):
+            return json.dumps({"source": "semantic"})
+
+        service.execute_search_wines = AsyncMock(side_effect=_slow_search)
+        service.execute_semantic_search = AsyncMock(side_effect=_fast_semantic)
+
+        search_tc = _make_mock_tool_call(call_id="call_search", name="search_wines", arguments="{}")
+        semantic_tc = _make_mock_tool_call(call_id="call_semantic", name="semantic_search", arguments='{"query": "x"}')
+        service.llm_service.generate_with_tools = AsyncMock(
+            side_effect=[
+                _make_msg_with_tool_calls(tool_calls=[search_tc, semantic_tc]),
+                _make_msg_with_content(VALID_SOMMELIER_JSON),
+            ]
+        )
+
+        await service.generate_agentic_response(
+            system_prompt="You are a sommelier.",
+            user_message="Find wine",
+        )
+
+        messages = service.llm_service.generate_with_tools.call_args_list[1].kwargs["messages"]
+        tool_messages = [m for m in messages if m.get("role") == "tool"]
+        assert [m["tool_call_id"] for m in tool_messages] == ["call_search", "call_semantic"]
+        assert json.loads(tool_messages[0]["content"])["source"] == "search"
+        assert json.loads(tool_messages[1]["content"])["source"] == "semantic"
+
+
+@pytest.mark.asyncio
+class TestStreamingEvents:
+    """With on_event, progress and answer sections are streamed as they happen."""
+
+    async def test_tool_progress_and_sections_streamed(self):
+        service = _make_sommelier_service()
+        responses = iter([
+            _make_msg_with_tool_calls(),
+            _make_msg_with_content(VALID_SOMMELIER_JSON),
+        ])
+
+        async def _generate(**kwargs):
+            response = next(responses)
+            if response.content:
+                for i in range(0, len(response.content), 7):
+                    await kwargs["on_delta"](response.content[i:i + 7])
+            return response
+
+        service.llm_service.generate_with_tools = AsyncMock(side_effect=_generate)
+        events = []
+
+        async def on_event(event, data):
+            events.append((event, data))
+
+        result = await service.generate_agentic_response(
+            system_prompt="You are a sommelier.",
+            user_message="Find red wine under 2000",
+            on_event=on_event,
+        )
+
+        names = [e for e, _ in events]
+        assert names[:2] == ["tool_call", "tool_result"]
+        assert events[0][1]["name"] == "search_wines"
+        assert names.index("wine") > names.index("intro")
+        assert names.index("closing") > names.index("wine")
+        intro = "".join(d["delta"] for e, d in events if e == "intro")
+        assert intro == "Вот отличные варианты красного вина!"
+        wine = next(d for e, d in events if e == "wine")
+        assert wine["wine_name"] == "Malbec Reserva 2020"
+        assert result[1] == ["550e8400-e29b-41d4-a716-446655440000"]
+
+    async def test_retry_emits_reset(self):
+        service = _make_sommelier_service()
+        service.llm_service.generate_with_tools = AsyncMock(
+            side_effect=[
+                _make_msg_with_content(INVALID_JSON),
+                _make_msg_with_content(VALID_SOMMELIER_JSON),
+            ]
+        )
+        events = []
+
+        async def on_event(event, data):
+            events.append(event)
+
+        with patch("app.config.get_settings") as mock_settings:
+            mock_settings.return_value.agent_max_iterations = 5
+            mock_settings.return_value.structured_output_max_retries = 2
+            mock_settings.return_value.llm_max_history_messages = 10
+            await service.generate_agentic_response(
+                system_prompt="You are a sommelier.",
+                user_message="Find wine",
+                on_event=on_event,
+            )
+
+        assert events == ["reset"]
+
+    async def test_no_streaming_without_on_event(self):
+        service = _make_sommelier_service()
+        service.llm_service.generate_with_tools = AsyncMock(
+            return_value=_make_msg_with_content(VALID_SOMMELIER_JSON),
+        )
+
+        await service.generate_agentic_response(
+            system_prompt="You are a sommelier.",
+            user_message="Find wine",
+        )
+
+        call_kwargs = service.llm_service.generate_with_tools.call_args.kwargs
+        assert "on_delta" not in call_kwargs
+
+
 # ---------------------------------------------------------------------------
 # T022: Contextual queries — conversation history integration
 # ---------------------------------------------------------------------------
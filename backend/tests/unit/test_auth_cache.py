@@ -0,0 +1,110 @@
+"""Unit tests for the authenticated-user cache."""
+
+import time
+import uuid
+from unittest.mock import MagicMock, patch
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.auth_cache import AuthCache, get_auth_cache, reset_auth_cache
+from app.core.deps import get_current_user
+from app.core.security import create_access_token
+from app.models.user import User
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache():
+    reset_auth_cache()
+    yield
+    reset_auth_cache()
+
+
+async def _user(db_session: AsyncSession, **kwargs) -> User:
+    user = User(
+        id=uuid.uuid4(),
+        email=f"{uuid.uuid4().hex[:8]}@example.com",
+        password_hash="hashed",
+        is_age_verified=True,
+        **kwargs,
+    )
+    db_session.add(user)
+    await db_session.flush()
+    await db_session.refresh(user)
+    return user
+
+
+def _request(token: str) -> MagicMock:
+    request = MagicMock()
+    request.cookies = {"access_token": token}
+    return request
+
+
+class TestAuthCache:
+
+    def test_token_expires_with_its_exp(self):
+        cache = AuthCache()
+        cache.set_token("fresh", {"sub": "1", "exp": time.time() + 60})
+        cache.set_token("stale", {"sub": "2", "exp": time.time() - 1})
+
+        assert cache.get_token("fresh")["sub"] == "1"
+        assert cache.get_token("stale") is None
+
+    def test_user_snapshot_expires_after_ttl(self):
+        cache = AuthCache(user_ttl_seconds=0)
+        user = User(id=uuid.uuid4(), email="a@example.com", is_age_verified=True, is_active=True)
+
+        cache.set_user(user)
+
+        assert cache.get_user(user.id) is None
+
+    def test_evicts_least_recently_used(self):
+        cache = AuthCache(max_size=2)
+        for token in ("a", "b", "c"):
+            cache.set_token(token, {"sub": token})
+
+        assert cache.get_token("a") is None
+        assert cache.get_token("c") == {"sub": "c"}
+
+
+@pytest.mark.asyncio
+class TestGetCurrentUserCaching:
+
+    async def test_second_request_skips_db(self, db_session: AsyncSession):
+        user = await _user(db_session)
+        token = create_access_token(subject=str(user.id))
+
+        with patch(
+            "app.core.deps.UserRepository.get_by_id", autospec=True, return_value=user,
+        ) as get_by_id:
+            first = await get_current_user(_request(token), db_session)
+            second = await get_current_user(_request(token), db_session)
+
+        assert get_by_id.call_count == 1
+        assert first.id == second.id == user.id
+        assert second.email == user.email
+
+    async def test_password_change_invalidates(self, db_session: AsyncSession):
+        user = await _user(db_session)
+        token = create_access_token(subject=str(user.id))
+        await get_current_user(_request(token), db_session)
+        assert get_auth_cache().get_user(user.id) is not None
+
+        user.password_hash = "new-hash"
+
+        assert get_auth_cache().get_user(user.id) is None
+
+    async def test_deactivated_user_is_rejected_after_invalidation(
+        self, db_session: AsyncSession
+    ):
+        user = await _user(db_session)
+        token = create_access_token(subject=str(user.id))
+        await get_current_user(_request(token), db_session)
+
+        user.is_active = False
+        await db_session.flush()
+
+        with pytest.raises(HTTPException) as exc_info:
+            await get_current_user(_request(token), db_session)
+        assert exc_info.value.status_code == 401
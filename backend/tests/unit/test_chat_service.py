@@ -169,3 +169,58 @@ class TestGetOrCreateConversation:
 
         assert is_new is True
         assert conv is not None
+
+
+@pytest.mark.asyncio
+class TestSendMessageUnitsOfWork:
+    """send_message() releases the connection while the LLM works."""
+
+    async def _start_session(self, chat_service: ChatService, user: User) -> None:
+        with patch.object(
+            chat_service.sommelier,
+            "generate_welcome_with_suggestions",
+            new_callable=AsyncMock,
+            return_value={"message": "Welcome!", "wines": []},
+        ):
+            await chat_service.create_new_session(user.id)
+
+    async def test_no_transaction_open_during_generation(
+        self, user: User, db_session: AsyncSession
+    ):
+        """With a session factory, context is committed before the LLM call."""
+        chat_service = ChatService(db_session, session_factory=MagicMock())
+        await self._start_session(chat_service, user)
+        in_transaction = []
+
+        async def generate(**kwargs):
+            in_transaction.append(db_session.in_transaction())
+            return "Ответ"
+
+        with (
+            patch.object(chat_service, "_generate_contextual_response", side_effect=generate),
+            patch.object(chat_service, "_maybe_generate_session_title", new_callable=AsyncMock),
+        ):
+            user_message, ai_message = await chat_service.send_message(user.id, "Вино к ужину?")
+
+        assert in_transaction == [False]
+        assert user_message.content == "Вино к ужину?"
+        assert ai_message.content == "Ответ"
+
+    async def test_transaction_kept_without_session_factory(
+        self, chat_service: ChatService, user: User, db_session: AsyncSession
+    ):
+        """Without a session factory the caller keeps owning the transaction."""
+        await self._start_session(chat_service, user)
+        in_transaction = []
+
+        async def generate(**kwargs):
+            in_transaction.append(db_session.in_transaction())
+            return "Ответ"
+
+        with (
+            patch.object(chat_service, "_generate_contextual_response", side_effect=generate),
+            patch.object(chat_service, "_maybe_generate_session_title", new_callable=AsyncMock),
+        ):
+            await chat_service.send_message(user.id, "Вино к ужину?")
+
+        assert in_transaction == [True]
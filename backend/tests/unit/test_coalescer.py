@@ -0,0 +1,115 @@
+"""Unit tests for MessageCoalescer."""
+
+import asyncio
+
+import pytest
+
+from app.bot.coalescer import MessageCoalescer
+
+WINDOW = 0.02
+
+
+class Recorder:
+    """generate/send callbacks that log their calls."""
+
+    def __init__(self, generate_delay: float = 0.0):
+        self.generate_delay = generate_delay
+        self.generated: list[list[str]] = []
+        self.sent: list[list[str]] = []
+        self.send_started = asyncio.Event()
+        self.release_send = asyncio.Event()
+        self.release_send.set()
+
+    async def generate(self, items: list[str]) -> str:
+        self.generated.append(list(items))
+        await asyncio.sleep(self.generate_delay)
+        return " + ".join(items)
+
+    async def send(self, items: list[str], result: str) -> None:
+        self.send_started.set()
+        await self.release_send.wait()
+        self.sent.append(list(items))
+
+
+async def _settle(seconds: float = WINDOW * 5) -> None:
+    await asyncio.sleep(seconds)
+
+
+@pytest.mark.asyncio
+class TestMessageCoalescer:
+
+    async def test_messages_within_window_are_answered_once(self):
+        recorder = Recorder()
+        coalescer = MessageCoalescer(WINDOW, recorder.generate, recorder.send)
+
+        for text in ("красное", "до 2000", "к мясу"):
+            coalescer.submit(1, text)
+        await _settle()
+
+        assert recorder.generated == [["красное", "до 2000", "к мясу"]]
+        assert recorder.sent == [["красное", "до 2000", "к мясу"]]
+        assert coalescer._chats == {}
+
+    async def test_chats_are_independent(self):
+        recorder = Recorder()
+        coalescer = MessageCoalescer(WINDOW, recorder.generate, recorder.send)
+
+        coalescer.submit(1, "a")
+        coalescer.submit(2, "b")
+        await _settle()
+
+        assert sorted(recorder.sent) == [["a"], ["b"]]
+
+    async def test_new_message_cancels_generating_run(self):
+        recorder = Recorder(generate_delay=WINDOW * 5)
+        coalescer = MessageCoalescer(WINDOW, recorder.generate, recorder.send)
+
+        coalescer.submit(1, "красное")
+        await asyncio.sleep(WINDOW * 2)  # run is generating
+        coalescer.submit(1, "к мясу")
+        await _settle(WINDOW * 10)
+
+        assert recorder.generated == [["красное"], ["красное", "к мясу"]]
+        assert recorder.sent == [["красное", "к мясу"]]
+
+    async def test_sending_run_is_not_cancelled(self):
+        recorder = Recorder()
+        recorder.release_send.clear()
+        coalescer = MessageCoalescer(WINDOW, recorder.generate, recorder.send)
+
+        coalescer.submit(1, "first")
+        await asyncio.wait_for(recorder.send_started.wait(), 1)
+        coalescer.submit(1, "second")
+        await asyncio.sleep(WINDOW * 2)
+        recorder.release_send.set()
+        await _settle()
+
+        assert recorder.sent == [["first"], ["second"]]
+
+    async def test_failed_generate_does_not_block_chat(self):
+        recorder = Recorder()
+        calls = []
+
+        async def generate(items):
+            calls.append(items)
+            if len(calls) == 1:
+                raise RuntimeError("boom")
+            return "ok"
+
+        coalescer = MessageCoalescer(WINDOW, generate, recorder.send)
+        coalescer.submit(1, "a")
+        await _settle()
+        coalescer.submit(1, "b")
+        await _settle()
+
+        assert recorder.sent == [["b"]]
+
+    async def test_close_cancels_pending_work(self):
+        recorder = Recorder()
+        coalescer = MessageCoalescer(WINDOW, recorder.generate, recorder.send)
+
+        coalescer.submit(1, "a")
+        await coalescer.close()
+        await _settle()
+
+        assert recorder.generated == []
@@ -0,0 +1,159 @@
+"""Unit tests for ConversationInsightsRepository."""
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+import pytest_asyncio
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.conversation import Conversation
+from app.models.user import User
+from app.repositories.conversation_insights import (
+    MAX_WINE_MENTIONS,
+    ConversationInsightsRepository,
+)
+
+
+@pytest_asyncio.fixture
+async def user(db_session: AsyncSession) -> User:
+    """Create a test user."""
+    user = User(
+        id=uuid.uuid4(),
+        email="test@example.com",
+        password_hash="hashed",
+        is_age_verified=True,
+    )
+    db_session.add(user)
+    await db_session.flush()
+    return user
+
+
+@pytest_asyncio.fixture
+async def repo(db_session: AsyncSession) -> ConversationInsightsRepository:
+    """Create repository instance."""
+    return ConversationInsightsRepository(db_session)
+
+
+async def _conversation(db_session: AsyncSession, user: User, days_ago: int = 0) -> Conversation:
+    conversation = Conversation(
+        user_id=user.id,
+        created_at=datetime.now(timezone.utc) - timedelta(days=days_ago),
+    )
+    db_session.add(conversation)
+    await db_session.flush()
+    return conversation
+
+
+@pytest.mark.asyncio
+class TestAddMessages:
+
+    async def test_creates_row_on_first_exchange(
+        self, repo: ConversationInsightsRepository, user: User, db_session: AsyncSession
+    ):
+        conversation = await _conversation(db_session, user)
+
+        insights = await repo.add_messages(
+            conversation, events=["ужин"], foods=["сыр"], wine_mentions=["Barolo"],
+            message_count=2,
+        )
+
+        assert insights.user_id == user.id
+        assert insights.events == ["ужин"]
+        assert insights.messages_processed == 2
+
+    async def test_merges_and_deduplicates(
+        self, repo: ConversationInsightsRepository, user: User, db_session: AsyncSession
+    ):
+        conversation = await _conversation(db_session, user)
+        await repo.add_messages(
+            conversation, events=["ужин"], foods=[], wine_mentions=["Barolo"],
+            message_count=2,
+        )
+
+        insights = await repo.add_messages(
+            conversation, events=["ужин", "праздник"], foods=["сыр"],
+            wine_mentions=["Chianti"], message_count=2,
+        )
+
+        assert insights.events == ["ужин", "праздник"]
+        assert insights.foods == ["сыр"]
+        assert insights.wine_mentions == ["Barolo", "Chianti"]
+        assert insights.messages_processed == 4
+
+    async def test_stores_wine_preferences_apart_from_mentions(
+        self, repo: ConversationInsightsRepository, user: User, db_session: AsyncSession
+    ):
+        conversation = await _conversation(db_session, user)
+        await repo.add_messages(
+            conversation, events=[], foods=[], wine_mentions=["Barolo"], message_count=2,
+        )
+
+        insights = await repo.add_messages(
+            conversation, events=[], foods=[], wine_mentions=[], message_count=0,
+            liked_wines=["Chianti"], disliked_wines=["Мальбек"],
+        )
+
+        assert insights.wine_mentions == ["Barolo"]
+        assert insights.liked_wines == ["Chianti"]
+        assert insights.disliked_wines == ["Мальбек"]
+        assert insights.messages_processed == 2
+
+    async def test_keeps_latest_wine_mentions(
+        self, repo: ConversationInsightsRepository, user: User, db_session: AsyncSession
+    ):
+        conversation = await _conversation(db_session, user)
+        names = [f"Wine{i}" for i in range(MAX_WINE_MENTIONS + 5)]
+
+        insights = await repo.add_messages(
+            conversation, events=[], foods=[], wine_mentions=names, message_count=1,
+        )
+
+        assert insights.wine_mentions == names[-MAX_WINE_MENTIONS:]
+
+
+@pytest.mark.asyncio
+class TestGetRecentByUserId:
+
+    async def test_returns_newest_sessions_and_total(
+        self, repo: ConversationInsightsRepository, user: User, db_session: AsyncSession
+    ):
+        old = await _conversation(db_session, user, days_ago=3)
+        new = await _conversation(db_session, user, days_ago=1)
+        await _conversation(db_session, user)  # no messages yet -> no row
+        for conversation in (old, new):
+            await repo.add_messages(
+                conversation, events=[], foods=[], wine_mentions=[], message_count=1,
+            )
+
+        rows, total = await repo.get_recent_by_user_id(user.id)
+
+        assert [r.conversation_id for r in rows] == [new.id, old.id]
+        assert total == 3
+
+    async def test_excludes_conversation_and_limits(
+        self, repo: ConversationInsightsRepository, user: User, db_session: AsyncSession
+    ):
+        conversations = [await _conversation(db_session, user, days_ago=d) for d in (1, 2, 3)]
+        for conversation in conversations:
+            await repo.add_messages(
+                conversation, events=[], foods=[], wine_mentions=[], message_count=1,
+            )
+
+        rows, _ = await repo.get_recent_by_user_id(
+            user.id, limit=1, exclude_conversation_id=conversations[0].id,
+        )
+
+        assert [r.conversation_id for r in rows] == [conversations[1].id]
+
+    async def test_empty_for_new_user(
+        self, repo: ConversationInsightsRepository, user: User
+    ):
+        assert await repo.get_recent_by_user_id(user.id) == ([], 0)
+
+    async def test_total_counts_sessions_without_insights(
+        self, repo: ConversationInsightsRepository, user: User, db_session: AsyncSession
+    ):
+        await _conversation(db_session, user, days_ago=2)
+        await _conversation(db_session, user, days_ago=1)
+
+        assert await repo.get_recent_by_user_id(user.id) == ([], 2)
@@ -1,16 +1,17 @@
 """Unit tests for ConversationRepository.
 
 Tests:
-- T008: get_all_by_user_id() returns paginated sessions
+- list_summaries_by_user_id() returns session summaries without messages
 """
 import uuid
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 
 import pytest
 import pytest_asyncio
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.conversation import Conversation
+from app.models.message import Message, MessageRole
 from app.models.user import User
 from app.repositories.conversation import ConversationRepository
 
@@ -36,115 +37,95 @@ async def repo(db_session: AsyncSession) -> ConversationRepository:
 
 
 @pytest.mark.asyncio
-class TestGetAllByUserId:
-    """T008: Tests for get_all_by_user_id()."""
+class TestListSummariesByUserId:
+    """Tests for list_summaries_by_user_id()."""
 
-    async def test_returns_empty_for_no_conversations(
-        self, repo: ConversationRepository, user: User
-    ):
-        """Should return empty list if user has no conversations."""
-        conversations, total = await repo.get_all_by_user_id(user.id)
-
-        assert conversations == []
-        assert total == 0
-
-    async def test_returns_user_conversations(
-        self, repo: ConversationRepository, user: User, db_session: AsyncSession
-    ):
-        """Should return all conversations for user."""
-        # Create conversations
-        conv1 = Conversation(user_id=user.id, title="First")
-        conv2 = Conversation(user_id=user.id, title="Second")
-        db_session.add_all([conv1, conv2])
+    async def _conversations(
+        self, db_session: AsyncSession, user: User, count: int
+    ) -> list[Conversation]:
+        now = datetime.now(timezone.utc)
+        conversations = []
+        for i in range(count):
+            conversation = Conversation(user_id=user.id, title=f"Chat {i}")
+            conversation.created_at = now - timedelta(hours=count - i)
+            conversations.append(conversation)
+        db_session.add_all(conversations)
         await db_session.flush()
+        return conversations
 
-        conversations, total = await repo.get_all_by_user_id(user.id)
-
-        assert len(conversations) == 2
-        assert total == 2
-
-    async def test_does_not_return_other_user_conversations(
+    async def test_counts_and_previews_messages(
         self, repo: ConversationRepository, user: User, db_session: AsyncSession
     ):
-        """Should not return conversations belonging to other users."""
-        # Create another user
-        other_user = User(
-            id=uuid.uuid4(),
-            email="other@example.com",
-            password_hash="hashed",
-            is_age_verified=True,
-        )
-        db_session.add(other_user)
-        await db_session.flush()
-
-        # Create conversations for both users
-        user_conv = Conversation(user_id=user.id, title="User's conv")
-        other_conv = Conversation(user_id=other_user.id, title="Other's conv")
-        db_session.add_all([user_conv, other_conv])
+        """Should compute message count and last message preview in SQL."""
+        [conversation] = await self._conversations(db_session, user, 1)
+        now = datetime.now(timezone.utc)
+        db_session.add_all([
+            Message(
+                conversation_id=conversation.id,
+                role=MessageRole.USER,
+                content="Что взять к стейку?",
+                created_at=now - timedelta(minutes=1),
+            ),
+            Message(
+                conversation_id=conversation.id,
+                role=MessageRole.ASSISTANT,
+                content="Попробуйте мальбек. " * 20,
+                created_at=now,
+            ),
+        ])
         await db_session.flush()
 
-        conversations, total = await repo.get_all_by_user_id(user.id)
+        summaries, has_more = await repo.list_summaries_by_user_id(user.id)
 
-        assert len(conversations) == 1
-        assert total == 1
-        assert conversations[0].title == "User's conv"
+        assert has_more is False
+        assert summaries[0].message_count == 2
+        assert summaries[0].last_message_preview.startswith("Попробуйте мальбек.")
+        assert len(summaries[0].last_message_preview) == 100
 
-    async def test_pagination_limit(
+    async def test_empty_conversation(
         self, repo: ConversationRepository, user: User, db_session: AsyncSession
     ):
-        """Should respect limit parameter."""
-        # Create 5 conversations
-        for i in range(5):
-            conv = Conversation(user_id=user.id, title=f"Conv {i}")
-            db_session.add(conv)
-        await db_session.flush()
+        """Should report zero messages and no preview."""
+        await self._conversations(db_session, user, 1)
 
-        conversations, total = await repo.get_all_by_user_id(user.id, limit=2)
+        summaries, _ = await repo.list_summaries_by_user_id(user.id)
 
-        assert len(conversations) == 2
-        assert total == 5
+        assert summaries[0].message_count == 0
+        assert summaries[0].last_message_preview is None
 
-    async def test_pagination_offset(
+    async def test_keyset_pages_cover_all_sessions_once(
         self, repo: ConversationRepository, user: User, db_session: AsyncSession
     ):
-        """Should respect offset parameter."""
-        # Create 5 conversations
-        for i in range(5):
-            conv = Conversation(user_id=user.id, title=f"Conv {i}")
-            db_session.add(conv)
-        await db_session.flush()
-
-        conversations, total = await repo.get_all_by_user_id(
-            user.id, limit=2, offset=3
-        )
-
-        assert len(conversations) == 2
-        assert total == 5
-
-    async def test_orders_by_created_at_desc(
+        """Should page newest first by (created_at, id) without gaps."""
+        await self._conversations(db_session, user, 5)
+
+        titles = []
+        after = None
+        while True:
+            summaries, has_more = await repo.list_summaries_by_user_id(
+                user.id, limit=2, after=after,
+            )
+            titles += [s.conversation.title for s in summaries]
+            if not has_more:
+                break
+            last = summaries[-1].conversation
+            after = (last.created_at, last.id)
+
+        assert titles == [f"Chat {i}" for i in reversed(range(5))]
+
+    async def test_offset_pagination(
         self, repo: ConversationRepository, user: User, db_session: AsyncSession
     ):
-        """Should return newest conversations first."""
-        from datetime import datetime, timedelta, timezone
-
-        # Create conversations with explicit timestamps
-        now = datetime.now(timezone.utc)
-
-        conv1 = Conversation(user_id=user.id, title="Old")
-        conv1.created_at = now - timedelta(hours=1)
-        db_session.add(conv1)
-
-        conv2 = Conversation(user_id=user.id, title="New")
-        conv2.created_at = now
-        db_session.add(conv2)
+        """Should still support offset pages."""
+        await self._conversations(db_session, user, 3)
 
-        await db_session.flush()
-
-        conversations, _ = await repo.get_all_by_user_id(user.id)
+        summaries, has_more = await repo.list_summaries_by_user_id(
+            user.id, limit=2, offset=2,
+        )
 
-        # Newest first
-        assert conversations[0].title == "New"
-        assert conversations[1].title == "Old"
+        assert [s.conversation.title for s in summaries] == ["Chat 0"]
+        assert has_more is False
+        assert await repo.count_by_user_id(user.id) == 3
 
 
 @pytest.mark.asyncio
@@ -0,0 +1,122 @@
+"""Unit tests for the outbound Telegram dispatcher."""
+
+import asyncio
+import time
+
+import pytest
+from telegram.error import RetryAfter
+
+from app.bot.dispatcher import OutboundDispatcher, TokenBucket
+
+
+@pytest.mark.asyncio
+class TestTokenBucket:
+
+    async def test_burst_then_rate(self):
+        bucket = TokenBucket(rate=50, capacity=2)
+
+        started = time.monotonic()
+        for _ in range(3):
+            await bucket.acquire()
+        elapsed = time.monotonic() - started
+
+        assert 0.01 <= elapsed < 0.2
+
+    async def test_higher_priority_is_served_first(self):
+        bucket = TokenBucket(rate=50, capacity=1)
+        await bucket.acquire()  # empty the bucket
+        order = []
+
+        async def take(name, priority):
+            await bucket.acquire(priority)
+            order.append(name)
+
+        await asyncio.gather(take("follow-up", 1), take("first", 0))
+
+        assert order == ["first", "follow-up"]
+
+    async def test_pause_delays_tokens(self):
+        bucket = TokenBucket(rate=1000, capacity=5)
+        bucket.pause(0.05)
+
+        started = time.monotonic()
+        await bucket.acquire()
+
+        assert time.monotonic() - started >= 0.04
+
+
+@pytest.mark.asyncio
+class TestOutboundDispatcher:
+
+    async def test_keeps_chat_order(self):
+        dispatcher = OutboundDispatcher(global_rate=1000, chat_rate=1000, chat_burst=10)
+        sent = []
+
+        async def send(text, delay):
+            await asyncio.sleep(delay)
+            sent.append(text)
+
+        await asyncio.gather(
+            dispatcher.send(1, lambda: send("intro", 0.02), first=True),
+            dispatcher.send(1, lambda: send("wine", 0)),
+            dispatcher.send(1, lambda: send("closing", 0)),
+        )
+
+        assert sent == ["intro", "wine", "closing"]
+
+    async def test_retries_after_flood_limit(self):
+        dispatcher = OutboundDispatcher(global_rate=1000, chat_rate=1000, chat_burst=10)
+        attempts = []
+
+        async def send():
+            attempts.append(time.monotonic())
+            if len(attempts) == 1:
+                raise RetryAfter(0)
+            return "ok"
+
+        assert await dispatcher.send(1, send) == "ok"
+        assert len(attempts) == 2
+
+    async def test_flood_limit_pauses_other_chats(self):
+        dispatcher = OutboundDispatcher(global_rate=1000, chat_rate=1000, chat_burst=10)
+        sent_at = {}
+
+        async def flooded():
+            if "flooded" not in sent_at:
+                sent_at["flooded"] = time.monotonic()
+                raise RetryAfter(0.1)
+            return "ok"
+
+        async def other():
+            sent_at["other"] = time.monotonic()
+
+        async def other_chat_later():
+            await asyncio.sleep(0.01)
+            await dispatcher.send(2, other)
+
+        await asyncio.gather(dispatcher.send(1, flooded), other_chat_later())
+
+        assert sent_at["other"] - sent_at["flooded"] >= 0.09
+
+    async def test_gives_up_after_max_retries(self):
+        dispatcher = OutboundDispatcher(
+            global_rate=1000, chat_rate=1000, chat_burst=10, max_retries=1,
+        )
+
+        async def send():
+            raise RetryAfter(0)
+
+        with pytest.raises(RetryAfter):
+            await dispatcher.send(1, send)
+        assert dispatcher._chats == {} or all(
+            users == 0 for _, _, users in dispatcher._chats.values()
+        )
+
+    async def test_other_errors_propagate(self):
+        dispatcher = OutboundDispatcher()
+
+        async def send():
+            raise ValueError("bad request")
+
+        with pytest.raises(ValueError):
+            await dispatcher.send(1, send)
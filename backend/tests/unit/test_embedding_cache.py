@@ -0,0 +1,115 @@
+"""Unit tests for the query embedding cache (app/services/embedding_cache.py)."""
+
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.services.embedding_cache import EmbeddingCache, normalize_query
+from app.services.llm import LLMService
+
+MODEL = "BAAI/bge-m3"
+
+
+class TestNormalizeQuery:
+    def test_casefold_yo_and_whitespace(self):
+        assert normalize_query("  Лёгкое   И\tсвежее ") == "легкое и свежее"
+
+
+class TestEmbeddingCache:
+    def test_miss_then_hit(self):
+        cache = EmbeddingCache(max_size=10)
+
+        assert cache.get(MODEL, "сухое белое") is None
+        cache.set(MODEL, "сухое белое", [0.1, 0.2])
+
+        assert cache.get(MODEL, "Сухое  БЕЛОЕ") == [0.1, 0.2]
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+
+    def test_key_includes_model(self):
+        cache = EmbeddingCache(max_size=10)
+        cache.set(MODEL, "к стейку", [1.0])
+
+        assert cache.get("other-model", "к стейку") is None
+
+    def test_lru_eviction(self):
+        cache = EmbeddingCache(max_size=2)
+        cache.set(MODEL, "a", [1.0])
+        cache.set(MODEL, "b", [2.0])
+        cache.get(MODEL, "a")  # "b" becomes least recently used
+        cache.set(MODEL, "c", [3.0])
+
+        assert cache.get(MODEL, "b") is None
+        assert cache.get(MODEL, "a") == [1.0]
+        assert len(cache) == 2
+
+    def test_ttl_expiry(self):
+        cache = EmbeddingCache(max_size=10, ttl_seconds=60)
+        cache.set(MODEL, "a", [1.0])
+
+        with patch("app.services.embedding_cache.time.time", return_value=time.time() + 61):
+            assert cache.get(MODEL, "a") is None
+        assert len(cache) == 0
+
+    def test_persists_and_reloads(self, tmp_path):
+        path = tmp_path / "embeddings.json"
+        cache = EmbeddingCache(max_size=10, path=str(path))
+        cache.set(MODEL, "игристое", [0.5, 0.25])
+        cache.save()
+
+        reloaded = EmbeddingCache(max_size=10, path=str(path))
+
+        assert reloaded.get(MODEL, "игристое") == [0.5, 0.25]
+
+    @pytest.mark.asyncio
+    async def test_periodic_persist_runs_in_background(self, tmp_path):
+        path = tmp_path / "embeddings.json"
+        cache = EmbeddingCache(max_size=10, path=str(path), persist_interval_seconds=0)
+
+        with patch.object(cache, "_write", wraps=cache._write) as write:
+            cache.set(MODEL, "розе", [0.75])
+            # set() only schedules the write
+            write.assert_not_called()
+            await cache._persist_task
+
+        write.assert_called_once()
+        assert EmbeddingCache(max_size=10, path=str(path)).get(MODEL, "розе") == [0.75]
+
+    def test_corrupt_file_is_ignored(self, tmp_path):
+        path = tmp_path / "embeddings.json"
+        path.write_text("{not json")
+
+        cache = EmbeddingCache(max_size=10, path=str(path))
+
+        assert len(cache) == 0
+
+
+class TestLLMServiceEmbeddingCache:
+    @pytest.mark.asyncio
+    async def test_repeated_query_calls_provider_once(self):
+        service = LLMService()
+        service._initialized = True
+        service._provider = MagicMock()
+        service._provider.get_query_embedding = AsyncMock(return_value=[0.1, 0.2])
+        cache = EmbeddingCache(max_size=10)
+
+        with patch("app.services.llm.get_embedding_cache", return_value=cache):
+            first = await service.get_query_embedding("Вино к утке")
+            second = await service.get_query_embedding("вино к  утке")
+
+        assert first == second == [0.1, 0.2]
+        service._provider.get_query_embedding.assert_awaited_once_with("Вино к утке")
+
+    @pytest.mark.asyncio
+    async def test_cache_disabled_always_calls_provider(self):
+        service = LLMService()
+        service._initialized = True
+        service._provider = MagicMock()
+        service._provider.get_query_embedding = AsyncMock(return_value=[0.1])
+
+        with patch("app.services.llm.get_embedding_cache", return_value=None):
+            await service.get_query_embedding("розе")
+            await service.get_query_embedding("розе")
+
+        assert service._provider.get_query_embedding.await_count == 2
@@ -0,0 +1,237 @@
+"""Unit tests for the bulk catalog embedding pipeline."""
+
+import asyncio
+import json
+import uuid
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.models.wine import Sweetness, WineType
+from app.repositories.wine import WineRepository
+from app.services.embedding_pipeline import (
+    EmbeddingPipeline,
+    content_hash,
+    create_embedding_text,
+    embed_catalog,
+    embedding_status,
+    wine_to_embedding_dict,
+)
+
+
+def _make_client(fail_times: int = 0):
+    """Fake embeddings client: embedding = [len(text)], optional transient failures."""
+    state = {"calls": 0, "in_flight": 0, "max_in_flight": 0, "failures": fail_times}
+
+    async def create(model, input):
+        state["calls"] += 1
+        state["in_flight"] += 1
+        state["max_in_flight"] = max(state["max_in_flight"], state["in_flight"])
+        try:
+            await asyncio.sleep(0.01)
+            if state["failures"] > 0:
+                state["failures"] -= 1
+                raise RuntimeError("429 Too Many Requests")
+            # Reverse order to check the pipeline sorts by index
+            data = [
+                SimpleNamespace(index=i, embedding=[float(len(text))])
+                for i, text in enumerate(input)
+            ]
+            return SimpleNamespace(data=list(reversed(data)))
+        finally:
+            state["in_flight"] -= 1
+
+    client = MagicMock()
+    client.embeddings.create = AsyncMock(side_effect=create)
+    return client, state
+
+
+def _items(n: int) -> list[tuple[str, str]]:
+    return [(f"k{i}", "x" * (i + 1)) for i in range(n)]
+
+
+@pytest.mark.asyncio
+class TestEmbeddingPipeline:
+
+    async def test_batches_run_concurrently(self):
+        client, state = _make_client()
+        pipeline = EmbeddingPipeline(client, "m", batch_size=2, concurrency=3)
+
+        results = await pipeline.run(_items(10))
+
+        assert state["calls"] == 5
+        assert state["max_in_flight"] == 3
+        assert results["k0"] == [1.0]
+        assert results["k9"] == [10.0]
+
+    async def test_retries_transient_failures(self):
+        client, state = _make_client(fail_times=2)
+        pipeline = EmbeddingPipeline(client, "m", batch_size=10, backoff_base_seconds=0)
+
+        results = await pipeline.run(_items(3))
+
+        assert len(results) == 3
+        assert state["calls"] == 3
+        assert pipeline.failed_keys == []
+
+    async def test_exhausted_retries_reported_as_failed(self):
+        client, _ = _make_client(fail_times=100)
+        pipeline = EmbeddingPipeline(client, "m", batch_size=2, max_retries=1, backoff_base_seconds=0)
+
+        results = await pipeline.run(_items(2))
+
+        assert results == {}
+        assert sorted(pipeline.failed_keys) == ["k0", "k1"]
+
+    async def test_resumes_from_checkpoint(self, tmp_path):
+        checkpoint = tmp_path / "embeddings.jsonl"
+        checkpoint.write_text(
+            json.dumps({"key": "k0", "model": "m", "embedding": [42.0]}) + "\n"
+            + json.dumps({"key": "k1", "model": "other", "embedding": [0.0]}) + "\n"
+            + '{"key": "k2", "mod'  # truncated line from an interrupted run
+        )
+        client, _ = _make_client()
+        pipeline = EmbeddingPipeline(client, "m", batch_size=10, checkpoint_path=str(checkpoint))
+
+        results = await pipeline.run(_items(3))
+
+        assert results["k0"] == [42.0]
+        sent = client.embeddings.create.call_args.kwargs["input"]
+        assert sent == ["xx", "xxx"]
+        assert len(EmbeddingPipeline(client, "m", checkpoint_path=str(checkpoint)).load_checkpoint()) == 3
+
+
+class TestBulkUpdateEmbeddings:
+
+    @pytest.mark.asyncio
+    async def test_single_update_from_values_per_chunk(self):
+        db = MagicMock()
+        db.execute = AsyncMock(return_value=MagicMock(rowcount=2))
+        repo = WineRepository(db)
+        embeddings = {uuid.uuid4(): [0.1, 0.2], uuid.uuid4(): [0.3, 0.4]}
+
+        updated = await repo.bulk_update_embeddings(embeddings)
+
+        assert updated == 2
+        db.execute.assert_awaited_once()
+        sql = str(db.execute.call_args.args[0].compile(dialect=postgresql.dialect()))
+        assert sql.startswith("UPDATE wines SET embedding=CAST(v.embedding AS VECTOR(1024))")
+        assert "FROM (VALUES" in sql
+
+    @pytest.mark.asyncio
+    async def test_chunks_large_updates(self):
+        db = MagicMock()
+        db.execute = AsyncMock(return_value=MagicMock(rowcount=2))
+        repo = WineRepository(db)
+
+        await repo.bulk_update_embeddings(
+            {uuid.uuid4(): [0.0] for _ in range(5)}, chunk_size=2,
+        )
+
+        assert db.execute.await_count == 3
+
+
+def test_create_embedding_text():
+    text = create_embedding_text({
+        "name": "Malbec", "producer": "Catena", "wine_type": "red",
+        "country": "Аргентина", "region": "Мендоса", "grape_varieties": ["мальбек"],
+        "sweetness": "dry", "body": 4, "description": "Сочное",
+        "food_pairings": ["стейк"],
+    })
+
+    assert text.startswith("Malbec by Catena Type: red")
+    assert text.endswith("Pairs with: стейк")
+
+
+def _catalog_row(description: str = "Сочное", **overrides) -> SimpleNamespace:
+    fields = dict(
+        id=uuid.uuid4(), name="Malbec", producer="Catena", wine_type=WineType.RED,
+        country="Аргентина", region="Мендоса", grape_varieties=["мальбек"],
+        sweetness=Sweetness.DRY, body=4, description=description,
+        tasting_notes=None, food_pairings=["стейк"],
+        embedding_content_hash=None, embedding_model=None, embedding_missing=True,
+    )
+    fields.update(overrides)
+    return SimpleNamespace(**fields)
+
+
+def _embedded(row: SimpleNamespace, model: str = "m") -> SimpleNamespace:
+    """Mark a row as embedded from its current text."""
+    row.embedding_content_hash = content_hash(create_embedding_text(wine_to_embedding_dict(row)))
+    row.embedding_model = model
+    row.embedding_missing = False
+    return row
+
+
+def _catalog_db(rows: list) -> MagicMock:
+    db = MagicMock()
+    load_result = MagicMock()
+    load_result.all.return_value = rows
+    update_result = MagicMock(rowcount=1)
+    db.execute = AsyncMock(side_effect=[load_result] + [update_result] * 10)
+    db.commit = AsyncMock()
+    return db
+
+
+@pytest.mark.asyncio
+class TestIncrementalReembedding:
+
+    async def test_status_counts_stale_rows(self):
+        rows = [
+            _embedded(_catalog_row()),
+            _embedded(_catalog_row(), model="old-model"),
+            _embedded(_catalog_row(description="Старое описание")),
+            _catalog_row(),
+            _catalog_row(embedding_missing=False),
+        ]
+        rows[2].description = "Новое описание"
+
+        status = await embedding_status(_catalog_db(rows), "m")
+
+        assert status == {
+            "total": 5, "up_to_date": 1, "missing": 1, "unknown": 1,
+            "model_changed": 1, "content_changed": 1,
+        }
+
+    async def test_incremental_embeds_only_changed_rows(self):
+        fresh = _embedded(_catalog_row(description="A"))
+        edited = _embedded(_catalog_row(description="B"))
+        edited.description = "B, edited"
+        db = _catalog_db([fresh, edited])
+        client, _ = _make_client()
+        pipeline = EmbeddingPipeline(client, "m")
+
+        await embed_catalog(db, pipeline, incremental=True)
+
+        sent = client.embeddings.create.call_args.kwargs["input"]
+        assert len(sent) == 1 and "B, edited" in sent[0]
+        update_sql = str(db.execute.call_args_list[1].args[0].compile(dialect=postgresql.dialect()))
+        assert "embedding_content_hash=v.content_hash" in update_sql
+        assert "embedding_model=" in update_sql
+
+    async def test_identical_texts_embedded_once(self):
+        id_a, id_b = uuid.uuid4(), uuid.uuid4()
+        db = _catalog_db([_catalog_row(id=id_a), _catalog_row(id=id_b)])
+        client, state = _make_client()
+        repo_update = AsyncMock(return_value=2)
+
+        with pytest.MonkeyPatch.context() as mp:
+            mp.setattr(WineRepository, "bulk_update_embeddings", repo_update)
+            await embed_catalog(db, EmbeddingPipeline(client, "m"))
+
+        assert len(client.embeddings.create.call_args.kwargs["input"]) == 1
+        embeddings = repo_update.call_args.args[0]
+        assert set(embeddings) == {id_a, id_b}
+
+    async def test_adopt_existing_stamps_instead_of_reembedding(self):
+        db = _catalog_db([_catalog_row(embedding_missing=False)])
+        client, _ = _make_client()
+
+        await embed_catalog(db, EmbeddingPipeline(client, "m"), incremental=True, adopt_existing=True)
+
+        client.embeddings.create.assert_not_called()
+        stamp_sql = str(db.execute.call_args_list[1].args[0].compile(dialect=postgresql.dialect()))
+        assert "SET embedding_content_hash=v.content_hash" in stamp_sql
+        assert "VECTOR" not in stamp_sql
@@ -0,0 +1,156 @@
+"""Unit tests for write-behind Telegram history persistence."""
+
+import uuid
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock
+
+import pytest
+import pytest_asyncio
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.bot.history_writer import HistoryWriter
+from app.models.conversation import Conversation
+from app.models.telegram_user import TelegramUser
+from app.repositories.message import MessageRepository
+from app.services.telegram_bot import TelegramBotService
+
+
+@pytest_asyncio.fixture
+async def conversation(db_session: AsyncSession) -> Conversation:
+    """Create a Telegram conversation."""
+    user = TelegramUser(telegram_id=42, first_name="Test", is_age_verified=True)
+    db_session.add(user)
+    await db_session.flush()
+    conversation = Conversation(telegram_user_id=user.id, channel="telegram")
+    db_session.add(conversation)
+    await db_session.commit()
+    return conversation
+
+
+@pytest.fixture
+def session_factory(db_session: AsyncSession) -> async_sessionmaker:
+    return async_sessionmaker(db_session.bind, expire_on_commit=False)
+
+
+@pytest.mark.asyncio
+class TestHistoryWriter:
+
+    async def test_flush_saves_turns_in_order(
+        self, session_factory, conversation: Conversation, db_session: AsyncSession
+    ):
+        writer = HistoryWriter(session_factory)
+        writer.enqueue(conversation.id, "Что к сыру?", "Портвейн.")
+        writer.enqueue(conversation.id, "А дешевле?", "Херес.")
+
+        await writer.flush()
+
+        history = await MessageRepository(db_session).get_history(conversation.id)
+        assert [m.content for m in history] == [
+            "Что к сыру?", "Портвейн.", "А дешевле?", "Херес.",
+        ]
+        assert writer.pending == 0
+
+    async def test_flush_moves_conversation_timestamp_forward(
+        self, session_factory, conversation: Conversation, db_session: AsyncSession
+    ):
+        writer = HistoryWriter(session_factory)
+        turn = writer.enqueue(
+            conversation.id, "Привет", "Здравствуйте",
+            user_sent_at=datetime.now(timezone.utc) + timedelta(hours=1),
+        )
+
+        await writer.flush()
+
+        await db_session.refresh(conversation)
+        assert conversation.updated_at.replace(tzinfo=None) == turn.replied_at.replace(
+            tzinfo=None
+        )
+
+    async def test_journal_is_replayed_once(
+        self, session_factory, conversation: Conversation, db_session: AsyncSession,
+        tmp_path,
+    ):
+        journal = tmp_path / "journal.jsonl"
+        crashed = HistoryWriter(session_factory, journal_path=str(journal))
+        crashed.start()
+        crashed.enqueue(conversation.id, "Розовое?", "Прованс.")
+        # Saved, but the process died before the journal was compacted
+        await crashed._save(crashed._pending)
+        crashed._task.cancel()
+
+        restarted = HistoryWriter(session_factory, journal_path=str(journal))
+        restarted.start()
+        assert restarted.pending == 1
+        await restarted.close()
+
+        history = await MessageRepository(db_session).get_history(conversation.id)
+        assert len(history) == 2
+        assert journal.read_text() == ""
+
+    async def test_turns_survive_database_outage(
+        self, session_factory, conversation: Conversation, db_session: AsyncSession,
+        tmp_path,
+    ):
+        journal = tmp_path / "journal.jsonl"
+        database_up = False
+
+        def flaky_factory():
+            if not database_up:
+                raise ConnectionError("database is restarting")
+            return session_factory()
+
+        writer = HistoryWriter(flaky_factory, journal_path=str(journal))
+        writer.start()
+        writer.enqueue(conversation.id, "Игристое?", "Кава.")
+
+        for _ in range(3):
+            assert await writer.flush() is False
+        assert writer.pending == 1
+        assert len(journal.read_text().splitlines()) == 1
+
+        database_up = True
+        assert await writer.flush() is True
+        await writer.close()
+
+        history = await MessageRepository(db_session).get_history(conversation.id)
+        assert len(history) == 2
+        assert journal.read_text() == ""
+
+    async def test_only_rejected_turn_is_dropped(
+        self, session_factory, conversation: Conversation, db_session: AsyncSession,
+        monkeypatch,
+    ):
+        deleted_conversation = uuid.uuid4()
+        writer = HistoryWriter(session_factory)
+        save = writer._save
+
+        async def save_rejecting_deleted(turns):
+            if any(t.conversation_id == deleted_conversation for t in turns):
+                raise IntegrityError("INSERT", {}, Exception("foreign key violation"))
+            await save(turns)
+
+        monkeypatch.setattr(writer, "_save", save_rejecting_deleted)
+        writer.enqueue(conversation.id, "Что к пасте?", "Кьянти.")
+        writer.enqueue(deleted_conversation, "Что к рыбе?", "Шабли.")
+
+        assert await writer.flush() is True
+
+        history = await MessageRepository(db_session).get_history(conversation.id)
+        assert [m.content for m in history] == ["Что к пасте?", "Кьянти."]
+        assert writer.pending == 0
+
+    async def test_next_message_sees_unsaved_turn(
+        self, session_factory, conversation: Conversation, db_session: AsyncSession
+    ):
+        writer = HistoryWriter(session_factory)
+        writer.enqueue(conversation.id, "Что к утке?", "Пино нуар.")
+        service = TelegramBotService(db_session, history_writer=writer)
+        service.sommelier = MagicMock()
+
+        history = await service.get_conversation_history(conversation.id)
+
+        assert history == [
+            {"role": "user", "content": "Что к утке?"},
+            {"role": "assistant", "content": "Пино нуар."},
+        ]
@@ -0,0 +1,70 @@
+"""Unit tests for the shared LLM HTTP client registry (app/core/http_clients.py)."""
+
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.core import http_clients
+from app.services.embedding import EmbeddingService
+from app.services.llm import OpenAIService, OpenRouterService
+
+
+@pytest.fixture(autouse=True)
+def _fresh_registry():
+    http_clients.reset_http_clients()
+    yield
+    http_clients.reset_http_clients()
+
+
+class TestClientRegistry:
+
+    def test_openai_clients_are_cached_per_credentials(self):
+        first = http_clients.get_openai_client("key-a", "https://openrouter.ai/api/v1")
+        second = http_clients.get_openai_client("key-a", "https://openrouter.ai/api/v1")
+        other = http_clients.get_openai_client("key-b", "https://openrouter.ai/api/v1")
+
+        assert first is second
+        assert other is not first
+
+    def test_all_clients_share_one_connection_pool(self):
+        pool = http_clients.get_http_client()
+
+        with patch("app.services.llm.get_settings") as mock_settings:
+            mock_settings.return_value.langfuse_tracing_enabled = False
+            openrouter = OpenRouterService(api_key="key-a").client
+        openai_direct = OpenAIService(api_key="key-b").client
+
+        assert openrouter._client is pool
+        assert openai_direct._client is pool
+
+    def test_pool_limits_from_settings(self):
+        pool = http_clients.get_http_client()
+
+        transport_pool = pool._transport._pool
+        assert transport_pool._max_connections == 100
+        assert transport_pool._max_keepalive_connections == 20
+
+    @pytest.mark.asyncio
+    async def test_close_releases_pool_and_clients(self):
+        pool = http_clients.get_http_client()
+        client = http_clients.get_openai_client("key-a")
+
+        await http_clients.close_http_clients()
+
+        assert pool.is_closed
+        assert http_clients.get_openai_client("key-a") is not client
+        assert http_clients.get_http_client() is not pool
+
+    @pytest.mark.asyncio
+    async def test_embedding_service_reuses_client(self, monkeypatch):
+        monkeypatch.setenv("OPENAI_API_KEY", "key-e")
+        client = http_clients.get_openai_client("key-e")
+        embedding = MagicMock()
+        embedding.data = [MagicMock(embedding=[0.1])]
+        client.embeddings.create = AsyncMock(return_value=embedding)
+
+        service = EmbeddingService()
+        await service.generate_embedding("a")
+        await service.generate_embedding("b")
+
+        assert client.embeddings.create.await_count == 2
@@ -0,0 +1,303 @@
+"""Unit tests for the background job runner."""
+
+import asyncio
+import uuid
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, patch
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.models.background_job import BackgroundJob
+from app.models.conversation import Conversation
+from app.models.conversation_insights import ConversationInsights
+from app.models.user import User
+from app.repositories.background_job import BackgroundJobRepository
+from app.services.chat import ChatService
+from app.services.jobs import JOB_SESSION_TITLE, JobRunner, reset_job_runner
+from app.services.llm import LLMError
+from app.services.session_context import SessionInsights, run_session_insights_job
+from app.services.session_naming import run_session_title_job
+
+
+@pytest.fixture(autouse=True)
+def fresh_runner():
+    reset_job_runner()
+    yield
+    reset_job_runner()
+
+
+@pytest.fixture
+def session_factory(db_session: AsyncSession) -> async_sessionmaker:
+    return async_sessionmaker(db_session.bind, expire_on_commit=False)
+
+
+@pytest_asyncio.fixture
+async def conversation(db_session: AsyncSession) -> Conversation:
+    user = User(
+        id=uuid.uuid4(),
+        email="jobs@example.com",
+        password_hash="hashed",
+        is_age_verified=True,
+    )
+    db_session.add(user)
+    await db_session.flush()
+    conversation = Conversation(user_id=user.id)
+    db_session.add(conversation)
+    await db_session.commit()
+    return conversation
+
+
+async def _enqueue(db: AsyncSession, kind: str = "test", max_attempts: int = 3) -> BackgroundJob:
+    job = await BackgroundJobRepository(db).enqueue(kind, {"n": 1}, max_attempts=max_attempts)
+    await db.commit()
+    return job
+
+
+async def _reload(db: AsyncSession, job: BackgroundJob) -> BackgroundJob:
+    job_id = job.id
+    db.expire_all()
+    return (await db.execute(select(BackgroundJob).where(BackgroundJob.id == job_id))).scalar_one()
+
+
+@pytest.mark.asyncio
+class TestJobRunner:
+
+    async def test_runs_due_job_once(self, session_factory, db_session: AsyncSession):
+        handler = AsyncMock()
+        runner = JobRunner(session_factory)
+        runner.register("test", handler)
+        job = await _enqueue(db_session)
+
+        assert await runner.run_once() is True
+        assert await runner.run_once() is False
+
+        handler.assert_awaited_once()
+        assert handler.await_args.args[1] == {"n": 1}
+        assert (await _reload(db_session, job)).status == "done"
+
+    async def test_failed_job_is_retried_later(
+        self, session_factory, db_session: AsyncSession
+    ):
+        runner = JobRunner(session_factory)
+        runner.register("test", AsyncMock(side_effect=RuntimeError("LLM timeout")))
+        job = await _enqueue(db_session)
+
+        await runner.run_once()
+
+        job = await _reload(db_session, job)
+        assert job.status == "pending"
+        assert job.attempts == 1
+        assert "LLM timeout" in job.last_error
+        # Backoff: not due yet
+        assert await runner.run_once() is False
+
+    async def test_job_fails_after_max_attempts(
+        self, session_factory, db_session: AsyncSession
+    ):
+        runner = JobRunner(session_factory)
+        job = await _enqueue(db_session, kind="unknown", max_attempts=1)
+
+        await runner.run_once()
+
+        job = await _reload(db_session, job)
+        assert job.status == "failed"
+        assert "No handler" in job.last_error
+
+    async def test_start_requeues_stale_running_jobs(
+        self, session_factory, db_session: AsyncSession
+    ):
+        job = await _enqueue(db_session)
+        await db_session.execute(
+            update(BackgroundJob)
+            .where(BackgroundJob.id == job.id)
+            .execution_options(synchronize_session=False)
+            .values(
+                status="running",
+                updated_at=datetime.now(timezone.utc) - timedelta(hours=1),
+            )
+        )
+        await db_session.commit()
+        handler = AsyncMock()
+        runner = JobRunner(session_factory, workers=0)
+        runner.register("test", handler)
+
+        await runner.start()
+        await runner.run_once()
+        await runner.close()
+
+        handler.assert_awaited_once()
+
+    async def test_stale_job_out_of_attempts_is_failed(
+        self, session_factory, db_session: AsyncSession
+    ):
+        job = await _enqueue(db_session, max_attempts=1)
+        await db_session.execute(
+            update(BackgroundJob)
+            .where(BackgroundJob.id == job.id)
+            .execution_options(synchronize_session=False)
+            .values(
+                status="running",
+                attempts=1,
+                updated_at=datetime.now(timezone.utc) - timedelta(hours=1),
+            )
+        )
+        await db_session.commit()
+
+        await JobRunner(session_factory).requeue_stale()
+
+        job = await _reload(db_session, job)
+        assert job.status == "failed"
+        assert "Abandoned" in job.last_error
+
+    async def test_worker_sweeps_stale_jobs_periodically(
+        self, session_factory, db_session: AsyncSession
+    ):
+        # Running when the worker starts, e.g. its complete() write is failing
+        job = await _enqueue(db_session)
+        running = (
+            update(BackgroundJob)
+            .where(BackgroundJob.id == job.id)
+            .execution_options(synchronize_session=False)
+        )
+        await db_session.execute(running.values(status="running", attempts=1))
+        await db_session.commit()
+        handler = AsyncMock()
+        runner = JobRunner(session_factory, workers=1, poll_interval=0.01)
+        runner.register("test", handler)
+        await runner.start()
+
+        # No heartbeat since
+        await db_session.execute(running.values(
+            updated_at=datetime.now(timezone.utc) - timedelta(hours=1),
+        ))
+        await db_session.commit()
+
+        runner._next_sweep = 0.0
+        runner.notify()
+        for _ in range(100):
+            if handler.await_count:
+                break
+            await asyncio.sleep(0.01)
+        await runner.close()
+
+        handler.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+class TestSessionTitleJob:
+
+    async def test_chat_service_enqueues_instead_of_calling_llm(
+        self, db_session: AsyncSession, conversation: Conversation
+    ):
+        service = ChatService(db_session)
+
+        with patch(
+            "app.services.session_naming.SessionNamingService.generate_session_title",
+        ) as generate:
+            await service._maybe_generate_session_title(
+                conversation, "Вино к стейку?", "Мальбек.",
+            )
+
+        generate.assert_not_called()
+        jobs = (await db_session.execute(select(BackgroundJob))).scalars().all()
+        assert [job.kind for job in jobs] == [JOB_SESSION_TITLE]
+        assert jobs[0].payload["conversation_id"] == str(conversation.id)
+
+    async def test_job_sets_title(
+        self, db_session: AsyncSession, conversation: Conversation
+    ):
+        with (
+            patch(
+                "app.services.session_naming.SessionNamingService.is_llm_configured",
+                return_value=True,
+            ),
+            patch(
+                "app.services.session_naming.SessionNamingService.generate_session_title",
+                new_callable=AsyncMock,
+                return_value="Вино к стейку",
+            ),
+        ):
+            await run_session_title_job(db_session, {
+                "conversation_id": str(conversation.id),
+                "user_message": "Вино к стейку?",
+                "ai_response": "Мальбек.",
+            })
+
+        assert conversation.title == "Вино к стейку"
+
+    async def test_llm_error_retries_job_instead_of_date_title(
+        self, session_factory, db_session: AsyncSession, conversation: Conversation
+    ):
+        runner = JobRunner(session_factory)
+        runner.register(JOB_SESSION_TITLE, run_session_title_job)
+        job = await BackgroundJobRepository(db_session).enqueue(JOB_SESSION_TITLE, {
+            "conversation_id": str(conversation.id),
+            "user_message": "Вино к стейку?",
+            "ai_response": "Мальбек.",
+        }, max_attempts=3)
+        await db_session.commit()
+        llm = AsyncMock()
+        llm.is_available = True
+        llm.generate.side_effect = LLMError("Request timed out")
+
+        with (
+            patch(
+                "app.services.session_naming.SessionNamingService.is_llm_configured",
+                return_value=True,
+            ),
+            patch("app.services.session_naming.get_llm_service", return_value=llm),
+            patch("app.services.session_naming._naming_service", None),
+        ):
+            await runner.run_once()
+
+        job = await _reload(db_session, job)
+        assert job.status == "pending"
+        assert "timed out" in job.last_error
+        assert job.run_after.replace(tzinfo=timezone.utc) > datetime.now(timezone.utc)
+        await db_session.refresh(conversation)
+        assert conversation.title is None
+
+    async def test_last_attempt_falls_back_to_date_title(
+        self, db_session: AsyncSession, conversation: Conversation
+    ):
+        llm = AsyncMock()
+        llm.is_available = True
+        llm.generate.side_effect = LLMError("Request timed out")
+
+        with (
+            patch(
+                "app.services.session_naming.SessionNamingService.is_llm_configured",
+                return_value=True,
+            ),
+            patch("app.services.session_naming.get_llm_service", return_value=llm),
+            patch("app.services.session_naming._naming_service", None),
+        ):
+            await run_session_title_job(db_session, {
+                "conversation_id": str(conversation.id),
+                "user_message": "Вино к стейку?",
+                "ai_response": "Мальбек.",
+            }, last_attempt=True)
+
+        assert conversation.title
+
+
+@pytest.mark.asyncio
+class TestSessionInsightsJob:
+
+    async def test_job_stores_wine_preferences(
+        self, db_session: AsyncSession, conversation: Conversation
+    ):
+        with patch(
+            "app.services.session_context.SessionContextService.extract_session_insights",
+            new_callable=AsyncMock,
+            return_value=SessionInsights(liked_wines=["Barolo"], disliked_wines=["Мальбек"]),
+        ):
+            await run_session_insights_job(db_session, {"conversation_id": str(conversation.id)})
+
+        insights = await db_session.get(ConversationInsights, conversation.id)
+        assert insights.liked_wines == ["Barolo"]
+        assert insights.disliked_wines == ["Мальбек"]
+        assert insights.wine_mentions == []
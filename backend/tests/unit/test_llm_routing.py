@@ -0,0 +1,136 @@
+"""Unit tests for per-task LLM model routing."""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.config import get_settings
+from app.services.llm import (
+    LLMError,
+    LLMService,
+    LLMTask,
+    OpenRouterService,
+    TaskRoute,
+)
+
+
+def _service(**overrides) -> LLMService:
+    service = LLMService()
+    service.settings = get_settings().model_copy(update={
+        "llm_provider": "openrouter",
+        "openrouter_api_key": "test-key",
+        "llm_model": "anthropic/claude-sonnet-4",
+        **overrides,
+    })
+    return service
+
+
+class TestRoute:
+
+    def test_agent_uses_main_model(self):
+        service = _service(llm_naming_model="openai/gpt-4o-mini")
+
+        assert service.route(LLMTask.AGENT) == TaskRoute(
+            provider="openrouter", model="anthropic/claude-sonnet-4",
+        )
+
+    def test_task_settings_override_main_model(self):
+        service = _service(
+            llm_naming_model="openai/gpt-4o-mini",
+            llm_naming_max_tokens=40,
+            llm_naming_timeout_seconds=15.0,
+        )
+
+        assert service.route(LLMTask.NAMING) == TaskRoute(
+            provider="openrouter",
+            model="openai/gpt-4o-mini",
+            max_tokens=40,
+            timeout_seconds=15.0,
+        )
+
+    def test_empty_task_settings_fall_back(self):
+        service = _service(
+            llm_repair_model="", llm_repair_max_tokens=0, llm_repair_timeout_seconds=0,
+        )
+
+        assert service.route(LLMTask.REPAIR) == TaskRoute(
+            provider="openrouter", model="anthropic/claude-sonnet-4",
+        )
+
+    def test_repair_on_provider_without_tool_use_uses_main_model(self):
+        service = _service(
+            anthropic_api_key="test-key",
+            llm_repair_provider="anthropic",
+            llm_repair_model="claude-3-5-haiku-20241022",
+            llm_repair_max_tokens=800,
+        )
+
+        assert service.route(LLMTask.REPAIR) == TaskRoute(
+            provider="openrouter", model="anthropic/claude-sonnet-4", max_tokens=800,
+        )
+
+    def test_non_tool_tasks_keep_their_provider(self):
+        service = _service(
+            llm_naming_provider="anthropic", llm_naming_model="claude-3-5-haiku-20241022",
+        )
+
+        assert service.route(LLMTask.NAMING).provider == "anthropic"
+
+
+@pytest.mark.asyncio
+class TestRoutedCalls:
+
+    async def test_auxiliary_task_gets_own_provider(self):
+        service = _service(llm_insights_model="openai/gpt-4o-mini")
+
+        agent = service._provider_for(service.route(LLMTask.AGENT))
+        insights = service._provider_for(service.route(LLMTask.INSIGHTS))
+
+        assert isinstance(insights, OpenRouterService)
+        assert insights.model == "openai/gpt-4o-mini"
+        assert agent.model == "anthropic/claude-sonnet-4"
+        # Built once and reused
+        assert service._provider_for(service.route(LLMTask.INSIGHTS)) is insights
+
+    async def test_task_provider_without_key_uses_default(self):
+        service = _service(
+            llm_provider="anthropic",
+            anthropic_api_key="test-key",
+            openrouter_api_key="",
+            llm_model="claude-sonnet-4-20250514",
+            llm_naming_provider="openrouter",
+            llm_naming_model="openai/gpt-4o-mini",
+        )
+
+        naming = service._provider_for(service.route(LLMTask.NAMING))
+
+        assert naming is service._provider
+        assert naming.model == "claude-sonnet-4-20250514"
+
+    async def test_task_max_tokens_is_default_not_override(self):
+        service = _service(llm_naming_max_tokens=50)
+        service._initialized = True
+        service._provider = MagicMock()
+        service._provider.generate = AsyncMock(return_value="Вино к стейку")
+
+        await service.generate("system", "user", task=LLMTask.NAMING)
+        await service.generate("system", "user", max_tokens=10, task=LLMTask.NAMING)
+
+        calls = service._provider.generate.await_args_list
+        assert calls[0].kwargs["max_tokens"] == 50
+        assert calls[1].kwargs["max_tokens"] == 10
+        assert "response_format" not in calls[0].kwargs
+
+    async def test_timeout_raises_llm_error(self):
+        service = _service(llm_naming_timeout_seconds=0.01)
+        service._initialized = True
+
+        async def slow(**kwargs):
+            await asyncio.sleep(1)
+
+        service._provider = MagicMock()
+        service._provider.generate = slow
+
+        with pytest.raises(LLMError, match="timed out"):
+            await service.generate("system", "user", task=LLMTask.NAMING)
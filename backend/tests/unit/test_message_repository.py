@@ -0,0 +1,131 @@
+"""Unit tests for MessageRepository history paging."""
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+import pytest_asyncio
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.conversation import Conversation
+from app.models.message import MessageRole
+from app.models.user import User
+from app.repositories.message import MessageRepository
+
+
+@pytest_asyncio.fixture
+async def conversation(db_session: AsyncSession) -> Conversation:
+    """Create a conversation owned by a test user."""
+    user = User(
+        id=uuid.uuid4(),
+        email="history@example.com",
+        password_hash="hashed",
+        is_age_verified=True,
+    )
+    db_session.add(user)
+    await db_session.flush()
+    conversation = Conversation(user_id=user.id)
+    db_session.add(conversation)
+    await db_session.flush()
+    return conversation
+
+
+@pytest_asyncio.fixture
+async def repo(db_session: AsyncSession) -> MessageRepository:
+    """Create repository instance."""
+    return MessageRepository(db_session)
+
+
+@pytest.mark.asyncio
+class TestGetHistoryPage:
+    """Tests for get_history_page()."""
+
+    async def test_turn_saved_together_keeps_order(
+        self, repo: MessageRepository, conversation: Conversation
+    ):
+        """Question and reply written back to back stay in order."""
+        await repo.create(conversation.id, MessageRole.USER, "Что к рыбе?")
+        await repo.create(conversation.id, MessageRole.ASSISTANT, "Шабли.")
+
+        messages = await repo.get_history(conversation.id)
+
+        assert [m.role for m in messages] == [MessageRole.USER, MessageRole.ASSISTANT]
+
+    async def test_pages_walk_back_without_gaps(
+        self, repo: MessageRepository, conversation: Conversation
+    ):
+        """Cursor pages cover every message once, newest page first."""
+        for i in range(5):
+            await repo.create(conversation.id, MessageRole.USER, f"m{i}")
+
+        pages = []
+        before = None
+        while True:
+            messages, has_more = await repo.get_history_page(
+                conversation.id, limit=2, before=before,
+            )
+            pages.append([m.content for m in messages])
+            if not has_more:
+                break
+            before = (messages[0].created_at, messages[0].id)
+
+        assert pages == [["m3", "m4"], ["m1", "m2"], ["m0"]]
+
+    async def test_equal_timestamps_are_split_by_id(
+        self,
+        repo: MessageRepository,
+        conversation: Conversation,
+        db_session: AsyncSession,
+    ):
+        """Rows sharing created_at are neither skipped nor repeated."""
+        created_at = datetime.now(timezone.utc) - timedelta(minutes=1)
+        for i in range(3):
+            message = await repo.create(conversation.id, MessageRole.USER, f"m{i}")
+            message.created_at = created_at
+        await db_session.flush()
+
+        first, has_more = await repo.get_history_page(conversation.id, limit=2)
+        rest, _ = await repo.get_history_page(
+            conversation.id, limit=2, before=(first[0].created_at, first[0].id),
+        )
+
+        assert has_more is True
+        assert {m.content for m in first + rest} == {"m0", "m1", "m2"}
+        assert len(first + rest) == 3
+
+
+@pytest.mark.asyncio
+class TestAppendTurn:
+    """Tests for append_turn()."""
+
+    async def test_saves_both_messages_in_order(
+        self, repo: MessageRepository, conversation: Conversation
+    ):
+        """Question and reply are returned and read back in order."""
+        sent_at = datetime.now(timezone.utc) - timedelta(seconds=5)
+
+        user_message, reply = await repo.append_turn(
+            conversation.id, "Что к утке?", "Пино нуар.", user_sent_at=sent_at,
+        )
+
+        assert user_message.role == MessageRole.USER
+        assert reply.role == MessageRole.ASSISTANT
+        assert reply.is_welcome is False
+        history = await repo.get_history(conversation.id)
+        assert [m.id for m in history] == [user_message.id, reply.id]
+
+    async def test_bumps_conversation_updated_at(
+        self,
+        repo: MessageRepository,
+        conversation: Conversation,
+        db_session: AsyncSession,
+    ):
+        """The conversation is touched with the reply's timestamp."""
+        conversation.updated_at = datetime.now(timezone.utc) - timedelta(hours=1)
+        await db_session.flush()
+
+        _, reply = await repo.append_turn(conversation.id, "Привет", "Здравствуйте")
+
+        # SQLite returns naive timestamps
+        assert conversation.updated_at.replace(tzinfo=None) == reply.created_at.replace(
+            tzinfo=None
+        )
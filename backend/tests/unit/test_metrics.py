@@ -0,0 +1,211 @@
+"""Unit tests for latency metrics and request spans (app/core/metrics.py)."""
+
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.core.metrics import (
+    Counter,
+    Histogram,
+    MetricsRegistry,
+    collect_spans,
+    current_spans,
+    observe_llm_call,
+    summarize_spans,
+    timed,
+)
+
+
+class TestHistogram:
+
+    def test_cumulative_buckets_sum_and_count(self):
+        registry = MetricsRegistry()
+        hist = registry.histogram("test_seconds", "Test", ("stage",), buckets=(0.1, 1.0))
+
+        hist.observe(0.05, stage="a")
+        hist.observe(0.5, stage="a")
+        hist.observe(5.0, stage="a")
+
+        text = registry.render()
+        assert "# TYPE test_seconds histogram" in text
+        assert 'test_seconds_bucket{stage="a",le="0.1"} 1' in text
+        assert 'test_seconds_bucket{stage="a",le="1"} 2' in text
+        assert 'test_seconds_bucket{stage="a",le="+Inf"} 3' in text
+        assert 'test_seconds_sum{stage="a"} 5.55' in text
+        assert 'test_seconds_count{stage="a"} 3' in text
+
+    def test_label_values_escaped(self):
+        hist = Histogram("h", "H", ("stage",), buckets=(1.0,))
+        hist.observe(0.1, stage='a"b')
+
+        assert 'stage="a\\"b"' in hist.collect()[0]
+
+
+class TestCounter:
+
+    def test_increments_per_label(self):
+        counter = Counter("tokens_total", "Tokens", ("type",))
+        counter.inc(10, type="prompt")
+        counter.inc(5, type="prompt")
+        counter.inc(3, type="completion")
+
+        lines = counter.collect()
+        assert 'tokens_total{type="completion"} 3' in lines
+        assert 'tokens_total{type="prompt"} 15' in lines
+
+
+class TestSpans:
+
+    def test_timed_records_span_inside_request(self):
+        with collect_spans() as spans:
+            with timed("history_load") as span:
+                span["rows"] = 3
+
+        assert len(spans) == 1
+        assert spans[0]["stage"] == "history_load"
+        assert spans[0]["rows"] == 3
+        assert spans[0]["ms"] >= 0
+
+    def test_timed_outside_request_is_noop(self):
+        with timed("history_load"):
+            pass
+
+        assert current_spans() == []
+
+    def test_timed_records_on_exception(self):
+        with collect_spans() as spans:
+            with pytest.raises(RuntimeError):
+                with timed("persist"):
+                    raise RuntimeError("boom")
+
+        assert [s["stage"] for s in spans] == ["persist"]
+
+    @pytest.mark.asyncio
+    async def test_spans_from_concurrent_tasks_collected(self):
+        async def tool(name):
+            with timed(name):
+                await asyncio.sleep(0)
+
+        with collect_spans() as spans:
+            await asyncio.gather(tool("tool.a"), tool("tool.b"))
+
+        assert sorted(s["stage"] for s in spans) == ["tool.a", "tool.b"]
+
+    def test_observe_llm_call_span(self):
+        with collect_spans() as spans:
+            observe_llm_call(
+                1.5, ttfb_seconds=0.25, streaming=True,
+                prompt_tokens=100, completion_tokens=20,
+            )
+
+        assert spans == [{
+            "stage": "llm_call",
+            "ms": 1500.0,
+            "streaming": True,
+            "ttfb_ms": 250.0,
+            "prompt_tokens": 100,
+            "completion_tokens": 20,
+        }]
+
+    def test_summarize_spans_totals_per_stage(self):
+        spans = [
+            {"stage": "llm_call", "ms": 100.0},
+            {"stage": "llm_call", "ms": 50.5},
+            {"stage": "persist", "ms": 3.0},
+        ]
+
+        assert summarize_spans(spans) == {"llm_call": 150.5, "persist": 3.0}
+
+
+class _FakeStream:
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._chunks)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+@pytest.mark.asyncio
+class TestLLMInstrumentation:
+
+    @pytest.fixture
+    def settings(self):
+        with patch("app.services.llm.get_settings") as mock:
+            s = MagicMock()
+            s.llm_temperature = 0.7
+            s.llm_max_tokens = 100
+            s.llm_top_p = 0.8
+            s.llm_top_k = 0
+            s.llm_presence_penalty = 1.0
+            s.langfuse_tracing_enabled = False
+            mock.return_value = s
+            yield s
+
+    async def test_streamed_call_records_ttfb_and_usage(self, settings):
+        from app.services.llm import OpenRouterService
+
+        delta = SimpleNamespace(content="hi", tool_calls=None)
+        service = OpenRouterService(api_key="test")
+        service._client = MagicMock()
+        service._client.chat.completions.create = AsyncMock(return_value=_FakeStream([
+            SimpleNamespace(choices=[SimpleNamespace(delta=delta, finish_reason="stop")]),
+            SimpleNamespace(
+                choices=[],
+                usage=SimpleNamespace(prompt_tokens=12, completion_tokens=3),
+            ),
+        ]))
+
+        with collect_spans() as spans:
+            await service.generate_with_tools(
+                system_prompt="s", user_prompt="u", tools=None, on_delta=AsyncMock(),
+            )
+
+        kwargs = service._client.chat.completions.create.call_args.kwargs
+        assert kwargs["stream_options"] == {"include_usage": True}
+        assert len(spans) == 1
+        assert spans[0]["stage"] == "llm_call"
+        assert "ttfb_ms" in spans[0]
+        assert spans[0]["prompt_tokens"] == 12
+        assert spans[0]["completion_tokens"] == 3
+
+    async def test_non_streamed_call_ignores_mock_usage(self, settings):
+        from app.services.llm import OpenRouterService
+
+        service = OpenRouterService(api_key="test")
+        service._client = MagicMock()
+        service._client.chat.completions.create = AsyncMock(return_value=MagicMock())
+
+        with collect_spans() as spans:
+            await service.generate_with_tools(system_prompt="s", user_prompt="u", tools=None)
+
+        assert spans == [{"stage": "llm_call", "ms": spans[0]["ms"], "streaming": False}]
+
+
+@pytest.mark.asyncio
+class TestMetricsEndpoint:
+
+    async def test_bot_metrics_server_serves_registry(self):
+        from app.core.metrics import start_metrics_server
+
+        server = await start_metrics_server(0, host="127.0.0.1")
+        port = server.sockets[0].getsockname()[1]
+        try:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(b"GET /metrics HTTP/1.1\r\nHost: x\r\n\r\n")
+            await writer.drain()
+            response = (await reader.read()).decode()
+            writer.close()
+        finally:
+            server.close()
+            await server.wait_closed()
+
+        assert response.startswith("HTTP/1.1 200 OK")
+        assert "getmywine_stage_duration_seconds" in response
@@ -0,0 +1,77 @@
+"""Unit tests for the Telegram photo file_id cache."""
+
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.bot.photo_cache import PhotoFileIdCache
+
+
+@pytest.fixture
+def image(tmp_path):
+    path = tmp_path / "wine.png"
+    path.write_bytes(b"png-v1")
+    return path
+
+
+class TestPhotoFileIdCache:
+
+    def test_hit_after_set(self, image):
+        cache = PhotoFileIdCache(bot_id="1")
+        assert cache.get(image, 460) is None
+
+        cache.set(image, 460, "file-1")
+
+        assert cache.get(image, 460) == "file-1"
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_height_change_invalidates(self, image):
+        cache = PhotoFileIdCache(bot_id="1")
+        cache.set(image, 460, "file-1")
+
+        assert cache.get(image, 600) is None
+
+    def test_content_change_invalidates(self, image):
+        cache = PhotoFileIdCache(bot_id="1")
+        cache.set(image, 460, "file-1")
+
+        image.write_bytes(b"png-v2-different-size")
+
+        assert cache.get(image, 460) is None
+
+    def test_missing_file_is_never_cached(self, tmp_path):
+        cache = PhotoFileIdCache(bot_id="1")
+        missing = tmp_path / "missing.png"
+
+        cache.set(missing, 460, "file-1")
+
+        assert cache.get(missing, 460) is None
+
+    def test_persists_per_bot(self, image, tmp_path):
+        path = tmp_path / "cache" / "file_ids.json"
+        PhotoFileIdCache(bot_id="1", path=str(path)).set(image, 460, "file-1")
+
+        assert PhotoFileIdCache(bot_id="1", path=str(path)).get(image, 460) == "file-1"
+        assert len(PhotoFileIdCache(bot_id="2", path=str(path))) == 0
+
+
+@pytest.mark.asyncio
+class TestSendWinePhoto:
+
+    async def test_second_send_reuses_file_id(self, image):
+        from app.bot.sender import send_wine_photo
+
+        cache = PhotoFileIdCache(bot_id="1")
+        update = MagicMock()
+        sent = MagicMock()
+        sent.photo = [MagicMock(file_id="small"), MagicMock(file_id="large")]
+        update.message.reply_photo = AsyncMock(return_value=sent)
+
+        with patch("app.bot.sender.get_photo_cache", return_value=cache), \
+                patch("app.bot.sender.prepare_wine_photo", return_value=MagicMock()) as prepare, \
+                patch("app.bot.sender.InputFile", return_value=MagicMock()):
+            await send_wine_photo(update, image, "caption")
+            await send_wine_photo(update, image, "caption")
+
+        assert prepare.call_count == 1
+        assert update.message.reply_photo.call_args.kwargs["photo"] == "large"
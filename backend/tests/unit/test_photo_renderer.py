@@ -0,0 +1,75 @@
+"""Unit tests for the wine photo render cache."""
+
+import io
+
+import pytest
+from PIL import Image
+
+from app.bot.photo_renderer import TELEGRAM_PHOTO_WIDTH, PhotoReader, PhotoRenderCache
+
+
+@pytest.fixture
+def image(tmp_path):
+    path = tmp_path / "bottle.png"
+    Image.new("RGBA", (100, 400), (120, 0, 40, 255)).save(path)
+    return path
+
+
+@pytest.fixture
+def renderer(tmp_path):
+    cache = PhotoRenderCache(str(tmp_path / "renders"), max_workers=1)
+    yield cache
+    cache.close()
+
+
+@pytest.mark.asyncio
+class TestPhotoRenderCache:
+
+    async def test_renders_wide_canvas_at_target_height(self, renderer, image):
+        data = await renderer.get(image, 200)
+
+        rendered = Image.open(io.BytesIO(data))
+        assert rendered.size == (TELEGRAM_PHOTO_WIDTH, 200)
+
+    async def test_returns_view_of_mapped_file(self, renderer, image):
+        data = await renderer.get(image, 200)
+
+        assert isinstance(data, memoryview)
+        reader = PhotoReader(data)
+        assert reader.read(8) == b"\x89PNG\r\n\x1a\n"
+        assert reader.read() == data[8:]
+        reader.seek(0)
+        assert reader.read() == data
+
+    async def test_variant_is_rendered_once(self, renderer, image):
+        first = await renderer.get(image, 200)
+        second = await renderer.get(image, 200)
+
+        assert first == second
+        assert renderer.renders == 1
+
+    async def test_variants_survive_restart(self, renderer, image, tmp_path):
+        await renderer.get(image, 200)
+
+        restarted = PhotoRenderCache(str(tmp_path / "renders"), max_workers=1)
+        try:
+            await restarted.get(image, 200)
+            assert restarted.renders == 0
+        finally:
+            restarted.close()
+
+    async def test_height_or_content_change_renders_again(self, renderer, image):
+        await renderer.get(image, 200)
+        await renderer.get(image, 300)
+        Image.new("RGBA", (120, 400), (0, 0, 0, 255)).save(image)
+        await renderer.get(image, 300)
+
+        assert renderer.renders == 3
+
+    async def test_warm_skips_rendered_images(self, renderer, image):
+        assert await renderer.warm([image], 200) == 1
+        assert await renderer.warm([image], 200) == 0
+
+    async def test_missing_image_raises(self, renderer, tmp_path):
+        with pytest.raises(FileNotFoundError):
+            await renderer.get(tmp_path / "missing.png", 200)
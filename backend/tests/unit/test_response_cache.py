@@ -0,0 +1,177 @@
+"""Unit tests for the semantic response cache (app/services/response_cache.py)."""
+
+import json
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.services.response_cache import ResponseCache, response_cache_version
+from app.services.session_context import CrossSessionContext, SessionInsights
+from app.services.sommelier import SommelierService
+
+INFORMATIONAL_JSON = json.dumps({
+    "response_type": "informational",
+    "intro": "Танины — это полифенолы из кожицы и косточек винограда.",
+    "wines": [],
+    "closing": "Хотите подобрать вино с мягкими танинами?",
+    "guard_type": None,
+}, ensure_ascii=False)
+
+RECOMMENDATION_JSON = json.dumps({
+    "response_type": "recommendation",
+    "intro": "Вот вино:",
+    "wines": [{"wine_id": "550e8400-e29b-41d4-a716-446655440000", "wine_name": "X", "description": "Y"}],
+    "closing": "",
+    "guard_type": None,
+}, ensure_ascii=False)
+
+
+@pytest.mark.asyncio
+class TestResponseCache:
+
+    async def test_similar_embedding_hits(self):
+        cache = ResponseCache(similarity_threshold=0.95)
+        cache.set([1.0, 0.0, 0.0], "v1", "что такое танины", "answer")
+
+        entry = await cache.get([0.99, 0.05, 0.0], "v1")
+
+        assert entry is not None
+        assert entry.text == "answer"
+        assert cache.stats()["hits"] == 1
+
+    async def test_dissimilar_embedding_misses(self):
+        cache = ResponseCache(similarity_threshold=0.95)
+        cache.set([1.0, 0.0], "v1", "q", "answer")
+
+        assert await cache.get([0.6, 0.8], "v1") is None
+
+    async def test_version_change_drops_entries(self):
+        cache = ResponseCache()
+        cache.set([1.0, 0.0], "v1", "q", "answer")
+
+        assert await cache.get([1.0, 0.0], "v2") is None
+        assert len(cache) == 0
+
+    async def test_prompt_change_changes_version(self):
+        assert response_cache_version("prompt A", "", "m", "e") != response_cache_version("prompt B", "", "m", "e")
+
+    async def test_context_change_changes_version(self):
+        assert response_cache_version("p", "Сегодня: Новый год", "m", "e") != response_cache_version("p", "", "m", "e")
+
+    async def test_expired_entries_not_served(self):
+        cache = ResponseCache(ttl_seconds=60)
+        cache.set([1.0, 0.0], "v1", "q", "answer")
+
+        with patch("app.services.response_cache.time.time", return_value=time.time() + 61):
+            assert await cache.get([1.0, 0.0], "v1") is None
+        assert len(cache) == 0
+
+    async def test_lru_eviction(self):
+        cache = ResponseCache(max_size=2)
+        cache.set([1.0, 0.0, 0.0], "v1", "a", "A")
+        cache.set([0.0, 1.0, 0.0], "v1", "b", "B")
+        await cache.get([1.0, 0.0, 0.0], "v1")  # "b" becomes least recently used
+        cache.set([0.0, 0.0, 1.0], "v1", "c", "C")
+
+        assert await cache.get([0.0, 1.0, 0.0], "v1") is None
+        assert (await cache.get([1.0, 0.0, 0.0], "v1")).text == "A"
+
+
+def _make_service() -> SommelierService:
+    with patch.object(SommelierService, "__init__", lambda self, db: None):
+        service = SommelierService(AsyncMock())
+    service.events_service = MagicMock()
+    service._format_events_for_prompt = MagicMock(return_value="")
+    service.llm_service = MagicMock()
+    service.llm_service.is_available = True
+    service.llm_service.get_query_embedding = AsyncMock(return_value=[1.0, 0.0])
+    return service
+
+
+@pytest.mark.asyncio
+class TestSommelierResponseCache:
+
+    @pytest.fixture
+    def cache(self):
+        cache = ResponseCache()
+        with patch("app.services.sommelier.get_response_cache", return_value=cache):
+            yield cache
+
+    async def test_informational_answer_served_from_cache(self, cache):
+        service = _make_service()
+        service.generate_agentic_response = AsyncMock(return_value=(INFORMATIONAL_JSON, []))
+
+        first = await service.generate_response("Что такое танины?")
+        second = await service.generate_response("что такое танины")
+
+        assert first == second == (INFORMATIONAL_JSON, [])
+        service.generate_agentic_response.assert_awaited_once()
+
+    async def test_recommendations_not_cached(self, cache):
+        service = _make_service()
+        service.generate_agentic_response = AsyncMock(
+            return_value=(RECOMMENDATION_JSON, ["550e8400-e29b-41d4-a716-446655440000"]),
+        )
+
+        await service.generate_response("Посоветуй красное")
+        await service.generate_response("Посоветуй красное")
+
+        assert service.generate_agentic_response.await_count == 2
+        assert len(cache) == 0
+
+    async def test_questions_with_history_bypass_cache(self, cache):
+        service = _make_service()
+        service.generate_agentic_response = AsyncMock(return_value=(INFORMATIONAL_JSON, []))
+        history = [{"role": "user", "content": "Посоветуй вино"}]
+
+        await service.generate_response("А чем он отличается?", conversation_history=history)
+
+        service.llm_service.get_query_embedding.assert_not_called()
+        assert len(cache) == 0
+
+    async def test_cache_hit_is_streamed(self, cache):
+        service = _make_service()
+        service.generate_agentic_response = AsyncMock(return_value=(INFORMATIONAL_JSON, []))
+        await service.generate_response("Что такое танины?")
+        events = []
+
+        async def on_event(event, data):
+            events.append(event)
+
+        await service.generate_response("Что такое танины?", on_event=on_event)
+
+        assert events == ["intro", "closing"]
+
+    async def test_users_with_different_history_are_not_served_each_others_answers(self, cache):
+        service = _make_service()
+        service.generate_agentic_response = AsyncMock(return_value=(INFORMATIONAL_JSON, []))
+        history_a = CrossSessionContext(
+            total_sessions=3,
+            recent_wines=["Шабли"],
+            preferences=SessionInsights(liked_wines=["Шабли"]),
+            last_session_date=None,
+        )
+        history_b = CrossSessionContext(
+            total_sessions=1,
+            recent_wines=["Мальбек"],
+            preferences=SessionInsights(disliked_wines=["Мальбек"]),
+            last_session_date=None,
+        )
+
+        await service.generate_response("Что такое танины?", cross_session_context=history_a)
+        await service.generate_response("Что такое танины?", cross_session_context=history_b)
+
+        assert service.generate_agentic_response.await_count == 2
+        contexts = [c.kwargs["events_context"] for c in service.generate_agentic_response.await_args_list]
+        assert "Шабли" in contexts[0] and "Мальбек" in contexts[1]
+        assert len(cache) == 0
+
+    async def test_users_with_profile_bypass_cache(self, cache):
+        service = _make_service()
+        service.generate_agentic_response = AsyncMock(return_value=(INFORMATIONAL_JSON, []))
+
+        await service.generate_response("Что такое танины?")
+        await service.generate_response("Что такое танины?", user_profile={"budget_max": 1500})
+
+        assert service.generate_agentic_response.await_count == 2
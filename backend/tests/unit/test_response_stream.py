@@ -0,0 +1,226 @@
+"""Unit tests for streamed structured responses (SSE /messages/stream)."""
+
+import json
+import uuid
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.models.message import MessageRole
+from app.routers import chat as chat_router
+from app.services.llm import OpenRouterService
+from app.services.response_stream import StructuredResponseStream
+
+RESPONSE = {
+    "response_type": "recommendation",
+    "intro": "Вот два \"живых\" вина 🍷\nк ужину:",
+    "wines": [
+        {"wine_id": "id-1", "wine_name": "Malbec", "description": "Сочный, {яркий}"},
+        {"wine_id": "id-2", "wine_name": "Merlot", "description": "Мягкий [бархатный]"},
+    ],
+    "closing": "Приятного вечера!",
+    "guard_type": None,
+}
+
+
+def _feed_in_chunks(stream: StructuredResponseStream, text: str, size: int) -> list:
+    events = []
+    for i in range(0, len(text), size):
+        events.extend(stream.feed(text[i:i + size]))
+    return events
+
+
+class TestStructuredResponseStream:
+
+    @pytest.mark.parametrize("size", [1, 3, 16, 10_000])
+    @pytest.mark.parametrize("ensure_ascii", [True, False])
+    def test_sections_reassemble_for_any_chunking(self, size, ensure_ascii):
+        text = json.dumps(RESPONSE, ensure_ascii=ensure_ascii)
+
+        events = _feed_in_chunks(StructuredResponseStream(), text, size)
+
+        intro = "".join(d["delta"] for e, d in events if e == "intro")
+        closing = "".join(d["delta"] for e, d in events if e == "closing")
+        wines = [d for e, d in events if e == "wine"]
+        assert intro == RESPONSE["intro"]
+        assert closing == RESPONSE["closing"]
+        assert [w["wine_name"] for w in wines] == ["Malbec", "Merlot"]
+        assert [w["index"] for w in wines] == [0, 1]
+        assert wines[0]["description"] == "Сочный, {яркий}"
+
+    def test_section_order(self):
+        events = _feed_in_chunks(StructuredResponseStream(), json.dumps(RESPONSE), 5)
+
+        names = [e for e, _ in events]
+        assert names.index("wine") > max(i for i, n in enumerate(names) if n == "intro")
+        assert names.index("closing") > max(i for i, n in enumerate(names) if n == "wine")
+
+    def test_intro_streams_before_string_is_complete(self):
+        stream = StructuredResponseStream()
+
+        events = stream.feed('{"response_type": "informational", "intro": "Риохa — это')
+
+        assert events == [("intro", {"delta": "Риохa — это"})]
+        assert stream.emitted
+
+    def test_no_events_for_tool_call_turn_content(self):
+        stream = StructuredResponseStream()
+
+        assert stream.feed("Let me search the catalog.") == []
+        assert not stream.emitted
+
+    @pytest.mark.asyncio
+    async def test_on_delta_forwards_events(self):
+        on_event = AsyncMock()
+        stream = StructuredResponseStream(on_event)
+
+        await stream.on_delta('{"intro": "Привет"')
+
+        on_event.assert_awaited_once_with("intro", {"delta": "Привет"})
+
+
+def _chunk(content=None, tool_calls=None, finish_reason=None):
+    delta = SimpleNamespace(content=content, tool_calls=tool_calls)
+    return SimpleNamespace(choices=[SimpleNamespace(delta=delta, finish_reason=finish_reason)])
+
+
+def _tool_delta(index, id=None, name=None, arguments=None):
+    return SimpleNamespace(
+        index=index, id=id, function=SimpleNamespace(name=name, arguments=arguments),
+    )
+
+
+class _FakeStream:
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._chunks)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+@pytest.mark.asyncio
+class TestOpenRouterStreaming:
+
+    @pytest.fixture
+    def settings(self):
+        with patch("app.services.llm.get_settings") as mock:
+            s = MagicMock()
+            s.llm_temperature = 0.7
+            s.llm_max_tokens = 2000
+            s.llm_top_p = 0.8
+            s.llm_top_k = 0
+            s.llm_presence_penalty = 1.0
+            s.langfuse_tracing_enabled = False
+            mock.return_value = s
+            yield s
+
+    async def test_content_deltas_forwarded_and_assembled(self, settings):
+        service = OpenRouterService(api_key="test")
+        service._client = MagicMock()
+        service._client.chat.completions.create = AsyncMock(return_value=_FakeStream([
+            _chunk(content='{"intro": '),
+            _chunk(content='"Да"}'),
+            _chunk(finish_reason="stop"),
+        ]))
+        deltas = []
+
+        async def on_delta(chunk):
+            deltas.append(chunk)
+
+        message = await service.generate_with_tools(
+            system_prompt="s", user_prompt="u", tools=None, on_delta=on_delta,
+        )
+
+        assert deltas == ['{"intro": ', '"Да"}']
+        assert message.content == '{"intro": "Да"}'
+        assert message.tool_calls is None
+        assert message.finish_reason == "stop"
+        assert service._client.chat.completions.create.call_args.kwargs["stream"] is True
+
+    async def test_tool_call_deltas_assembled(self, settings):
+        service = OpenRouterService(api_key="test")
+        service._client = MagicMock()
+        service._client.chat.completions.create = AsyncMock(return_value=_FakeStream([
+            _chunk(tool_calls=[_tool_delta(0, id="call_1", name="search_wines", arguments='{"wine_')]),
+            _chunk(tool_calls=[_tool_delta(0, arguments='type": "red"}')]),
+            _chunk(tool_calls=[_tool_delta(1, id="call_2", name="semantic_search", arguments="{}")]),
+            _chunk(finish_reason="tool_calls"),
+        ]))
+
+        message = await service.generate_with_tools(
+            system_prompt="s", user_prompt="u", tools=[{}], on_delta=AsyncMock(),
+        )
+
+        assert message.content is None
+        assert [tc.id for tc in message.tool_calls] == ["call_1", "call_2"]
+        assert message.tool_calls[0].function.name == "search_wines"
+        assert json.loads(message.tool_calls[0].function.arguments) == {"wine_type": "red"}
+        assert message.tool_calls[0].type == "function"
+
+
+def _parse_sse(frames: list[str]) -> list[tuple[str, dict]]:
+    events = []
+    for frame in frames:
+        event_line, data_line = frame.strip().split("\n")
+        events.append((event_line.removeprefix("event: "), json.loads(data_line.removeprefix("data: "))))
+    return events
+
+
+@pytest.mark.asyncio
+class TestMessageStreamEndpoint:
+
+    def _session_maker(self):
+        session = AsyncMock()
+        maker = MagicMock()
+        maker.return_value.__aenter__ = AsyncMock(return_value=session)
+        maker.return_value.__aexit__ = AsyncMock(return_value=False)
+        return maker, session
+
+    async def test_progress_events_then_done(self):
+        now = datetime.now(timezone.utc)
+        user_msg = SimpleNamespace(
+            id=uuid.uuid4(), role=MessageRole.USER, content="Вино к утке",
+            created_at=now, is_welcome=False,
+        )
+        ai_msg = SimpleNamespace(
+            id=uuid.uuid4(), role=MessageRole.ASSISTANT, content="{}",
+            created_at=now, is_welcome=False,
+        )
+
+        async def _send_message(user_id, content, on_event=None):
+            await on_event("tool_call", {"name": "search_wines"})
+            await on_event("intro", {"delta": "Пино нуар"})
+            return user_msg, ai_msg
+
+        maker, session = self._session_maker()
+        with patch.object(chat_router, "async_session_maker", maker), \
+                patch.object(chat_router, "ChatService") as chat_service_cls:
+            chat_service_cls.return_value.send_message = _send_message
+            frames = [f async for f in chat_router._stream_message_events(uuid.uuid4(), "Вино к утке")]
+
+        events = _parse_sse(frames)
+        assert [e for e, _ in events] == ["tool_call", "intro", "done"]
+        assert events[-1][1]["assistant_message"]["id"] == str(ai_msg.id)
+        session.commit.assert_awaited_once()
+
+    async def test_error_event_and_rollback(self):
+        async def _send_message(user_id, content, on_event=None):
+            raise ValueError("Conversation not found")
+
+        maker, session = self._session_maker()
+        with patch.object(chat_router, "async_session_maker", maker), \
+                patch.object(chat_router, "ChatService") as chat_service_cls:
+            chat_service_cls.return_value.send_message = _send_message
+            frames = [f async for f in chat_router._stream_message_events(uuid.uuid4(), "x")]
+
+        assert _parse_sse(frames) == [("error", {"detail": "Conversation not found"})]
+        session.rollback.assert_awaited_once()
+        session.commit.assert_not_awaited()
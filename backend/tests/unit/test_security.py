@@ -1,6 +1,8 @@
 """Unit tests for security module (password hashing, JWT)."""
 from datetime import timedelta
 
+import pytest
+
 # Tests are written FIRST (TDD) - they will fail until implementation
 
 
@@ -27,6 +29,12 @@ class TestPasswordHashing:
 
         assert verify_password(password, hashed) is True
 
+    def test_fake_hash_uses_configured_cost(self):
+        """The unknown-user hash must cost as much as real ones."""
+        from app.core.security import FAKE_HASH, settings
+
+        assert FAKE_HASH.startswith(f"$2b${settings.bcrypt_rounds:02d}$")
+
     def test_verify_password_incorrect(self):
         """Incorrect password should fail verification."""
         from app.core.security import hash_password, verify_password
@@ -48,6 +56,53 @@ class TestPasswordHashing:
         assert hash1 != hash2  # Different salts
 
 
+@pytest.mark.asyncio
+class TestPasswordHashingAsync:
+    """Async variants run bcrypt in the hashing thread pool."""
+
+    async def test_hash_and_verify(self):
+        from app.core.security import hash_password_async, verify_password_async
+
+        hashed = await hash_password_async("SecurePass123")
+
+        assert await verify_password_async("SecurePass123", hashed) is True
+        assert await verify_password_async("WrongPass456", hashed) is False
+
+    async def test_unknown_user_is_rejected(self):
+        from app.core.security import verify_password_and_update_async
+
+        assert await verify_password_and_update_async("SecurePass123", None) == (False, None)
+
+    async def test_current_cost_needs_no_rehash(self):
+        from app.core.security import hash_password, verify_password_and_update_async
+
+        hashed = hash_password("SecurePass123")
+
+        assert await verify_password_and_update_async("SecurePass123", hashed) == (True, None)
+
+    async def test_outdated_cost_is_rehashed(self):
+        from passlib.hash import bcrypt
+
+        from app.core.security import settings, verify_password_and_update_async
+
+        old_hash = bcrypt.using(rounds=4).hash("SecurePass123")
+
+        valid, new_hash = await verify_password_and_update_async("SecurePass123", old_hash)
+
+        assert valid is True
+        assert new_hash is not None
+        assert new_hash.startswith(f"$2b${settings.bcrypt_rounds:02d}$")
+
+    async def test_wrong_password_is_not_rehashed(self):
+        from passlib.hash import bcrypt
+
+        from app.core.security import verify_password_and_update_async
+
+        old_hash = bcrypt.using(rounds=4).hash("SecurePass123")
+
+        assert await verify_password_and_update_async("WrongPass456", old_hash) == (False, None)
+
+
 class TestJWT:
     """Tests for JWT token functionality."""
 
@@ -384,6 +384,28 @@ class TestParseInsightsResponse:
 # ============================================================================
 
 
+def _make_insights(
+    events=(), foods=(), wine_mentions=(), last_activity_at=None, liked=(), disliked=(),
+):
+    row = MagicMock()
+    row.conversation_id = uuid.uuid4()
+    row.events = list(events)
+    row.foods = list(foods)
+    row.wine_mentions = list(wine_mentions)
+    row.liked_wines = list(liked)
+    row.disliked_wines = list(disliked)
+    row.last_activity_at = last_activity_at or datetime.now()
+    return row
+
+
+def _make_message(role: str, content: str, is_welcome: bool = False):
+    msg = MagicMock()
+    msg.role.value = role
+    msg.content = content
+    msg.is_welcome = is_welcome
+    return msg
+
+
 @pytest.mark.asyncio
 class TestBuildCrossSessionContext:
     """T035: Tests for build_cross_session_context()."""
@@ -393,8 +415,7 @@ class TestBuildCrossSessionContext:
         mock_db = MagicMock()
         service = SessionContextService(mock_db)
 
-        # Mock repository to return empty list
-        service.conversation_repo.get_all_by_user_id = AsyncMock(return_value=([], 0))
+        service.insights_repo.get_recent_by_user_id = AsyncMock(return_value=([], 0))
 
         user_id = uuid.uuid4()
         result = await service.build_cross_session_context(user_id)
@@ -404,223 +425,145 @@ class TestBuildCrossSessionContext:
         assert result.preferences.is_empty()
         assert result.last_session_date is None
 
-    async def test_excludes_specified_session(self):
-        """Should exclude the specified session from context."""
-        mock_db = MagicMock()
-        service = SessionContextService(mock_db)
-
-        session_id = uuid.uuid4()
-        exclude_id = uuid.uuid4()
+    async def test_counts_sessions_without_insights(self):
+        """Sessions not yet backfilled still make the user a returning one."""
+        service = SessionContextService(MagicMock())
+        service.insights_repo.get_recent_by_user_id = AsyncMock(return_value=([], 3))
 
-        mock_conv1 = MagicMock()
-        mock_conv1.id = session_id
-        mock_conv1.messages = []
-        mock_conv1.updated_at = datetime.now()
+        result = await service.build_cross_session_context(
+            uuid.uuid4(), exclude_session_id=uuid.uuid4(),
+        )
 
-        mock_conv2 = MagicMock()
-        mock_conv2.id = exclude_id
-        mock_conv2.messages = []
-        mock_conv2.updated_at = datetime.now()
+        assert result.total_sessions == 3
+        assert result.recent_wines == []
 
-        service.conversation_repo.get_all_by_user_id = AsyncMock(
-            return_value=([mock_conv1, mock_conv2], 2)
-        )
+    async def test_only_current_session_is_new_user(self):
+        """The excluded current session alone is not history."""
+        service = SessionContextService(MagicMock())
+        service.insights_repo.get_recent_by_user_id = AsyncMock(return_value=([], 1))
 
-        user_id = uuid.uuid4()
         result = await service.build_cross_session_context(
-            user_id, exclude_session_id=exclude_id
+            uuid.uuid4(), exclude_session_id=uuid.uuid4(),
         )
 
-        # Should only count 1 session (the one not excluded)
-        # Note: total_sessions comes from repo's total count
-        assert result.total_sessions == 2  # total from DB
+        assert result.total_sessions == 0
 
-    async def test_extracts_insights_from_sessions(self):
-        """Should extract and aggregate insights from sessions."""
+    async def test_excludes_specified_session(self):
+        """Should pass the excluded session and limit to the repository."""
         mock_db = MagicMock()
         service = SessionContextService(mock_db)
+        exclude_id = uuid.uuid4()
 
-        # Create mock message with event keyword
-        mock_msg = MagicMock()
-        mock_msg.is_welcome = False
-        mock_msg.role.value = "user"
-        mock_msg.content = "Вино на день рождения"
-
-        mock_conv = MagicMock()
-        mock_conv.id = uuid.uuid4()
-        mock_conv.messages = [mock_msg]
-        mock_conv.updated_at = datetime.now()
-
-        service.conversation_repo.get_all_by_user_id = AsyncMock(
-            return_value=([mock_conv], 1)
+        service.insights_repo.get_recent_by_user_id = AsyncMock(
+            return_value=([_make_insights()], 2)
         )
 
         user_id = uuid.uuid4()
-        result = await service.build_cross_session_context(user_id)
+        result = await service.build_cross_session_context(
+            user_id, exclude_session_id=exclude_id, max_sessions=3,
+        )
 
-        assert result.total_sessions == 1
-        assert "день рождения" in result.preferences.events_discussed
+        service.insights_repo.get_recent_by_user_id.assert_awaited_once_with(
+            user_id, limit=3, exclude_conversation_id=exclude_id,
+        )
+        # total_sessions comes from repo's total count
+        assert result.total_sessions == 2
 
-    async def test_extracts_wine_mentions_from_ai_responses(self):
-        """Should extract wine mentions from AI responses."""
+    async def test_aggregates_precomputed_insights(self):
+        """Should aggregate events, foods and wines from stored rows."""
         mock_db = MagicMock()
         service = SessionContextService(mock_db)
+        newest = datetime(2026, 2, 20, 12, 0)
 
-        # Create mock AI message with wine recommendation
-        mock_msg = MagicMock()
-        mock_msg.is_welcome = False
-        mock_msg.role.value = "assistant"
-        mock_msg.content = "Рекомендую попробовать Barolo - отличное итальянское вино."
+        service.insights_repo.get_recent_by_user_id = AsyncMock(return_value=([
+            _make_insights(["день рождения"], ["стейк"], ["Barolo"], newest),
+            _make_insights(["ужин"], ["сыр"], ["Chianti"], datetime(2026, 2, 1)),
+        ], 2))
 
-        mock_conv = MagicMock()
-        mock_conv.id = uuid.uuid4()
-        mock_conv.messages = [mock_msg]
-        mock_conv.updated_at = datetime.now()
+        result = await service.build_cross_session_context(uuid.uuid4())
 
-        service.conversation_repo.get_all_by_user_id = AsyncMock(
-            return_value=([mock_conv], 1)
-        )
+        assert result.preferences.events_discussed == ["день рождения", "ужин"]
+        assert result.preferences.foods_paired == ["стейк", "сыр"]
+        assert result.recent_wines == ["Barolo", "Chianti"]
+        assert result.last_session_date == newest
 
-        user_id = uuid.uuid4()
-        result = await service.build_cross_session_context(user_id)
-
-        assert "Barolo" in result.recent_wines
-
-    async def test_limits_sessions_analyzed(self):
-        """Should limit number of sessions analyzed."""
-        mock_db = MagicMock()
-        service = SessionContextService(mock_db)
-
-        # Create 10 mock conversations
-        convs = []
-        for i in range(10):
-            mock_conv = MagicMock()
-            mock_conv.id = uuid.uuid4()
-            mock_conv.messages = []
-            mock_conv.updated_at = datetime.now()
-            convs.append(mock_conv)
-
-        service.conversation_repo.get_all_by_user_id = AsyncMock(
-            return_value=(convs, 10)
-        )
+    async def test_surfaces_liked_and_disliked_wines(self):
+        """Wine preferences stored by the LLM insights job reach the prompt."""
+        service = SessionContextService(MagicMock())
+        service.insights_repo.get_recent_by_user_id = AsyncMock(return_value=([
+            _make_insights(liked=["Barolo"], disliked=["Мальбек"]),
+            _make_insights(liked=["Barolo", "Chianti"]),
+        ], 2))
 
-        user_id = uuid.uuid4()
-        result = await service.build_cross_session_context(user_id, max_sessions=3)
+        result = await service.build_cross_session_context(uuid.uuid4())
 
-        # Should have total_sessions from DB but only analyze max_sessions
-        assert result.total_sessions == 10
+        assert result.preferences.liked_wines == ["Barolo", "Chianti"]
+        assert result.preferences.disliked_wines == ["Мальбек"]
+        assert "Не понравились: Мальбек" in result.to_prompt_text()
 
     async def test_deduplicates_insights(self):
         """Should deduplicate insights from multiple sessions."""
         mock_db = MagicMock()
         service = SessionContextService(mock_db)
 
-        # Create two sessions mentioning the same event
-        mock_msg1 = MagicMock()
-        mock_msg1.is_welcome = False
-        mock_msg1.role.value = "user"
-        mock_msg1.content = "Вино на день рождения"
-
-        mock_msg2 = MagicMock()
-        mock_msg2.is_welcome = False
-        mock_msg2.role.value = "user"
-        mock_msg2.content = "Ещё вино на день рождения"
-
-        mock_conv1 = MagicMock()
-        mock_conv1.id = uuid.uuid4()
-        mock_conv1.messages = [mock_msg1]
-        mock_conv1.updated_at = datetime.now()
-
-        mock_conv2 = MagicMock()
-        mock_conv2.id = uuid.uuid4()
-        mock_conv2.messages = [mock_msg2]
-        mock_conv2.updated_at = datetime.now()
-
-        service.conversation_repo.get_all_by_user_id = AsyncMock(
-            return_value=([mock_conv1, mock_conv2], 2)
-        )
+        service.insights_repo.get_recent_by_user_id = AsyncMock(return_value=([
+            _make_insights(["день рождения"]),
+            _make_insights(["день рождения"]),
+        ], 2))
 
-        user_id = uuid.uuid4()
-        result = await service.build_cross_session_context(user_id)
+        result = await service.build_cross_session_context(uuid.uuid4())
 
-        # Should only have one "день рождения" entry
         assert result.preferences.events_discussed.count("день рождения") == 1
 
 
-# ============================================================================
-# Helper Method Tests
-# ============================================================================
-
-
-class TestExtractSimpleInsights:
-    """Tests for _extract_simple_insights() keyword extraction."""
+@pytest.mark.asyncio
+class TestRecordMessages:
+    """Tests for record_messages() incremental insight extraction."""
 
-    def test_extracts_event_keywords(self):
-        """Should extract event keywords from messages."""
+    async def test_extracts_keywords_and_wine_mentions(self):
         service = SessionContextService(MagicMock())
-
-        mock_msg = MagicMock()
-        mock_msg.is_welcome = False
-        mock_msg.role.value = "user"
-        # Use "ужин" which matches exactly (no case declension issues)
-        mock_msg.content = "Вино для романтического ужин"
-
-        mock_conv = MagicMock()
-        mock_conv.messages = [mock_msg]
-
-        result = service._extract_simple_insights(mock_conv)
-
-        assert "ужин" in result.events_discussed
-
-    def test_extracts_food_keywords(self):
-        """Should extract food keywords from user messages."""
+        service.insights_repo.add_messages = AsyncMock()
+        conversation = MagicMock()
+        conversation.user_id = uuid.uuid4()
+
+        await service.record_messages(conversation, [
+            _make_message("user", "Вино на день рождения, будет стейк"),
+            _make_message("assistant", "Рекомендую попробовать Barolo - отличный выбор."),
+        ])
+
+        service.insights_repo.add_messages.assert_awaited_once()
+        kwargs = service.insights_repo.add_messages.call_args.kwargs
+        assert kwargs["events"] == ["день рождения"]
+        assert kwargs["foods"] == ["стейк"]
+        assert "Barolo" in kwargs["wine_mentions"]
+        assert kwargs["message_count"] == 2
+
+    async def test_skips_welcome_only_batches(self):
         service = SessionContextService(MagicMock())
+        service.insights_repo.add_messages = AsyncMock()
+        conversation = MagicMock()
+        conversation.user_id = uuid.uuid4()
 
-        mock_msg = MagicMock()
-        mock_msg.is_welcome = False
-        mock_msg.role.value = "user"
-        mock_msg.content = "Что подойдет к стейку?"
-
-        mock_conv = MagicMock()
-        mock_conv.messages = [mock_msg]
-
-        result = service._extract_simple_insights(mock_conv)
+        await service.record_messages(conversation, [
+            _make_message("assistant", "Привет! Рекомендую начать", is_welcome=True),
+        ])
 
-        assert "стейк" in result.foods_paired
+        service.insights_repo.add_messages.assert_not_called()
 
-    def test_ignores_welcome_messages(self):
-        """Should skip welcome messages."""
+    async def test_skips_sessions_without_web_user(self):
         service = SessionContextService(MagicMock())
+        service.insights_repo.add_messages = AsyncMock()
+        conversation = MagicMock()
+        conversation.user_id = None
 
-        mock_msg = MagicMock()
-        mock_msg.is_welcome = True
-        mock_msg.role.value = "assistant"
-        mock_msg.content = "Добро пожаловать! Хотите вино на праздник?"
-
-        mock_conv = MagicMock()
-        mock_conv.messages = [mock_msg]
+        await service.record_messages(conversation, [_make_message("user", "ужин")])
 
-        result = service._extract_simple_insights(mock_conv)
+        service.insights_repo.add_messages.assert_not_called()
 
-        # Should not extract "праздник" from welcome message
-        assert result.is_empty()
-
-    def test_extracts_multiple_events(self):
-        """Should extract multiple different events."""
-        service = SessionContextService(MagicMock())
 
-        mock_msg = MagicMock()
-        mock_msg.is_welcome = False
-        mock_msg.role.value = "user"
-        mock_msg.content = "Планирую юбилей, потом новый год"
-
-        mock_conv = MagicMock()
-        mock_conv.messages = [mock_msg]
-
-        result = service._extract_simple_insights(mock_conv)
-
-        assert "юбилей" in result.events_discussed
-        assert "Новый год" in result.events_discussed
+# ============================================================================
+# Helper Method Tests
+# ============================================================================
 
 
 class TestExtractWineMentions:
@@ -1,8 +1,15 @@
 """Unit tests for TelegramBotService helper methods.
 
-Tests for _truncate_for_storage with updated limits (021-message-length-limit).
+Tests for _truncate_for_storage with updated limits (021-message-length-limit)
+and for generating a reply separately from saving it.
 """
 
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.repositories.message import MessageRepository
 from app.services.telegram_bot import TelegramBotService
 
 
@@ -51,3 +58,37 @@ class TestTruncateForStorage:
         """Empty string should pass through unchanged."""
         result = TelegramBotService._truncate_for_storage("")
         assert result == ""
+
+
+@pytest.mark.asyncio
+class TestPrepareReply:
+
+    async def test_reply_is_saved_only_by_save_exchange(self, db_session: AsyncSession):
+        service = TelegramBotService(db_session)
+        service.sommelier = MagicMock()
+        service.sommelier.generate_response = AsyncMock(return_value=("Мальбек.", []))
+
+        text, wines, exchange = await service.prepare_reply(
+            telegram_id=7, message_text="Вино к стейку?", first_name="Test",
+        )
+
+        messages = MessageRepository(db_session)
+        assert text == "Мальбек."
+        assert wines == []
+        assert await messages.get_history(exchange.conversation_id) == []
+
+        await service.save_exchange(exchange)
+
+        history = await messages.get_history(exchange.conversation_id)
+        assert [m.content for m in history] == ["Вино к стейку?", "Мальбек."]
+
+    async def test_failed_reply_has_no_exchange(self, db_session: AsyncSession):
+        service = TelegramBotService(db_session)
+        service.sommelier = MagicMock()
+        service.sommelier.generate_response = AsyncMock(side_effect=RuntimeError("LLM down"))
+
+        _, _, exchange = await service.prepare_reply(
+            telegram_id=8, message_text="Вино к рыбе?", first_name="Test",
+        )
+
+        assert exchange is None
@@ -0,0 +1,114 @@
+"""Unit tests for ChatOrderedUpdateProcessor."""
+
+import asyncio
+from unittest.mock import MagicMock
+
+import pytest
+from telegram import Update
+
+from app.bot.update_processor import ChatOrderedUpdateProcessor
+from app.core.metrics import BOT_UPDATES_IN_PROGRESS, BOT_UPDATES_QUEUED
+
+
+def _update(chat_id: int) -> MagicMock:
+    update = MagicMock(spec=Update)
+    update.effective_chat.id = chat_id
+    return update
+
+
+async def _handler(log: list, name: str, release: asyncio.Event) -> None:
+    log.append(f"start {name}")
+    await release.wait()
+    log.append(f"end {name}")
+
+
+@pytest.mark.asyncio
+class TestChatOrderedUpdateProcessor:
+
+    async def test_same_chat_is_processed_in_order(self):
+        processor = ChatOrderedUpdateProcessor(max_workers=4)
+        log: list[str] = []
+        release = asyncio.Event()
+
+        tasks = [
+            asyncio.create_task(
+                processor.process_update(_update(1), _handler(log, name, release))
+            )
+            for name in ("a", "b")
+        ]
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        assert log == ["start a"]
+        assert processor.queued_updates == 1
+
+        release.set()
+        await asyncio.gather(*tasks)
+        assert log == ["start a", "end a", "start b", "end b"]
+
+    async def test_different_chats_run_concurrently(self):
+        processor = ChatOrderedUpdateProcessor(max_workers=4)
+        log: list[str] = []
+        release = asyncio.Event()
+
+        tasks = [
+            asyncio.create_task(
+                processor.process_update(_update(chat_id), _handler(log, str(chat_id), release))
+            )
+            for chat_id in (1, 2)
+        ]
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        assert sorted(log) == ["start 1", "start 2"]
+        assert processor.running_updates == 2
+
+        release.set()
+        await asyncio.gather(*tasks)
+
+    async def test_worker_limit_bounds_concurrency(self):
+        processor = ChatOrderedUpdateProcessor(max_workers=1)
+        log: list[str] = []
+        release = asyncio.Event()
+
+        tasks = [
+            asyncio.create_task(
+                processor.process_update(_update(chat_id), _handler(log, str(chat_id), release))
+            )
+            for chat_id in (1, 2)
+        ]
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        assert log == ["start 1"]
+
+        release.set()
+        await asyncio.gather(*tasks)
+        assert log == ["start 1", "end 1", "start 2", "end 2"]
+
+    async def test_metrics_and_chat_locks_are_released(self):
+        processor = ChatOrderedUpdateProcessor(max_workers=2)
+        queued = BOT_UPDATES_QUEUED.value()
+        in_progress = BOT_UPDATES_IN_PROGRESS.value()
+
+        async def failing():
+            raise RuntimeError("boom")
+
+        with pytest.raises(RuntimeError):
+            await processor.process_update(_update(1), failing())
+
+        assert processor._chats == {}
+        assert BOT_UPDATES_QUEUED.value() == queued
+        assert BOT_UPDATES_IN_PROGRESS.value() == in_progress
+
+    async def test_chatless_update_runs_without_lock(self):
+        processor = ChatOrderedUpdateProcessor(max_workers=1)
+        done = []
+
+        async def handler():
+            done.append(True)
+
+        await processor.process_update(object(), handler())
+
+        assert done == [True]
+
+    async def test_rejects_non_positive_worker_limit(self):
+        with pytest.raises(ValueError):
+            ChatOrderedUpdateProcessor(max_workers=0)
@@ -0,0 +1,182 @@
+"""Unit tests for the in-process wine catalog snapshot (app/services/wine_catalog.py)."""
+
+import uuid
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.models.wine import Sweetness, WineType
+from app.services.wine_catalog import CatalogWine, WineCatalog, WineCatalogSnapshot
+
+_BASE_TIME = datetime(2026, 2, 1, tzinfo=timezone.utc)
+
+
+def _make_wine(index: int, **overrides) -> CatalogWine:
+    """Create a CatalogWine; higher index = created later."""
+    fields = dict(
+        id=uuid.uuid4(),
+        name=f"Wine {index}",
+        producer="Producer",
+        vintage_year=2020,
+        country="Франция",
+        region="Бордо",
+        grape_varieties=["каберне совиньон", "мерло"],
+        wine_type=WineType.RED,
+        sweetness=Sweetness.DRY,
+        acidity=3,
+        tannins=3,
+        body=4,
+        description="Описание",
+        tasting_notes=None,
+        food_pairings=["стейк", "сыр"],
+        price_rub=Decimal("2500.00"),
+        image_url="/static/images/wines/abc.png",
+        created_at=_BASE_TIME + timedelta(minutes=index),
+    )
+    fields.update(overrides)
+    return CatalogWine(**fields)
+
+
+def _snapshot(wines: list[CatalogWine]) -> WineCatalogSnapshot:
+    return WineCatalogSnapshot(wines, version=(_BASE_TIME, len(wines)))
+
+
+class TestSnapshotSearch:
+    """WineCatalogSnapshot.search() mirrors WineRepository.get_list() filters."""
+
+    def test_orders_newest_first(self):
+        snapshot = _snapshot([_make_wine(1), _make_wine(3), _make_wine(2)])
+
+        names = [w.name for w in snapshot.search()]
+
+        assert names == ["Wine 3", "Wine 2", "Wine 1"]
+
+    def test_scalar_filters(self):
+        white = _make_wine(1, wine_type=WineType.WHITE, price_rub=Decimal("1200"))
+        red_cheap = _make_wine(2, price_rub=Decimal("900"))
+        red_expensive = _make_wine(3, price_rub=Decimal("9000"))
+        snapshot = _snapshot([white, red_cheap, red_expensive])
+
+        result = snapshot.search(wine_type=WineType.RED, price_max=2000)
+
+        assert result == [red_cheap]
+
+    def test_grape_variety_is_case_insensitive_partial_match(self):
+        malbec = _make_wine(1, grape_varieties=["мальбек 85%", "мерло"])
+        snapshot = _snapshot([malbec, _make_wine(2)])
+
+        assert snapshot.search(grape_variety="Мальбек") == [malbec]
+
+    def test_food_pairing_and_region_combined(self):
+        fish = _make_wine(1, food_pairings=["рыба", "морепродукты"], region="Бургундия")
+        snapshot = _snapshot([fish, _make_wine(2)])
+
+        assert snapshot.search(food_pairing="Рыба", region="бургун") == [fish]
+        assert snapshot.search(food_pairing="рыба", region="Бордо") == []
+
+    def test_needle_spanning_array_elements_matches_joined_text(self):
+        wine = _make_wine(1, grape_varieties=["каберне совиньон", "мерло"])
+        snapshot = _snapshot([wine])
+
+        assert snapshot.search(grape_variety="совиньон,мерло") == [wine]
+
+    def test_limit_offset_and_exclude_ids(self):
+        wines = [_make_wine(i) for i in range(5)]
+        snapshot = _snapshot(wines)
+
+        result = snapshot.search(limit=2, offset=1, exclude_ids=[wines[4].id])
+
+        assert [w.name for w in result] == ["Wine 2", "Wine 1"]
+
+    def test_with_image_filter(self):
+        no_image = _make_wine(1, image_url=None)
+        snapshot = _snapshot([no_image, _make_wine(2)])
+
+        result = snapshot.search(with_image=True)
+
+        assert no_image not in result
+        assert len(result) == 1
+
+
+def _make_db(version: tuple, rows: list[tuple]) -> MagicMock:
+    """Mock AsyncSession answering the version query, then the load query."""
+    version_result = MagicMock()
+    version_result.one.return_value = version
+    rows_result = MagicMock()
+    rows_result.all.return_value = rows
+
+    db = MagicMock()
+    db.execute = AsyncMock(side_effect=[version_result, rows_result])
+    db.begin_nested.return_value.__aenter__ = AsyncMock()
+    db.begin_nested.return_value.__aexit__ = AsyncMock(return_value=False)
+    return db
+
+
+def _row(wine: CatalogWine) -> tuple:
+    return tuple(getattr(wine, f) for f in CatalogWine.__dataclass_fields__)
+
+
+class TestWineCatalogRefresh:
+    """WineCatalog.get_snapshot() loads, caches and reloads on version change."""
+
+    @pytest.mark.asyncio
+    async def test_loads_snapshot_on_first_call(self):
+        wine = _make_wine(1)
+        db = _make_db((_BASE_TIME, 1), [_row(wine)])
+        catalog = WineCatalog(refresh_seconds=60)
+
+        snapshot = await catalog.get_snapshot(db)
+
+        assert snapshot is not None
+        assert snapshot.search() == [wine]
+
+    @pytest.mark.asyncio
+    async def test_fresh_snapshot_skips_db(self):
+        db = _make_db((_BASE_TIME, 1), [_row(_make_wine(1))])
+        catalog = WineCatalog(refresh_seconds=60)
+        first = await catalog.get_snapshot(db)
+
+        second = await catalog.get_snapshot(db)
+
+        assert second is first
+        assert db.execute.call_count == 2  # version + load, nothing more
+
+    @pytest.mark.asyncio
+    async def test_unchanged_version_keeps_snapshot(self):
+        db = _make_db((_BASE_TIME, 1), [_row(_make_wine(1))])
+        catalog = WineCatalog(refresh_seconds=60)
+        first = await catalog.get_snapshot(db)
+
+        catalog.invalidate()
+        version_result = MagicMock()
+        version_result.one.return_value = (_BASE_TIME, 1)
+        db.execute = AsyncMock(return_value=version_result)
+        second = await catalog.get_snapshot(db)
+
+        assert second is first
+        db.execute.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_changed_updated_at_reloads_snapshot(self):
+        catalog = WineCatalog(refresh_seconds=60)
+        await catalog.get_snapshot(_make_db((_BASE_TIME, 1), [_row(_make_wine(1))]))
+
+        catalog.invalidate()
+        updated = _make_wine(1, name="Renamed")
+        later = _BASE_TIME + timedelta(hours=1)
+        snapshot = await catalog.get_snapshot(_make_db((later, 1), [_row(updated)]))
+
+        assert snapshot.version == (later, 1)
+        assert snapshot.search()[0].name == "Renamed"
+
+    @pytest.mark.asyncio
+    async def test_returns_none_when_catalog_unavailable(self):
+        db = MagicMock()
+        db.execute = AsyncMock(side_effect=Exception("no such table: wines"))
+        db.begin_nested.return_value.__aenter__ = AsyncMock()
+        db.begin_nested.return_value.__aexit__ = AsyncMock(return_value=False)
+        catalog = WineCatalog(refresh_seconds=60)
+
+        assert await catalog.get_snapshot(db) is None
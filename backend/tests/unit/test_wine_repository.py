@@ -1,8 +1,11 @@
 """Unit tests for WineRepository."""
+import re
 import uuid
 from decimal import Decimal
+from unittest.mock import AsyncMock, MagicMock
 
 import pytest
+from sqlalchemy.dialects import postgresql
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.wine import PriceRange, Sweetness, Wine, WineType
@@ -165,3 +168,38 @@ class TestWineRepositoryCount:
         result = await wine_repo.count()
 
         assert result >= 1
+
+
+def _selects_embedding(statement) -> bool:
+    """Whether the column list of a compiled SELECT includes wines.embedding."""
+    sql = str(statement.compile(dialect=postgresql.dialect()))
+    columns = sql.split("FROM", 1)[0].replace("wines.embedding <=>", "")
+    return re.search(r"wines\.embedding\b", columns) is not None
+
+
+class TestWineRepositoryEmbeddingDeferred:
+    """The 1024-dim embedding is only loaded on explicit opt-in."""
+
+    @pytest.mark.asyncio
+    async def test_get_list_skips_embedding_by_default(self):
+        db = MagicMock()
+        db.execute = AsyncMock(return_value=MagicMock())
+        await WineRepository(db).get_list()
+
+        assert not _selects_embedding(db.execute.call_args[0][0])
+
+    @pytest.mark.asyncio
+    async def test_get_by_ids_loads_embedding_on_opt_in(self):
+        db = MagicMock()
+        db.execute = AsyncMock(return_value=MagicMock())
+        await WineRepository(db).get_by_ids([uuid.uuid4()], with_embedding=True)
+
+        assert _selects_embedding(db.execute.call_args[0][0])
+
+    @pytest.mark.asyncio
+    async def test_semantic_search_skips_embedding_by_default(self):
+        db = MagicMock()
+        db.execute = AsyncMock(return_value=MagicMock())
+        await WineRepository(db).semantic_search([0.0] * 1024)
+
+        assert not _selects_embedding(db.execute.call_args[0][0])
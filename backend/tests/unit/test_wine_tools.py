@@ -434,6 +434,10 @@ def _make_sommelier_service_with_mock_repo(return_wines: list | None = None):
     service = MagicMock(spec=SommelierService)
     service.wine_repo = AsyncMock(spec=WineRepository)
     service.wine_repo.get_list = AsyncMock(return_value=return_wines)
+    # No catalog snapshot: exercise the repository path
+    service.wine_catalog = None
+    # No session factory: tools query through the shared session
+    service.session_factory = None
 
     # Bind the real method to the mock instance
     service.execute_search_wines = SommelierService.execute_search_wines.__get__(
@@ -596,6 +600,7 @@ def _make_sommelier_service_for_semantic_search(
     service.wine_repo.semantic_search = AsyncMock(return_value=search_results)
     service.llm_service = MagicMock()
     service.llm_service.get_query_embedding = AsyncMock(return_value=embedding)
+    service.session_factory = None
 
     # Bind the real method
     service.execute_semantic_search = SommelierService.execute_semantic_search.__get__(
@@ -620,6 +625,24 @@ class TestExecuteSemanticSearch:
             "лёгкое и освежающее вино на лето"
         )
 
+    @pytest.mark.asyncio
+    async def test_execute_semantic_search_uses_own_session_from_factory(self):
+        """With a session_factory the query runs on a short-lived session."""
+        service = _make_sommelier_service_for_semantic_search()
+        factory = MagicMock()
+        factory.return_value.__aenter__ = AsyncMock(return_value=AsyncMock())
+        factory.return_value.__aexit__ = AsyncMock(return_value=False)
+        service.session_factory = factory
+
+        with patch("app.repositories.wine.WineRepository.semantic_search",
+                   new_callable=AsyncMock, return_value=[]) as repo_search:
+            await service.execute_semantic_search({"query": "лёгкое вино"})
+
+        factory.assert_called_once()
+        factory.return_value.__aexit__.assert_awaited_once()
+        repo_search.assert_awaited_once()
+        service.wine_repo.semantic_search.assert_not_called()
+
     @pytest.mark.asyncio
     async def test_execute_semantic_search_calls_repository(self):
         """execute_semantic_search should call wine_repo.semantic_search with embedding."""